@@ -0,0 +1,257 @@
+import os
+import io
+import sys
+import csv
+import json
+import time
+import random
+import platform
+import argparse
+import statistics
+
+from synthetic_rico import DEFAULT_PARAMS, LAYOUT_CLASSES, LEAF_CLASSES, generate_trace, generate_feature_rows, write_corpus
+
+# 합성 RICO 데이터로 파이프라인의 주요 함수 성능을 측정하는 벤치마크
+# 사용 예:
+#   python benchmark/run_benchmark.py --output benchmark/baseline.json
+#   python benchmark/run_benchmark.py --output current.json --compare benchmark/baseline.json
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'model'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'positive_dataset_code'))
+
+MODEL_PATH = os.path.join(REPO_ROOT, 'dataset', 'unsupervised_autoencoder.keras')
+WEIGHTS_PATH = os.path.join(REPO_ROOT, 'dataset', 'unsupervised_autoencoder.npz')
+ONNX_MODEL_PATH = os.path.join(REPO_ROOT, 'dataset', 'unsupervised_autoencoder.onnx')
+TFLITE_MODEL_PATH = os.path.join(REPO_ROOT, 'dataset', 'unsupervised_autoencoder.tflite')
+
+BENCHMARKS = {}
+
+# 벤치마크 등록용 데코레이터: setup 함수는 (측정할 함수, 처리 항목 수)를 반환
+def benchmark(name):
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorator
+
+def null_log_writer():
+    return csv.writer(io.StringIO())
+
+# 트리를 순회하며 (리프, 부모) 쌍을 수집
+def collect_leaves_with_parent(component, parent=None):
+    children = [child for child in component.get('children', []) if child]
+    if not children:
+        return [(component, parent)]
+    pairs = []
+    for child in children:
+        pairs.extend(collect_leaves_with_parent(child, component))
+    return pairs
+
+@benchmark('find_matching_components')
+def bench_find_matching_components(args, rng, params):
+    import boundMatching_positive as bm
+    from skipLog import SkipLog
+    skip_log = SkipLog().for_trace('app', 'trace')  # 파일 없이 집계만
+    gestures, view_hierarchies = generate_trace(rng, args.uis, params)
+    converted_gestures, _ = bm.convert_coordinates(gestures, skip_log=skip_log)
+    return lambda: bm.find_matching_components(converted_gestures, view_hierarchies, skip_log), len(converted_gestures['ids'])
+
+@benchmark('convert_coordinates')
+def bench_convert_coordinates(args, rng, params):
+    import boundMatching_positive as bm
+    from skipLog import SkipLog
+    skip_log = SkipLog().for_trace('app', 'trace')
+    # 한 trace의 제스처 수를 --uis배 늘려 배열 변환/필터링 비용을 측정 (탭과 스크롤이 섞이도록 좌표 개수를 0~3개로)
+    gestures = {f'{index}': [[rng.random(), rng.random()] for _ in range(rng.choice([0, 1, 1, 1, 2, 3]))] for index in range(args.uis * 100)}
+    return lambda: bm.convert_coordinates(gestures, skip_log=skip_log), len(gestures)
+
+@benchmark('calculate_spacing')
+def bench_calculate_spacing(args, rng, params):
+    import boundMatching_positive as bm
+    _, view_hierarchies = generate_trace(rng, args.uis, params)
+    cases = []
+    for hierarchy in view_hierarchies.values():
+        for leaf, parent in collect_leaves_with_parent(hierarchy['activity']['root']):
+            siblings_info = [sibling for sibling in parent.get('children', []) if sibling is not leaf] if parent else []
+            cases.append(({'bounds': leaf['bounds']}, parent, siblings_info))
+
+    def run():
+        for component_info, parent_info, siblings_info in cases:
+            bm.calculate_spacing(component_info, parent_info, siblings_info)
+    return run, len(cases)
+
+@benchmark('classify_component_class')
+def bench_classify_component_class(args, rng, params):
+    import convertDataset_positive as cd
+    class_names = [rng.choice(LAYOUT_CLASSES + LEAF_CLASSES) for _ in range(args.rows)]
+    writer = null_log_writer()
+
+    def run():
+        for class_name in class_names:
+            cd.classify_component_class('app', 'ui', class_name, writer)
+    return run, len(class_names)
+
+@benchmark('feature_encoding')
+def bench_feature_encoding(args, rng, params):
+    import pandas as pd
+    import feature
+    rows = generate_feature_rows(rng, args.rows)
+    for index, row in enumerate(rows):
+        row['dataset_type'] = index % 2
+    base_df = pd.DataFrame(rows)[feature.FEATURE_COLUMNS]
+    return lambda: feature.build_features(base_df.copy()), len(base_df)
+
+@benchmark('autoencoder_predict')
+def bench_autoencoder_predict(args, rng, params):
+    import numpy as np
+    from tensorflow.keras.models import load_model
+    autoencoder = load_model(args.model)
+    inputs = np.random.default_rng(args.seed).random((args.rows, autoencoder.input_shape[1]), dtype=np.float32)
+    return lambda: autoencoder.predict(inputs, batch_size=args.batch_size, verbose=0), len(inputs)
+
+@benchmark('numpy_autoencoder_predict')
+def bench_numpy_autoencoder_predict(args, rng, params):
+    import numpy as np
+    import numpy_autoencoder
+    if not os.path.exists(args.weights):
+        numpy_autoencoder.export_weights(args.model, args.weights)
+    layers = numpy_autoencoder.load_weights(args.weights)
+    inputs = np.random.default_rng(args.seed).random((args.rows, layers[0][0].shape[0]), dtype=np.float32)
+    return lambda: numpy_autoencoder.reconstruction_errors(layers, inputs, args.batch_size), len(inputs)
+
+# export_model.py로 내보낸 모델의 추론 처리량 (파일이 없으면 건너뜀)
+def bench_exported_predict(backend, model_path, args):
+    import numpy as np
+    import inference_backends
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"{model_path} not found (run model/export_model.py)")
+    predict = inference_backends.load_predictor(backend, model_path, args.batch_size)
+    input_size = inference_backends.get_input_size(backend, model_path)
+    inputs = np.random.default_rng(args.seed).random((args.rows, input_size), dtype=np.float32)
+    return lambda: predict(inputs), len(inputs)
+
+@benchmark('onnxruntime_predict')
+def bench_onnxruntime_predict(args, rng, params):
+    return bench_exported_predict('onnxruntime', args.onnx_model, args)
+
+@benchmark('tflite_predict')
+def bench_tflite_predict(args, rng, params):
+    return bench_exported_predict('tflite', args.tflite_model, args)
+
+def time_benchmark(run, repeat, warmup):
+    for _ in range(warmup):
+        run()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+def run_benchmarks(args):
+    params = {key: getattr(args, key) for key in DEFAULT_PARAMS}
+    results = {}
+    for name in args.only or BENCHMARKS:
+        rng = random.Random(args.seed)  # 벤치마크마다 같은 입력을 쓰도록 시드 재설정
+        try:
+            run, n_items = BENCHMARKS[name](args, rng, params)
+        except (ImportError, FileNotFoundError) as e:
+            print(f"Skipping {name}: {e}")
+            results[name] = {'skipped': str(e)}
+            continue
+
+        durations = time_benchmark(run, args.repeat, args.warmup)
+        median = statistics.median(durations)
+        results[name] = {
+            'items': n_items,
+            'repeat': args.repeat,
+            'median_s': median,
+            'min_s': min(durations),
+            'mean_s': statistics.fmean(durations),
+            'items_per_s': n_items / median if median > 0 else None
+        }
+        print(f"{name:<28} median {median * 1000:10.3f} ms  ({n_items} items)")
+
+    return {
+        'meta': {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'uis': args.uis,
+            'rows': args.rows,
+            'params': params
+        },
+        'results': results
+    }
+
+# 기준 결과와 비교하여 median이 허용 오차 이상 느려진 항목을 회귀로 표시
+def compare_results(current, baseline, tolerance):
+    regressions = []
+    print(f"\n{'benchmark':<28} {'baseline ms':>12} {'current ms':>12} {'ratio':>8}")
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if 'median_s' not in result or not base or 'median_s' not in base:
+            continue
+        ratio = result['median_s'] / base['median_s'] if base['median_s'] > 0 else float('inf')
+        flag = ''
+        if ratio > 1 + tolerance:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"{name:<28} {base['median_s'] * 1000:12.3f} {result['median_s'] * 1000:12.3f} {ratio:8.2f}{flag}")
+
+    if baseline.get('meta', {}).get('params') != current['meta']['params']:
+        print("Warning: baseline was recorded with different generator parameters")
+    return regressions
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark the tappability pipeline on synthetic RICO-like data')
+    parser.add_argument('--output', default='benchmark_results.json', help='JSON file to write results to')
+    parser.add_argument('--compare', help='baseline JSON file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='allowed slowdown ratio before flagging a regression')
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help='run only these benchmarks')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--uis', type=int, default=200, help='synthetic UIs per trace')
+    parser.add_argument('--rows', type=int, default=20000, help='rows for classification/feature/predict benchmarks')
+    parser.add_argument('--batch-size', type=int, default=4096, help='predict batch size')
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--weights', default=WEIGHTS_PATH, help='.npz weights for numpy_autoencoder_predict (exported from --model if missing)')
+    parser.add_argument('--onnx-model', default=ONNX_MODEL_PATH, help='ONNX model for onnxruntime_predict (compare quantized exports by passing their path)')
+    parser.add_argument('--tflite-model', default=TFLITE_MODEL_PATH, help='TFLite model for tflite_predict')
+    parser.add_argument('--depth', type=int, default=DEFAULT_PARAMS['depth'])
+    parser.add_argument('--fanout', type=int, default=DEFAULT_PARAMS['fanout'])
+    parser.add_argument('--nodes', type=int, default=DEFAULT_PARAMS['nodes'])
+    parser.add_argument('--rel-bounds', dest='rel_bounds', type=float, default=DEFAULT_PARAMS['rel_bounds'])
+    parser.add_argument('--scroll-ratio', dest='scroll_ratio', type=float, default=DEFAULT_PARAMS['scroll_ratio'])
+    parser.add_argument('--miss-ratio', dest='miss_ratio', type=float, default=DEFAULT_PARAMS['miss_ratio'])
+    parser.add_argument('--write-corpus', metavar='DIR', help='also write a synthetic filtered_traces corpus to DIR')
+    parser.add_argument('--apps', type=int, default=10, help='apps in the written corpus')
+    parser.add_argument('--traces', type=int, default=3, help='traces per app in the written corpus')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    if args.write_corpus:
+        params = {key: getattr(args, key) for key in DEFAULT_PARAMS}
+        write_corpus(args.write_corpus, args.apps, args.traces, args.uis, seed=args.seed, params=params)
+        print(f"Synthetic corpus written to: {args.write_corpus}")
+
+    current = run_benchmarks(args)
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(current, file, indent=4)
+    print(f"Benchmark results saved to: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare_results(current, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import os
+import json
+import random
+
+# RICO 형식을 흉내 낸 합성 view hierarchy / gesture 생성기
+# 실제 RICO 코퍼스 없이도 boundMatching, convertDataset, feature 단계의 성능을 재현 가능하게 측정하기 위해 사용
+
+SCREEN_WIDTH = 1440
+SCREEN_HEIGHT = 2560
+
+LAYOUT_CLASSES = [
+    'android.widget.FrameLayout',
+    'android.widget.LinearLayout',
+    'android.widget.RelativeLayout',
+    'android.support.v7.widget.RecyclerView',
+    'android.support.v7.widget.CardView',
+    'android.support.v7.widget.Toolbar',
+    'android.support.v4.widget.DrawerLayout',
+    'com.android.internal.policy.PhoneWindow$DecorView'
+]
+LEAF_CLASSES = [
+    'android.widget.ImageView',
+    'android.widget.TextView',
+    'android.widget.Button',
+    'android.support.v7.widget.AppCompatImageView',
+    'android.support.v7.widget.AppCompatTextView',
+    'android.widget.EditText',
+    'android.widget.CheckBox',
+    'android.widget.ImageButton',
+    'android.webkit.WebView',
+    'com.google.android.gms.ads.AdView',
+    'com.example.app.CustomWidget'
+]
+# convertDataset의 component_keywords 분류 결과와 같은 이름 (feature 단계용)
+CLASSIFIED_CLASSES = [
+    'Advertisement', 'BottomNavigation', 'ButtonBar', 'Card', 'Checkbox', 'Drawer', 'DatePicker', 'Input',
+    'ListItem', 'MapView', 'MultiTab', 'NumberStepper', 'OnOffSwitch', 'PageIndicator', 'RadioButton',
+    'Slider', 'Toolbar', 'Video', 'WebView', 'TextButton', 'Image', 'Other'
+]
+
+DEFAULT_PARAMS = {
+    'depth': 8,  # 트리 최대 깊이
+    'fanout': 4,  # 노드당 최대 자식 수
+    'nodes': 300,  # UI당 최대 노드 수
+    'rel_bounds': 0.3,  # rel-bounds를 갖는 노드 비율
+    'scroll_ratio': 0.1,  # 여러 좌표를 갖는 (스크롤) 제스처 비율
+    'miss_ratio': 0.05  # 어떤 컴포넌트에도 맞지 않을 수 있는 임의 좌표 비율
+}
+
+# 부모 영역을 가로 또는 세로로 나누어 자식 영역 생성
+def split_bounds(rng, bounds, n):
+    left, top, right, bottom = bounds
+    vertical = rng.random() < 0.6
+    length = (bottom - top) if vertical else (right - left)
+    n = max(1, min(n, length))
+    cuts = sorted(rng.sample(range(1, length), n - 1)) if n > 1 else []
+    edges = [0] + cuts + [length]
+
+    children = []
+    for start, end in zip(edges, edges[1:]):
+        if vertical:
+            children.append([left, top + start, right, top + end])
+        else:
+            children.append([left + start, top, left + end, bottom])
+    return children
+
+def relative_bounds(bounds, parent_bounds):
+    parent_width = max(parent_bounds[2] - parent_bounds[0], 1)
+    parent_height = max(parent_bounds[3] - parent_bounds[1], 1)
+    return [
+        (bounds[0] - parent_bounds[0]) / parent_width,
+        (bounds[1] - parent_bounds[1]) / parent_height,
+        (bounds[2] - parent_bounds[0]) / parent_width,
+        (bounds[3] - parent_bounds[1]) / parent_height
+    ]
+
+def generate_node(rng, bounds, parent_bounds, depth, params, budget, leaves):
+    budget[0] -= 1
+    node = {
+        'class': rng.choice(LAYOUT_CLASSES),
+        'bounds': bounds,
+        'clickable': rng.random() < 0.3
+    }
+    if parent_bounds is not None and rng.random() < params['rel_bounds']:
+        node['rel-bounds'] = relative_bounds(bounds, parent_bounds)
+
+    can_split = bounds[2] - bounds[0] > 4 and bounds[3] - bounds[1] > 4
+    if depth + 1 < params['depth'] and budget[0] > 0 and can_split:
+        n_children = min(rng.randint(1, params['fanout']), budget[0])
+        node['children'] = [generate_node(rng, child_bounds, bounds, depth + 1, params, budget, leaves)
+                            for child_bounds in split_bounds(rng, bounds, n_children)]
+    if not node.get('children'):
+        node['class'] = rng.choice(LEAF_CLASSES)
+        node['children'] = []
+        leaves.append(node)
+    return node
+
+# UI 하나의 view hierarchy와 리프 노드 목록 생성
+def generate_hierarchy(rng, params=None):
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    leaves = []
+    budget = [params['nodes']]
+    root = generate_node(rng, [0, 0, SCREEN_WIDTH, SCREEN_HEIGHT], None, 0, params, budget, leaves)
+    return {'activity': {'root': root}}, leaves
+
+# 리프 노드를 누른 것처럼 정규화된 제스처 좌표 생성
+def generate_gesture(rng, leaves, params):
+    if rng.random() < params['miss_ratio'] or not leaves:
+        return [[rng.random(), rng.random()]]
+
+    left, top, right, bottom = rng.choice(leaves)['bounds']
+    point = [rng.uniform(left, right) / SCREEN_WIDTH, rng.uniform(top, bottom) / SCREEN_HEIGHT]
+    if rng.random() < params['scroll_ratio']:
+        return [point, [point[0], min(point[1] + 0.1, 1.0)]]
+    return [point]
+
+# trace 하나 (gestures + view_hierarchies) 생성
+def generate_trace(rng, n_uis, params=None):
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    gestures = {}
+    view_hierarchies = {}
+    for ui_index in range(n_uis):
+        ui_id = str(ui_index)
+        hierarchy, leaves = generate_hierarchy(rng, params)
+        view_hierarchies[f'{ui_id}.json'] = hierarchy
+        gestures[ui_id] = generate_gesture(rng, leaves, params)
+    return gestures, view_hierarchies
+
+# filtered_traces/<app>/<trace>/ 구조로 합성 코퍼스를 디스크에 저장
+def write_corpus(dataset_root, n_apps, n_traces, n_uis, seed=0, params=None):
+    rng = random.Random(seed)
+    for app_index in range(n_apps):
+        for trace_index in range(n_traces):
+            trace_directory = os.path.join(dataset_root, 'filtered_traces', f'com.synthetic.app{app_index}', f'trace_{trace_index}')
+            view_hierarchies_path = os.path.join(trace_directory, 'view_hierarchies')
+            os.makedirs(view_hierarchies_path, exist_ok=True)
+
+            gestures, view_hierarchies = generate_trace(rng, n_uis, params)
+            with open(os.path.join(trace_directory, 'gestures.json'), 'w', encoding='utf-8') as file:
+                json.dump(gestures, file)
+            for file_name, hierarchy in view_hierarchies.items():
+                with open(os.path.join(view_hierarchies_path, file_name), 'w', encoding='utf-8') as file:
+                    json.dump(hierarchy, file)
+
+# convertDataset 출력 (positive/negative_original_data.csv)과 같은 열을 갖는 행 생성
+def generate_feature_rows(rng, n_rows):
+    rows = []
+    for _ in range(n_rows):
+        left = rng.randint(0, SCREEN_WIDTH - 10)
+        top = rng.randint(0, SCREEN_HEIGHT - 10)
+        right = rng.randint(left + 1, SCREEN_WIDTH)
+        bottom = rng.randint(top + 1, SCREEN_HEIGHT)
+        descendant_count = rng.randint(0, 40)
+        rows.append({
+            'bounds': str([left, top, right, bottom]),
+            'classified_class': rng.choice(['Image', 'TextButton', 'Other']),
+            'siblings_cnt': rng.randint(0, 20),
+            'Hierarchy_Depth': rng.randint(1, 25),
+            'Nesting_Level': rng.randint(0, 20),
+            'top_spacing': rng.random(),
+            'bottom_spacing': rng.random(),
+            'left_spacing': rng.random(),
+            'right_spacing': rng.random(),
+            'total_components': rng.randint(1, 300),
+            'descendant_count': descendant_count,
+            'descendant_classes': str([rng.choice(CLASSIFIED_CLASSES) for _ in range(descendant_count)])
+        })
+    return rows
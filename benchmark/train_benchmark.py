@@ -0,0 +1,130 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import multiprocessing
+
+from synthetic_rico import generate_feature_rows
+
+# autoencoder 학습 설정별 처리량 (samples/sec)과 최종 val loss 비교
+# 스레드 수와 precision 정책은 TensorFlow 초기화 전에만 바꿀 수 있으므로 설정마다 새 프로세스에서 학습
+# 사용 예:
+#   python benchmark/train_benchmark.py --rows 200000 --epochs 5
+#   python benchmark/train_benchmark.py --input dataset/processed_dataset.csv --configs baseline cpu_perf
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'model'))
+
+# 설정 이름 -> model_train.py 옵션 (지정하지 않은 값은 model_train.parse_args 기본값)
+CONFIGS = {
+    'baseline': [],
+    'large_batch': ['--batch-size', '1024', '--lr-scaling', 'sqrt'],
+    'large_batch_spe': ['--batch-size', '1024', '--lr-scaling', 'sqrt', '--steps-per-execution', '32'],
+    'large_batch_xla': ['--batch-size', '1024', '--lr-scaling', 'sqrt', '--jit-compile'],
+    'cpu_perf': ['--cpu-perf'],
+    'cpu_perf_xla': ['--cpu-perf', '--jit-compile'],
+    'cpu_perf_bf16': ['--cpu-perf', '--mixed-precision']
+}
+
+# 합성 행 또는 전처리된 CSV로 학습/검증 입력 행렬 준비 (model_train.py와 같은 분할과 축소기)
+def prepare_arrays(input_path, n_rows, seed):
+    import numpy as np
+    import pandas as pd
+    from model_train import load_processed_data, split_data, fit_descendant_reducer, transform_descendant_classes, combined_data
+
+    if input_path:
+        df, descendant_matrix = load_processed_data(input_path)
+    else:
+        import feature
+        rows = generate_feature_rows(random.Random(seed), n_rows)
+        for row in rows:
+            row['dataset_type'] = 1  # 학습 분할에는 긍정 데이터만 사용
+        df, _, descendant_matrix = feature.build_features(pd.DataFrame(rows)[feature.FEATURE_COLUMNS])
+
+    train_data, val_data = split_data(df)[:2]
+    reducer = fit_descendant_reducer(train_data, descendant_matrix=descendant_matrix)
+    return [combined_data(data, transform_descendant_classes(reducer, data, descendant_matrix=descendant_matrix)).astype(np.float32)
+            for data in [train_data, val_data]]
+
+def run_config(options, train_inputs, val_inputs, epochs, seed):
+    import tensorflow as tf
+    from tensorflow.keras.callbacks import Callback
+    from model_train import parse_args, configure_runtime, scaled_learning_rate, build_autoencoder, compile_autoencoder
+
+    args = parse_args(options + ['--epochs', str(epochs)])
+    precision = configure_runtime(args.intra_op_threads, args.inter_op_threads, args.mixed_precision)
+    learning_rate = scaled_learning_rate(args.batch_size, args.lr, args.lr_scaling)
+    tf.keras.utils.set_random_seed(seed)
+
+    class EpochTimer(Callback):
+        def on_epoch_begin(self, epoch, logs=None):
+            self.start = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            epoch_times.append(time.perf_counter() - self.start)
+
+    epoch_times = []
+    autoencoder = compile_autoencoder(build_autoencoder(train_inputs.shape[1]), learning_rate, args.jit_compile, args.steps_per_execution)
+    history = autoencoder.fit(train_inputs, train_inputs, epochs=args.epochs, batch_size=args.batch_size,
+                              validation_data=(val_inputs, val_inputs), callbacks=[EpochTimer()], shuffle=True, verbose=0)
+
+    # 첫 epoch은 tf.function 추적 / XLA 컴파일 시간이 포함되므로 처리량에서 제외
+    steady_times = epoch_times[1:] or epoch_times
+    return {
+        'options': options,
+        'batch_size': args.batch_size,
+        'learning_rate': learning_rate,
+        'jit_compile': args.jit_compile,
+        'steps_per_execution': args.steps_per_execution,
+        'intra_op_threads': args.intra_op_threads,
+        'inter_op_threads': args.inter_op_threads,
+        'precision': precision,
+        'first_epoch_s': epoch_times[0],
+        'samples_per_s': len(train_inputs) * len(steady_times) / sum(steady_times),
+        'final_val_loss': float(history.history['val_loss'][-1])
+    }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark autoencoder training throughput for CPU performance settings')
+    parser.add_argument('--configs', nargs='+', choices=list(CONFIGS), default=list(CONFIGS))
+    parser.add_argument('--input', help='processed dataset CSV (default: synthetic rows)')
+    parser.add_argument('--rows', type=int, default=100000, help='synthetic rows when --input is not given')
+    parser.add_argument('--epochs', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='train_benchmark_results.json')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    train_inputs, val_inputs = prepare_arrays(args.input, args.rows, args.seed)
+    print(f"Train samples: {len(train_inputs)}, validation samples: {len(val_inputs)}, epochs: {args.epochs}")
+
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for name in args.configs:
+        with context.Pool(1) as pool:
+            results[name] = pool.apply(run_config, (CONFIGS[name], train_inputs, val_inputs, args.epochs, args.seed))
+        result = results[name]
+        print(f"{name:<22} {result['samples_per_s']:12.0f} samples/s  val_loss {result['final_val_loss']:.5f}  "
+              f"(batch {result['batch_size']}, lr {result['learning_rate']:.2g}, {result['precision']}, first epoch {result['first_epoch_s']:.1f}s)")
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump({
+            'meta': {
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'input': args.input or 'synthetic',
+                'train_samples': len(train_inputs),
+                'epochs': args.epochs
+            },
+            'results': results
+        }, file, indent=4)
+    print(f"Training benchmark results saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import os
+import time
+import sqlite3
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# filtered_traces 폴더를 os.scandir로 한 번만 훑어 앱/trace/파일 목록을 sqlite에 저장하는 매니페스트
+# 이후 단계들은 os.listdir/os.path.exists 대신 매니페스트를 조회하여 코퍼스 구조를 파악
+# 앱/trace/하위 폴더의 mtime도 함께 저장하여, load_manifest가 폴더 mtime이 바뀐 경우 (trace, 제스처 파일, view hierarchy 추가/삭제) 다시 빌드
+# 파일 내용 수정은 폴더 mtime을 바꾸지 않으므로 파일의 size/mtime이 필요한 곳은 os.stat으로 직접 확인해야 함
+# 직접 빌드: python common/corpusManifest.py <filtered_traces 경로>
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS apps (app TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS traces (app TEXT, trace TEXT, PRIMARY KEY (app, trace));
+CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, mtime_ns INTEGER);
+CREATE TABLE IF NOT EXISTS files (
+    app TEXT, trace TEXT, kind TEXT, name TEXT, size INTEGER, mtime_ns INTEGER,
+    PRIMARY KEY (app, trace, kind, name)
+);
+"""
+
+# 파일 종류: trace 폴더 바로 아래의 gestures*.json (및 gestures.ndjson 로그), view_hierarchies/*.json, screenshots/*
+GESTURES = 'gestures'
+VIEW_HIERARCHY = 'view_hierarchy'
+SCREENSHOT = 'screenshot'
+TRACE_SUBDIRS = ['view_hierarchies', 'screenshots']
+DEFAULT_WORKERS = 16  # 네트워크 스토리지 stat/scandir 지연을 겹치는 스레드 수
+CHECK_CHUNK_SIZE = 1024  # 폴더 mtime 확인 시 한 번에 병렬로 stat하는 폴더 수
+
+def get_default_manifest_path(traces_root):
+    return os.path.join(os.path.dirname(os.path.abspath(traces_root)), 'filtered_traces_manifest.sqlite')
+
+def scan_files(directory, kind, name_filter=None):
+    files = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if name_filter and not name_filter(entry.name):
+                    continue
+                if entry.is_file():
+                    stat = entry.stat()
+                    files.append((kind, entry.name, stat.st_size, stat.st_mtime_ns))
+    except OSError:
+        pass  # 폴더가 없는 trace
+    return files
+
+# 폴더의 mtime (없는 폴더는 None: 나중에 생기면 변경으로 감지)
+def get_dir_mtime(directory):
+    try:
+        return os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+
+# 앱 하나의 trace 목록과 파일 목록, 폴더 mtime ((traces_root 기준 상대 경로, mtime) 목록) 수집
+# 폴더 mtime은 폴더를 나열하기 전에 읽어, 스캔 도중 바뀐 폴더는 다음 load_manifest에서 변경으로 감지되도록 함
+def scan_app(app_dir):
+    app_name = os.path.basename(app_dir)
+    dirs = [(app_name, get_dir_mtime(app_dir))]
+    traces = []
+    with os.scandir(app_dir) as entries:
+        trace_entries = [entry for entry in entries if entry.is_dir()]
+
+    for trace_entry in trace_entries:
+        trace_path = f'{app_name}/{trace_entry.name}'
+        dirs.append((trace_path, get_dir_mtime(trace_entry.path)))
+        dirs += [(f'{trace_path}/{subdir}', get_dir_mtime(os.path.join(trace_entry.path, subdir))) for subdir in TRACE_SUBDIRS]
+        files = scan_files(trace_entry.path, GESTURES, lambda name: name.startswith('gestures') and name.endswith(('.json', '.ndjson')))
+        files += scan_files(os.path.join(trace_entry.path, 'view_hierarchies'), VIEW_HIERARCHY, lambda name: name.endswith('.json'))
+        files += scan_files(os.path.join(trace_entry.path, 'screenshots'), SCREENSHOT)
+        traces.append((trace_entry.name, files))
+    return traces, dirs
+
+def build_manifest(traces_root, manifest_path=None, max_workers=DEFAULT_WORKERS):
+    manifest_path = manifest_path or get_default_manifest_path(traces_root)
+    root_mtime = get_dir_mtime(traces_root)
+    with os.scandir(traces_root) as entries:
+        app_entries = sorted((entry for entry in entries if entry.is_dir()), key=lambda entry: entry.name)
+
+    # 네트워크 스토리지의 지연을 겹치기 위해 앱 단위로 병렬 스캔
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        app_traces = list(executor.map(scan_app, [entry.path for entry in app_entries]))
+
+    temp_path = f'{manifest_path}.{os.getpid()}.tmp'
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    conn = sqlite3.connect(temp_path)
+    with conn:
+        conn.executescript(SCHEMA)
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ('traces_root', os.path.abspath(traces_root)),
+            ('built_at', time.strftime('%Y-%m-%dT%H:%M:%S'))
+        ])
+        conn.execute("INSERT INTO dirs VALUES (?, ?)", ('', root_mtime))
+        for app_entry, (traces, dirs) in zip(app_entries, app_traces):
+            conn.executemany("INSERT INTO dirs VALUES (?, ?)", dirs)
+            conn.execute("INSERT INTO apps VALUES (?)", (app_entry.name,))
+            conn.executemany("INSERT INTO traces VALUES (?, ?)", [(app_entry.name, trace) for trace, _ in traces])
+            conn.executemany("INSERT INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                             [(app_entry.name, trace, *file_info) for trace, files in traces for file_info in files])
+    conn.close()
+    os.replace(temp_path, manifest_path)  # 빌드가 끝난 매니페스트만 사용되도록 교체
+    return manifest_path
+
+# sqlite 연결은 만든 스레드에서만 조회 (boundMatching의 prefetch 로더 스레드에는 조회한 파일 목록을 넘김)
+def open_manifest(manifest_path):
+    return sqlite3.connect(manifest_path)
+
+# 저장된 폴더 mtime과 현재 mtime이 다른 첫 폴더 경로 반환 (모두 같으면 None)
+# 폴더 stat만 하므로 파일까지 나열하는 build_manifest보다 훨씬 가벼움
+# build_manifest처럼 스레드 풀로 stat 지연을 겹치고, 청크 단위로 비교하여 바뀐 폴더를 찾으면 바로 중단
+def find_changed_directory(conn, traces_root, max_workers=DEFAULT_WORKERS):
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'dirs'").fetchone():
+        return traces_root  # 폴더 mtime을 저장하지 않던 이전 형식의 매니페스트
+    cursor = conn.execute("SELECT path, mtime_ns FROM dirs")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            rows = cursor.fetchmany(CHECK_CHUNK_SIZE)
+            if not rows:
+                return None
+            directories = [os.path.join(traces_root, path) for path, _ in rows]
+            for directory, (_, mtime_ns), current_mtime in zip(directories, rows, executor.map(get_dir_mtime, directories)):
+                if current_mtime != mtime_ns:
+                    return directory
+
+# 매니페스트가 있고 코퍼스 폴더가 바뀌지 않았으면 열고, 없거나 바뀌었거나 rebuild=True면 새로 빌드
+# max_workers는 폴더 mtime 확인과 다시 빌드할 때의 스캔 스레드 수
+def load_manifest(traces_root, manifest_path=None, rebuild=False, max_workers=DEFAULT_WORKERS):
+    manifest_path = manifest_path or get_default_manifest_path(traces_root)
+    if not rebuild and os.path.exists(manifest_path):
+        conn = open_manifest(manifest_path)
+        changed_directory = find_changed_directory(conn, traces_root, max_workers)
+        if changed_directory is None:
+            return conn
+        conn.close()
+        print(f"Corpus changed since the manifest was built ({changed_directory})")
+    print(f"Building corpus manifest: {manifest_path}")
+    build_manifest(traces_root, manifest_path, max_workers)
+    return open_manifest(manifest_path)
+
+def list_apps(conn):
+    return [row[0] for row in conn.execute("SELECT app FROM apps ORDER BY app")]
+
+def list_traces(conn, app):
+    return [row[0] for row in conn.execute("SELECT trace FROM traces WHERE app = ? ORDER BY trace", (app,))]
+
+# (name, size, mtime_ns) 목록 반환
+def list_files(conn, app, trace, kind):
+    return conn.execute("SELECT name, size, mtime_ns FROM files WHERE app = ? AND trace = ? AND kind = ? ORDER BY name",
+                        (app, trace, kind)).fetchall()
+
+# 같은 이름의 스크린샷(.jpg)이 있는 뷰 하이어라키를 (app, trace, view_file, screenshot_file) 목록으로 반환
+def list_view_screenshot_pairs(conn):
+    return conn.execute("""
+        SELECT v.app, v.trace, v.name, s.name FROM files v
+        JOIN files s ON s.app = v.app AND s.trace = v.trace AND s.kind = ?
+                    AND s.name = substr(v.name, 1, length(v.name) - 5) || '.jpg'
+        WHERE v.kind = ?
+        ORDER BY v.app, v.trace, v.name
+    """, (SCREENSHOT, VIEW_HIERARCHY)).fetchall()
+
+# 이전 매니페스트에 없는 (app, trace) 목록 반환 (warm start 재학습 시 새로 추가된 trace만 처리)
+def list_new_traces(conn, previous_manifest_path):
+    conn.execute("ATTACH DATABASE ? AS previous", (previous_manifest_path,))
+    try:
+        return conn.execute("""
+            SELECT t.app, t.trace FROM traces t
+            LEFT JOIN previous.traces p ON p.app = t.app AND p.trace = t.trace
+            WHERE p.trace IS NULL
+            ORDER BY t.app, t.trace
+        """).fetchall()
+    finally:
+        conn.execute("DETACH DATABASE previous")
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a manifest index of a RICO filtered_traces folder')
+    parser.add_argument('traces_root', help='path to the filtered_traces folder')
+    parser.add_argument('--output', help='manifest path (default: next to filtered_traces)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='threads scanning filtered_traces')
+    parser.add_argument('--since', help='previous manifest: also report traces added since it was built')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest_path = build_manifest(args.traces_root, args.output, args.workers)
+    conn = open_manifest(manifest_path)
+    n_apps = conn.execute("SELECT COUNT(*) FROM apps").fetchone()[0]
+    n_traces = conn.execute("SELECT COUNT(*) FROM traces").fetchone()[0]
+    n_files = conn.execute("SELECT kind, COUNT(*) FROM files GROUP BY kind").fetchall()
+    print(f"Manifest saved to: {manifest_path} ({time.perf_counter() - start:.1f}s)")
+    print(f"Apps: {n_apps}, Traces: {n_traces}, Files: {dict(n_files)}")
+    if args.since:
+        print(f"New traces since {args.since}: {len(list_new_traces(conn, args.since))}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+# 파이프라인 단계별 시간 측정 및 카운터
+# model, positive_dataset_code, negative_dataset_code 스크립트가 함께 쓰는 유일한 사본 (각 스크립트가 common 폴더를 sys.path에 추가하여 import)
+# 집계는 잠금으로 보호하므로 prefetch 로더 등 여러 스레드에서 측정해도 됨
+# 사용 예:
+#   with profiler.profile_run('feature'):
+#       with profiler.stage('read_csv'):
+#           ...
+# PIPELINE_PROFILE=cprofile (또는 pyinstrument) 환경 변수를 지정하면 함수 단위 프로파일도 함께 저장
+
+PROFILE_DIR = os.path.join('dataset', 'profile')  # JSON 요약 리포트를 저장할 폴더
+PROFILE_ENV = 'PIPELINE_PROFILE'
+
+timings = defaultdict(float)  # 단계별 누적 시간 (초)
+calls = defaultdict(int)  # 단계별 호출 횟수
+counters = defaultdict(int)  # 처리한 항목 수 등 임의의 카운터
+lock = threading.Lock()
+
+def add_timing(name, seconds):
+    with lock:
+        timings[name] += seconds
+        calls[name] += 1
+
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(name, time.perf_counter() - start)
+
+# 함수 전체를 하나의 단계로 측정하는 데코레이터 (재귀 함수에는 호출하는 쪽에서 stage 사용)
+def timed(name=None):
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add_timing(stage_name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def count(name, n=1):
+    with lock:
+        counters[name] += n
+
+def reset():
+    with lock:
+        timings.clear()
+        calls.clear()
+        counters.clear()
+
+def summary():
+    with lock:
+        stage_timings, stage_calls, counter_values = dict(timings), dict(calls), dict(counters)
+    stages = {}
+    for name in sorted(stage_timings, key=stage_timings.get, reverse=True):
+        stages[name] = {
+            'seconds': round(stage_timings[name], 6),
+            'calls': stage_calls[name],
+            'mean_ms': round(stage_timings[name] / stage_calls[name] * 1000, 6) if stage_calls[name] else 0.0
+        }
+    return {'stages': stages, 'counters': counter_values}
+
+# cProfile / pyinstrument 프로파일러 시작 (mode가 없으면 아무것도 하지 않음)
+def start_profiler(mode):
+    if mode == 'cprofile':
+        import cProfile
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+    if mode == 'pyinstrument':
+        from pyinstrument import Profiler
+        profile = Profiler()
+        profile.start()
+        return profile
+    raise ValueError(f"Unknown profiler mode: {mode} (expected 'cprofile' or 'pyinstrument')")
+
+def stop_profiler(mode, profile, output_prefix):
+    if mode == 'cprofile':
+        profile.disable()
+        output_path = f'{output_prefix}.prof'
+        profile.dump_stats(output_path)  # snakeviz, pstats 등으로 확인
+    else:
+        profile.stop()
+        output_path = f'{output_prefix}.html'
+        with open(output_path, 'w', encoding='utf-8') as file:
+            file.write(profile.output_html())
+    return output_path
+
+def write_report(run_name, wall_time, output_dir=PROFILE_DIR, extra=None):
+    os.makedirs(output_dir, exist_ok=True)
+    report = {
+        'run': run_name,
+        'finished_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'wall_time': round(wall_time, 6),
+        **summary()
+    }
+    if extra:
+        report.update(extra)
+
+    output_path = os.path.join(output_dir, f'{run_name}.json')
+    with open(output_path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=4, ensure_ascii=False)
+    print(f"Profile report saved to: {output_path}")
+    return report
+
+# 실행 전체를 감싸서 종료 시 JSON 요약 리포트 (및 선택적으로 프로파일) 저장
+@contextmanager
+def profile_run(run_name, mode=None, output_dir=PROFILE_DIR):
+    mode = mode or os.environ.get(PROFILE_ENV) or None
+    reset()
+    profile = start_profiler(mode) if mode else None
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        wall_time = time.perf_counter() - start
+        extra = {}
+        if profile is not None:
+            os.makedirs(output_dir, exist_ok=True)
+            extra['profile_output'] = stop_profiler(mode, profile, os.path.join(output_dir, run_name))
+        write_report(run_name, wall_time, output_dir, extra)
@@ -0,0 +1,98 @@
+import csv
+import json
+import threading
+from enum import Enum
+from collections import Counter, defaultdict
+
+# boundMatching에서 건너뛴 제스처/UI를 이유 코드와 함께 기록하는 구조화된 로그 (skipped_log.csv)
+# 행은 메모리에 모았다가 flush_every개마다 한 번에 쓰고, 이유별/앱별 집계는 기록할 때 바로 갱신
+# 잠금으로 보호하므로 여러 스레드 (prefetch 로더, 병렬 워커)에서 같은 로그에 기록해도 됨
+# boundMatching_positive/negative가 함께 쓰는 공용 모듈 (common 폴더)
+# 사용 예:
+#   with SkipLog('skipped_log.csv') as skip_log:
+#       trace_skip_log = skip_log.for_trace(app_name, trace_name)
+#       trace_skip_log.record(SkipReason.NO_MATCHING_COMPONENT, gesture_id, view_hierarchy_file)
+
+FIELDS = ['app', 'trace', 'ui', 'reason', 'detail']
+DEFAULT_FLUSH_EVERY = 10000
+
+class SkipReason(Enum):
+    NO_COORDINATES = 'no_coordinates'  # 좌표 없음 (스크롤 제스처로 추정)
+    MULTIPLE_COORDINATES = 'multiple_coordinates'  # 좌표가 둘 이상 (스크롤 제스처로 추정)
+    NO_VIEW_HIERARCHY = 'no_view_hierarchy'  # 제스처에 대응하는 view hierarchy 파일이 없거나 JSON이 잘못됨
+    EMPTY_VIEW_HIERARCHY = 'empty_view_hierarchy'  # view hierarchy에 activity.root가 없음
+    SEARCH_ERROR = 'search_error'  # 컴포넌트 탐색 중 오류
+    NO_MATCHING_COMPONENT = 'no_matching_component'  # 제스처 좌표를 포함하는 리프가 없음
+
+class SkipLog:
+    def __init__(self, file_path=None, flush_every=DEFAULT_FLUSH_EVERY):
+        self.file_path = file_path
+        self.flush_every = flush_every
+        self.lock = threading.Lock()
+        self.buffer = []
+        self.reason_counts = Counter()
+        self.app_reason_counts = defaultdict(Counter)
+        if file_path:
+            with open(file_path, 'w', newline='', encoding='utf-8') as file:
+                csv.writer(file).writerow(FIELDS)
+
+    def record(self, reason, ui, app=None, trace=None, detail=''):
+        with self.lock:
+            self.buffer.append((app, trace, ui, reason.value, detail))
+            self.reason_counts[reason.value] += 1
+            self.app_reason_counts[app][reason.value] += 1
+            if len(self.buffer) >= self.flush_every:
+                self.flush_locked()
+
+    # app/trace를 고정한 기록 함수 묶음 반환 (매칭 함수에는 app/trace를 넘기지 않아도 됨)
+    def for_trace(self, app, trace):
+        return TraceSkipLog(self, app, trace)
+
+    def flush_locked(self):
+        if self.file_path and self.buffer:
+            with open(self.file_path, 'a', newline='', encoding='utf-8') as file:
+                csv.writer(file).writerows(self.buffer)
+        self.buffer = []  # 파일 없이 만든 로그는 집계만 유지
+
+    def flush(self):
+        with self.lock:
+            self.flush_locked()
+
+    def summary(self):
+        with self.lock:
+            return {
+                'total': sum(self.reason_counts.values()),
+                'by_reason': dict(self.reason_counts.most_common()),
+                'by_app': {app: dict(counts.most_common()) for app, counts in
+                           sorted(self.app_reason_counts.items(), key=lambda item: -sum(item[1].values()))}
+            }
+
+    def write_summary(self, file_path):
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump(self.summary(), file, indent=4, ensure_ascii=False)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class TraceSkipLog:
+    def __init__(self, skip_log, app, trace):
+        self.skip_log = skip_log
+        self.app = app
+        self.trace = trace
+
+    def record(self, reason, ui, detail=''):
+        self.skip_log.record(reason, ui, self.app, self.trace, detail)
+
+# 이유별 건수와 건너뛴 항목이 많은 앱 top_apps개 출력
+def print_summary(summary, top_apps=10):
+    print(f"Skipped: {summary['total']}")
+    for reason, count in summary['by_reason'].items():
+        print(f"  {reason}: {count}")
+    for app, counts in list(summary['by_app'].items())[:top_apps]:
+        print(f"  {app}: {sum(counts.values())} ({', '.join(f'{reason} {count}' for reason, count in counts.items())})")
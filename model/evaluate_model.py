@@ -0,0 +1,175 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common'))  # 공용 모듈 폴더 (profiler 등)
+import profiler
+
+# model_test.ipynb를 대신하는 헤드리스 평가 스크립트 (CI/배치 노드용)
+# 추론 라이브러리는 선택한 백엔드의 모델 로드 시점에, matplotlib은 --plot을 줄 때만 불러옴
+# 사용 예: python model/evaluate_model.py --output dataset/evaluation_metrics.json --plot dataset/evaluation_plots
+
+POSITIVE_TEST_PATH = 'dataset/positive_test_data.csv'
+NEGATIVE_TEST_PATH = 'dataset/negative_test_data.csv'
+METRICS_PATH = 'dataset/evaluation_metrics.json'
+
+# 테스트 데이터를 학습 때와 같은 축소기로 변환하여 모델 입력 행렬로 준비
+@profiler.timed()
+def prepare_inputs(file_path, reducer, batch_size):
+    from model_train import load_processed_data, transform_descendant_classes, combined_data
+    data, descendant_matrix = load_processed_data(file_path)
+    data = data.drop(columns=['dataset_type'], errors='ignore')
+    reduced = transform_descendant_classes(reducer, data, batch_size, descendant_matrix)
+    return combined_data(data, reduced).astype(np.float32)
+
+# 백엔드별로 모델을 한 번 로드하고 (입력 -> 재구성 MSE) 함수를 반환 (inference_backends.py)
+@profiler.timed()
+def load_scorer(backend, model_path, batch_size):
+    import inference_backends
+    return inference_backends.load_scorer(backend, model_path, batch_size)
+
+@profiler.timed()
+def reconstruction_errors(scorer, inputs):
+    return scorer(inputs)
+
+# 재구성 오류 분포, 산점도, 혼동행렬, ROC 커브를 PNG로 저장
+def save_plots(plot_dir, errors_positive, errors_negative, curve, metrics):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from evaluation import roc_from_curve
+
+    os.makedirs(plot_dir, exist_ok=True)
+    threshold = metrics['threshold']
+
+    plt.figure(figsize=(10, 6))
+    plt.hist(np.log1p(errors_positive), bins=50, alpha=0.5, label='Positive (Normal)', color='blue', density=True)
+    plt.hist(np.log1p(errors_negative), bins=50, alpha=0.5, label='Negative (Anomalous)', color='red', density=True)
+    plt.title('Reconstruction Error Distribution (Log Scale)')
+    plt.xlabel('Reconstruction Error (log(MSE))')
+    plt.ylabel('Density')
+    plt.legend(loc='upper right')
+    plt.savefig(os.path.join(plot_dir, 'error_distribution.png'))
+    plt.close()
+
+    plt.figure(figsize=(10, 6))
+    plt.scatter(range(len(errors_positive)), errors_positive, color='blue', alpha=0.6, label='Positive (Normal)')
+    plt.scatter(range(len(errors_negative)), errors_negative, color='red', alpha=0.6, label='Negative (Anomalous)')
+    plt.axhline(y=threshold, color='green', linestyle='--', label=f'Threshold = {threshold:.4f}')
+    plt.xlabel('Sample Index')
+    plt.ylabel('Reconstruction Error')
+    plt.title('Reconstruction Error Scatter Plot')
+    plt.legend(loc='upper right')
+    plt.savefig(os.path.join(plot_dir, 'error_scatter.png'))
+    plt.close()
+
+    conf_matrix = np.array(metrics['confusion_matrix'])
+    plt.figure(figsize=(6, 4))
+    plt.imshow(conf_matrix, cmap='Blues')
+    for (row, col), value in np.ndenumerate(conf_matrix):
+        plt.text(col, row, str(value), ha='center', va='center')
+    plt.xticks([0, 1], ['Normal', 'Anomalous'])
+    plt.yticks([0, 1], ['Normal', 'Anomalous'])
+    plt.xlabel('Predicted Label')
+    plt.ylabel('True Label')
+    plt.title('Confusion Matrix')
+    plt.savefig(os.path.join(plot_dir, 'confusion_matrix.png'))
+    plt.close()
+
+    fpr, tpr, roc_auc = roc_from_curve(curve)
+    plt.figure(figsize=(8, 6))
+    plt.plot(fpr, tpr, color='darkorange', lw=2, label=f'ROC curve (AUC = {roc_auc:.2f})')
+    plt.plot([0, 1], [0, 1], color='navy', linestyle='--')
+    plt.xlabel('False Positive Rate')
+    plt.ylabel('True Positive Rate')
+    plt.title('Receiver Operating Characteristic (ROC) Curve')
+    plt.legend(loc='lower right')
+    plt.grid(True)
+    plt.savefig(os.path.join(plot_dir, 'roc_curve.png'))
+    plt.close()
+    print(f"Plots saved to: {plot_dir}")
+
+def parse_args():
+    from model_train import REDUCER_PATH
+    from evaluation import CRITERIA, DEFAULT_PERCENTILE
+    from inference_backends import BACKENDS
+    parser = argparse.ArgumentParser(description='Evaluate the tappability autoencoder on the positive/negative test sets')
+    parser.add_argument('--positive', default=POSITIVE_TEST_PATH, help='positive (normal) test CSV written by model_train.py')
+    parser.add_argument('--negative', default=NEGATIVE_TEST_PATH, help='negative (anomalous) test CSV written by model_train.py')
+    parser.add_argument('--backend', choices=BACKENDS, default='keras', help='numpy/onnxruntime/tflite run exported models (numpy_autoencoder.py, export_model.py)')
+    parser.add_argument('--model', help='model path for the backend (default: dataset/unsupervised_autoencoder.<keras|npz|onnx|tflite>)')
+    parser.add_argument('--reducer', default=REDUCER_PATH, help='descendant reducer fitted by model_train.py')
+    parser.add_argument('--batch-size', type=int, default=8192, help='predict batch size')
+    parser.add_argument('--cache', action='store_true', help='score only feature vectors not already in the score cache (score_cache.py)')
+    parser.add_argument('--cache-size', type=int, default=1000000, help='in-memory LRU entries for --cache')
+    parser.add_argument('--cache-db', help='persist --cache scores in this sqlite file across runs')
+    parser.add_argument('--criterion', choices=CRITERIA, default='percentile', help='how to pick the threshold')
+    parser.add_argument('--percentile', type=float, default=DEFAULT_PERCENTILE, help='percentile for --criterion percentile')
+    parser.add_argument('--output', default=METRICS_PATH, help='metrics JSON path')
+    parser.add_argument('--errors-output', help="also write per-sample 'error'/'label' CSV (input of evaluation.py)")
+    parser.add_argument('--plot', metavar='DIR', help='save evaluation plots to DIR (imports matplotlib)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    from model_train import load_descendant_reducer
+    from evaluation import threshold_curve, evaluate_curve
+    from inference_backends import DEFAULT_MODEL_PATHS
+
+    start = time.perf_counter()
+    reducer = load_descendant_reducer(args.reducer)
+    positive_input = prepare_inputs(args.positive, reducer, args.batch_size)
+    negative_input = prepare_inputs(args.negative, reducer, args.batch_size)
+
+    # 모델은 한 번만 로드하고 두 테스트 세트를 한 번의 predict로 점수화
+    scorer = load_scorer(args.backend, args.model, args.batch_size)
+    cache = None
+    if args.cache or args.cache_db:
+        import score_cache
+        cache = score_cache.ScoreCache(score_cache.model_version(args.model or DEFAULT_MODEL_PATHS[args.backend]),
+                                       args.cache_size, args.cache_db)
+        scorer = score_cache.cached_scorer(scorer, cache)
+    errors = reconstruction_errors(scorer, np.concatenate([positive_input, negative_input]))
+    labels = np.r_[np.zeros(len(positive_input), dtype=np.int8), np.ones(len(negative_input), dtype=np.int8)]
+    profiler.count('samples_scored', len(errors))
+
+    curve = threshold_curve(errors, labels)
+    metrics = evaluate_curve(curve, errors, args.criterion, args.percentile)
+    metrics.update({
+        'backend': args.backend,
+        'model': args.model or DEFAULT_MODEL_PATHS[args.backend],
+        'n_positive': int(len(positive_input)),
+        'n_negative': int(len(negative_input)),
+        'elapsed_s': time.perf_counter() - start
+    })
+    if cache is not None:
+        metrics['score_cache'] = cache.stats()
+        score_cache.print_stats(metrics['score_cache'])
+        cache.close()
+
+    print(f"Threshold: {metrics['threshold']:.4f} ({args.criterion})")
+    print(f"Precision: {metrics['precision']:.3f}")
+    print(f"Recall: {metrics['recall']:.3f}")
+    print(f"F1 Score: {metrics['f1']:.3f}")
+    print(f"Accuracy: {metrics['accuracy']:.3f}")
+    print(f"AUC: {metrics['auc']:.3f}")
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(metrics, file, indent=4)
+    print(f"Metrics saved to: {args.output}")
+
+    if args.errors_output:
+        import pandas as pd
+        pd.DataFrame({'error': errors, 'label': labels}).to_csv(args.errors_output, index=False)
+        print(f"Errors saved to: {args.errors_output}")
+    if args.plot:
+        save_plots(args.plot, errors[:len(positive_input)], errors[len(positive_input):], curve, metrics)
+    return metrics
+
+if __name__ == "__main__":
+    with profiler.profile_run('evaluate_model'):
+        main()
@@ -0,0 +1,149 @@
+import json
+import argparse
+import numpy as np
+import pandas as pd
+
+# 재구성 오류 기반 평가: 오류를 한 번만 정렬하고 누적합으로 모든 임계값 후보의 지표를 계산 (O(n log n))
+# 라벨은 model_test.ipynb와 같음: 정상(긍정 데이터) = 0, 이상(부정 데이터) = 1, 오류 > 임계값이면 이상으로 예측
+# 사용 예: python model/evaluation.py errors.csv --criterion f1 --output metrics.json
+
+CRITERIA = ['f1', 'accuracy', 'youden', 'percentile']
+DEFAULT_PERCENTILE = 82.5  # 노트북에서 사용하던 고정 임계값 백분위
+
+def safe_divide(numerator, denominator):
+    numerator = np.asarray(numerator, dtype=np.float64)
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+# 모든 임계값 후보 (최솟값보다 작은 값 + 고유한 오류 값)에 대한 혼동행렬과 지표
+# 임계값 thresholds[i]에서는 오류가 thresholds[i] 이하인 샘플을 정상으로 예측
+# 첫 후보는 모두 이상으로 예측하는 임계값이므로 ROC 커브의 (1, 1) 점이 됨
+def threshold_curve(errors, labels):
+    errors = np.asarray(errors, dtype=np.float64)
+    labels = np.asarray(labels).astype(bool)
+    if errors.size == 0:
+        # 빈 입력은 후보가 없는 빈 커브 (evaluate_curve가 nan 지표를 반환)
+        empty = np.zeros(0, dtype=np.int64)
+        return {
+            'thresholds': np.zeros(0), 'tp': empty, 'fp': empty, 'tn': empty, 'fn': empty,
+            'precision': np.zeros(0), 'recall': np.zeros(0), 'f1': np.zeros(0), 'accuracy': np.zeros(0), 'fpr': np.zeros(0)
+        }
+    order = np.argsort(errors, kind='mergesort')
+    errors = errors[order]
+    labels = labels[order]
+
+    # 같은 오류 값의 마지막 위치에서만 누적 개수를 읽음 (-1은 최솟값보다 작은 후보)
+    last = np.r_[-1, np.flatnonzero(np.diff(errors)), errors.size - 1]
+    n_pos = int(labels.sum())
+    n_neg = errors.size - n_pos
+
+    fn = np.r_[0, np.cumsum(labels)][last + 1]
+    tn = (last + 1) - fn
+    tp = n_pos - fn
+    fp = n_neg - tn
+
+    return {
+        'thresholds': np.r_[np.nextafter(errors[0], -np.inf), errors[last[1:]]],
+        'tp': tp, 'fp': fp, 'tn': tn, 'fn': fn,
+        'precision': safe_divide(tp, tp + fp),
+        'recall': safe_divide(tp, np.full(tp.shape, n_pos)),
+        'f1': safe_divide(2 * tp, 2 * tp + fp + fn),
+        'accuracy': safe_divide(tp + tn, np.full(tp.shape, errors.size)),
+        'fpr': safe_divide(fp, np.full(fp.shape, n_neg))
+    }
+
+# 같은 정렬 결과로 ROC 커브와 AUC 계산 (커브의 첫 후보가 (1, 1) 점)
+# 라벨에 한 클래스만 있거나 입력이 비어 있으면 AUC가 정의되지 않으므로 nan 반환 (sklearn roc_curve와 같음)
+def roc_from_curve(curve):
+    fpr = curve['fpr'][::-1]
+    tpr = curve['recall'][::-1]
+    n_pos = int(curve['tp'][0] + curve['fn'][0]) if len(curve['tp']) else 0
+    n_neg = int(curve['fp'][0] + curve['tn'][0]) if len(curve['tp']) else 0
+    if not n_pos or not n_neg:
+        return fpr, tpr, float('nan')
+    roc_auc = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+    return fpr, tpr, roc_auc
+
+# 기준에 따라 최적 임계값의 위치 선택 (동점이면 낮은 임계값)
+def select_threshold_index(curve, errors, criterion='f1', percentile=DEFAULT_PERCENTILE):
+    if criterion == 'f1':
+        return int(np.argmax(curve['f1']))
+    if criterion == 'accuracy':
+        return int(np.argmax(curve['accuracy']))
+    if criterion == 'youden':
+        return int(np.argmax(curve['recall'] - curve['fpr']))
+    if criterion == 'percentile':
+        # 백분위 값 이하의 가장 큰 후보가 같은 예측을 만듦
+        threshold = np.percentile(errors, percentile)
+        return max(int(np.searchsorted(curve['thresholds'], threshold, side='right')) - 1, 0)
+    raise ValueError(f"Unknown criterion: {criterion}")
+
+# 이미 계산한 커브에서 선택한 임계값의 지표 반환
+def evaluate_curve(curve, errors, criterion='f1', percentile=DEFAULT_PERCENTILE):
+    _, _, roc_auc = roc_from_curve(curve)
+    if not len(curve['thresholds']):
+        # 빈 입력: 임계값과 지표를 nan으로 반환
+        return {
+            'criterion': criterion,
+            'threshold': float('nan'),
+            'precision': float('nan'),
+            'recall': float('nan'),
+            'f1': float('nan'),
+            'accuracy': float('nan'),
+            'confusion_matrix': [[0, 0], [0, 0]],
+            'auc': roc_auc,
+            'n_samples': 0,
+            'n_thresholds': 0
+        }
+    index = select_threshold_index(curve, errors, criterion, percentile)
+    tp, fp, tn, fn = (int(curve[key][index]) for key in ['tp', 'fp', 'tn', 'fn'])
+    return {
+        'criterion': criterion,
+        'threshold': float(curve['thresholds'][index]),
+        'precision': float(curve['precision'][index]),
+        'recall': float(curve['recall'][index]),
+        'f1': float(curve['f1'][index]),
+        'accuracy': float(curve['accuracy'][index]),
+        'confusion_matrix': [[tn, fp], [fn, tp]],  # sklearn confusion_matrix와 같은 배치
+        'auc': roc_auc,
+        'n_samples': tp + fp + tn + fn,
+        'n_thresholds': int(len(curve['thresholds']))
+    }
+
+def evaluate_errors(errors, labels, criterion='f1', percentile=DEFAULT_PERCENTILE):
+    return evaluate_curve(threshold_curve(errors, labels), errors, criterion, percentile)
+
+def curve_to_dataframe(curve):
+    return pd.DataFrame({key: curve[key] for key in ['thresholds', 'precision', 'recall', 'f1', 'accuracy', 'fpr', 'tp', 'fp', 'tn', 'fn']}).rename(columns={'thresholds': 'threshold'})
+
+def main():
+    parser = argparse.ArgumentParser(description='Threshold sweep and metrics for autoencoder reconstruction errors')
+    parser.add_argument('errors', help="CSV with 'error' and 'label' columns (label: 0 = normal, 1 = anomalous)")
+    parser.add_argument('--criterion', choices=CRITERIA, default='f1', help='how to pick the threshold')
+    parser.add_argument('--percentile', type=float, default=DEFAULT_PERCENTILE, help='percentile for --criterion percentile')
+    parser.add_argument('--output', help='write metrics JSON to this path')
+    parser.add_argument('--curve-output', help='write the full threshold curve CSV to this path')
+    args = parser.parse_args()
+
+    recons_df = pd.read_csv(args.errors)
+    errors = recons_df['error'].to_numpy()
+    labels = recons_df['label'].to_numpy()
+    curve = threshold_curve(errors, labels)
+    metrics = evaluate_curve(curve, errors, args.criterion, args.percentile)
+
+    print(f"Threshold: {metrics['threshold']:.4f} ({args.criterion})")
+    print(f"Precision: {metrics['precision']:.3f}")
+    print(f"Recall: {metrics['recall']:.3f}")
+    print(f"F1 Score: {metrics['f1']:.3f}")
+    print(f"Accuracy: {metrics['accuracy']:.3f}")
+    print(f"AUC: {metrics['auc']:.3f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(metrics, file, indent=4)
+        print(f"Metrics saved to: {args.output}")
+    if args.curve_output:
+        curve_to_dataframe(curve).to_csv(args.curve_output, index=False)
+        print(f"Threshold curve saved to: {args.curve_output}")
+
+if __name__ == "__main__":
+    main()
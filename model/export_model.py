@@ -0,0 +1,184 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common'))  # 공용 모듈 폴더 (profiler 등)
+import profiler
+from inference_backends import DEFAULT_MODEL_PATHS
+
+# Keras autoencoder를 ONNX / TFLite로 내보내고 (선택적으로 학습 피처 샘플로 보정한 int8 / float16 양자화),
+# 테스트 세트에서 keras 대비 AUC / Recall 동등성을 확인
+# 사용 예:
+#   python model/export_model.py --format onnx tflite --quantize int8 --check
+#   python model/export_model.py --format tflite --quantize float16 --output-dir dataset/export --check
+
+QUANTIZATIONS = ['none', 'float16', 'int8']
+
+# 학습 분할에서 보정용 입력 샘플을 뽑음 (model_train.py와 같은 분할과 축소기 사용)
+@profiler.timed()
+def load_calibration_inputs(processed_path, reducer_path, n_samples, seed=42):
+    from model_train import load_processed_data, split_data, load_descendant_reducer, transform_descendant_classes, combined_data
+    df, descendant_matrix = load_processed_data(processed_path)
+    train_data = split_data(df)[0]
+    if len(train_data) > n_samples:
+        train_data = train_data.sample(n=n_samples, random_state=seed)
+    reducer = load_descendant_reducer(reducer_path)
+    reduced = transform_descendant_classes(reducer, train_data, descendant_matrix=descendant_matrix)
+    return combined_data(train_data, reduced).astype(np.float32)
+
+def get_export_path(output_dir, extension, quantization):
+    suffix = '' if quantization == 'none' else f'_{quantization}'
+    return os.path.join(output_dir, f'unsupervised_autoencoder{suffix}.{extension}')
+
+@profiler.timed()
+def export_tflite(autoencoder, output_path, quantization='none', calibration_inputs=None):
+    import tensorflow as tf
+    converter = tf.lite.TFLiteConverter.from_keras_model(autoencoder)
+    if quantization == 'float16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == 'int8':
+        # 가중치와 활성값을 int8로 양자화하고 입출력은 float32로 유지 (점수 계산 코드 변경 없음)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: ([calibration_inputs[index:index + 1]] for index in range(len(calibration_inputs)))
+    with open(output_path, 'wb') as file:
+        file.write(converter.convert())
+    return output_path
+
+# onnxruntime 정적 양자화용 보정 데이터 리더
+def make_calibration_reader(input_name, calibration_inputs, batch_size=256):
+    from onnxruntime.quantization import CalibrationDataReader
+
+    class CalibrationReader(CalibrationDataReader):
+        def __init__(self):
+            self.batches = iter([{input_name: calibration_inputs[start:start + batch_size]}
+                                 for start in range(0, len(calibration_inputs), batch_size)])
+
+        def get_next(self):
+            return next(self.batches, None)
+
+    return CalibrationReader()
+
+@profiler.timed()
+def export_onnx(autoencoder, output_path, quantization='none', calibration_inputs=None):
+    if quantization == 'float16':
+        raise ValueError("float16 quantization is only supported for tflite")
+    if quantization == 'none':
+        autoencoder.export(output_path, format='onnx', verbose=False)
+        return output_path
+
+    import onnxruntime
+    from onnxruntime.quantization import quantize_static, QuantFormat, QuantType
+    float_path = f'{output_path}.float.onnx'
+    autoencoder.export(float_path, format='onnx', verbose=False)
+    try:
+        input_name = onnxruntime.InferenceSession(float_path, providers=['CPUExecutionProvider']).get_inputs()[0].name
+        quantize_static(float_path, output_path, make_calibration_reader(input_name, calibration_inputs),
+                        quant_format=QuantFormat.QDQ, activation_type=QuantType.QInt8, weight_type=QuantType.QInt8)
+    finally:
+        os.remove(float_path)
+    return output_path
+
+EXPORTERS = {
+    'onnx': ('onnx', 'onnxruntime', export_onnx),
+    'tflite': ('tflite', 'tflite', export_tflite)
+}
+
+# 테스트 세트에서 백엔드별 AUC / Recall 계산 (evaluate_model.py와 같은 입력과 임계값 기준)
+def evaluate_backends(model_paths, positive_input, negative_input, criterion, batch_size):
+    import inference_backends
+    from evaluation import evaluate_errors
+    inputs = np.concatenate([positive_input, negative_input])
+    labels = np.r_[np.zeros(len(positive_input), dtype=np.int8), np.ones(len(negative_input), dtype=np.int8)]
+
+    results = {}
+    for name, (backend, model_path) in model_paths.items():
+        scorer = inference_backends.load_scorer(backend, model_path, batch_size)
+        metrics = evaluate_errors(scorer(inputs), labels, criterion)
+        results[name] = {'backend': backend, 'model': model_path, 'auc': metrics['auc'], 'recall': metrics['recall'], 'threshold': metrics['threshold']}
+    return results
+
+# keras 결과 대비 AUC / Recall 차이가 허용 오차를 넘는 모델 목록
+def check_parity(results, tolerance):
+    reference = results['keras']
+    failures = []
+    print(f"\n{'model':<40} {'AUC':>8} {'Recall':>8} {'dAUC':>8} {'dRecall':>8}")
+    for name, result in results.items():
+        auc_diff = result['auc'] - reference['auc']
+        recall_diff = result['recall'] - reference['recall']
+        flag = ''
+        if abs(auc_diff) > tolerance or abs(recall_diff) > tolerance:
+            flag = '  PARITY FAIL'
+            failures.append(name)
+        print(f"{name:<40} {result['auc']:8.4f} {result['recall']:8.4f} {auc_diff:+8.4f} {recall_diff:+8.4f}{flag}")
+    return failures
+
+def parse_args():
+    from model_train import PROCESSED_DATA_PATH, REDUCER_PATH
+    from evaluation import CRITERIA
+    from evaluate_model import POSITIVE_TEST_PATH, NEGATIVE_TEST_PATH
+    parser = argparse.ArgumentParser(description='Export the autoencoder to ONNX / TFLite with optional post-training quantization')
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATHS['keras'])
+    parser.add_argument('--format', nargs='+', choices=sorted(EXPORTERS), default=['onnx', 'tflite'])
+    parser.add_argument('--quantize', nargs='+', choices=QUANTIZATIONS, default=['none'], help='int8 is calibrated on a sample of training features')
+    parser.add_argument('--output-dir', default='dataset')
+    parser.add_argument('--processed', default=PROCESSED_DATA_PATH, help='processed dataset used for calibration')
+    parser.add_argument('--reducer', default=REDUCER_PATH)
+    parser.add_argument('--calibration-samples', type=int, default=1000)
+    parser.add_argument('--check', action='store_true', help='compare AUC / recall of each export against keras on the test sets')
+    parser.add_argument('--positive', default=POSITIVE_TEST_PATH)
+    parser.add_argument('--negative', default=NEGATIVE_TEST_PATH)
+    parser.add_argument('--criterion', choices=CRITERIA, default='percentile')
+    parser.add_argument('--tolerance', type=float, default=0.01, help='allowed absolute AUC / recall difference from keras')
+    parser.add_argument('--batch-size', type=int, default=8192)
+    parser.add_argument('--report', help='write the parity results JSON to this path')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    from tensorflow.keras.models import load_model
+    autoencoder = load_model(args.model)
+    autoencoder(np.zeros((1, autoencoder.input_shape[1]), dtype=np.float32))  # Keras 3 export는 한 번 호출된 모델만 지원
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    calibration_inputs = None
+    if 'int8' in args.quantize:
+        calibration_inputs = load_calibration_inputs(args.processed, args.reducer, args.calibration_samples)
+        print(f"Calibration samples: {len(calibration_inputs)}")
+
+    model_paths = {'keras': ('keras', args.model)}
+    for export_format in args.format:
+        extension, backend, exporter = EXPORTERS[export_format]
+        for quantization in args.quantize:
+            if export_format == 'onnx' and quantization == 'float16':
+                print("Skipping onnx float16: only supported for tflite")
+                continue
+            output_path = get_export_path(args.output_dir, extension, quantization)
+            start = time.perf_counter()
+            exporter(autoencoder, output_path, quantization, calibration_inputs)
+            print(f"Exported {output_path} ({os.path.getsize(output_path) / 1024:.1f} KB, {time.perf_counter() - start:.1f}s)")
+            model_paths[os.path.basename(output_path)] = (backend, output_path)
+
+    if args.check:
+        from model_train import load_descendant_reducer
+        from evaluate_model import prepare_inputs
+        reducer = load_descendant_reducer(args.reducer)
+        positive_input = prepare_inputs(args.positive, reducer, args.batch_size)
+        negative_input = prepare_inputs(args.negative, reducer, args.batch_size)
+        results = evaluate_backends(model_paths, positive_input, negative_input, args.criterion, args.batch_size)
+        failures = check_parity(results, args.tolerance)
+
+        if args.report:
+            with open(args.report, 'w', encoding='utf-8') as file:
+                json.dump({'tolerance': args.tolerance, 'criterion': args.criterion, 'results': results, 'failures': failures}, file, indent=4)
+            print(f"Parity report saved to: {args.report}")
+        if failures:
+            raise SystemExit(f"\n{len(failures)} export(s) outside AUC / recall tolerance {args.tolerance}: {', '.join(failures)}")
+        print("\nAll exports within tolerance")
+
+if __name__ == "__main__":
+    with profiler.profile_run('export_model'):
+        main()
@@ -2,26 +2,57 @@
 import warnings
 warnings.filterwarnings('ignore')
 
+import json
+import argparse
+from contextlib import nullcontext
+from multiprocessing import Pool, shared_memory, resource_tracker
 import pandas as pd
 import numpy as np
 import ast
-from sklearn.model_selection import train_test_split
+import os
+import sys
+from collections import Counter
+from scipy import sparse
 from sklearn.preprocessing import MinMaxScaler
-from sklearn.decomposition import PCA
-from sklearn.utils import shuffle
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common'))  # 공용 모듈 폴더 (profiler 등)
+import profiler
+
+POSITIVE_DATA_PATH = 'dataset/positive_original_data.csv'
+NEGATIVE_DATA_PATH = 'dataset/negative_original_data.csv'
+OUTPUT_PATH = 'dataset/processed_dataset.csv'
+ARTIFACTS_PATH = 'dataset/feature_artifacts.json'  # 학습된 클래스 어휘와 MinMax 범위 (추론/재학습 시 재사용)
+
+# 화면 해상도 정보
+SCREEN_WIDTH = 1440
+SCREEN_HEIGHT = 2560
+
+SPACING_COLUMNS = ['top_spacing', 'bottom_spacing', 'left_spacing', 'right_spacing']
+GEOMETRY_FEATURES = ['center_X', 'center_Y', 'Spacing', 'Size']
+MINMAX_FEATURES = ['siblings_cnt', 'Hierarchy_Depth', 'Nesting_Level', 'descendant_count']  # MinMaxScaler를 적용할 피처
+
+FEATURE_COLUMNS = ["dataset_type", "bounds", "classified_class",
+                   "siblings_cnt", "Hierarchy_Depth", "Nesting_Level",
+                   "top_spacing", "bottom_spacing", "left_spacing", "right_spacing",
+                   "total_components", "descendant_count", 'descendant_classes']
 
 # 데이터 불러오기 및 결합
-df = pd.read_csv('dataset/positive_original_data.csv')
-ndf = pd.read_csv('dataset/negative_original_data.csv')
+def load_data(positive_path=POSITIVE_DATA_PATH, negative_path=NEGATIVE_DATA_PATH):
+    df = pd.read_csv(positive_path)
+    ndf = pd.read_csv(negative_path)
+
+    df['dataset_type'] = 1
+    ndf['dataset_type'] = 0
+    df = pd.concat([df, ndf], ignore_index=True)
 
-df['dataset_type'] = 1
-ndf['dataset_type'] = 0
-df = pd.concat([df, ndf], ignore_index=True)
+    return df[FEATURE_COLUMNS]
 
-df = df[["dataset_type", "bounds", "classified_class", 
-         "siblings_cnt", "Hierarchy_Depth", "Nesting_Level", 
-         "top_spacing", "bottom_spacing", "left_spacing", "right_spacing", 
-         "total_components", "descendant_count", 'descendant_classes']]
+# 메모리보다 큰 데이터를 위해 긍정/부정 데이터를 chunksize 행씩 순서대로 읽기
+def iter_data_chunks(chunksize, positive_path=POSITIVE_DATA_PATH, negative_path=NEGATIVE_DATA_PATH):
+    for file_path, dataset_type in [(positive_path, 1), (negative_path, 0)]:
+        for chunk in pd.read_csv(file_path, chunksize=chunksize):
+            chunk['dataset_type'] = dataset_type
+            yield chunk[FEATURE_COLUMNS]
 
 # 문자열을 리스트로 안전하게 변환
 def safe_literal_eval(val):
@@ -32,12 +63,8 @@ def safe_literal_eval(val):
     except (ValueError, SyntaxError):
         return []
 
-df['descendant_classes'] = df['descendant_classes'].apply(lambda x: safe_literal_eval(x) if isinstance(x, str) else x)
-# 데이터프레임의 모든 고유 클래스 유형 리스트를 생성
-unique_descendant_classes = set([cls for sublist in df['descendant_classes'] for cls in sublist])
-
 # 각 행의 형제 요소의 반복성을 반영하여 빈도수를 계산하는 함수
-def encode_descendant_classes(descendant_list):
+def encode_descendant_classes(descendant_list, unique_descendant_classes):
     counts = {cls: 0 for cls in unique_descendant_classes}  # 모든 고유 클래스 유형에 대해 초기화
     if descendant_list:  # 형제가 존재하는 경우에만 계산
         for descendant_class in descendant_list:
@@ -45,20 +72,10 @@ def encode_descendant_classes(descendant_list):
                 counts[descendant_class] += 1
     return [counts[cls] for cls in unique_descendant_classes]  # 고유 클래스 순서대로 빈도를 반환
 
-# 형제 요소의 빈도를 반영한 결과를 새로운 열에 추가
-df['descendant_classes_encoded'] = df['descendant_classes'].apply(encode_descendant_classes)
-
 # 빈도수를 스케일링하는 함수
 def scale_encoded_classes(encoded_list, total_count):
     return [count / total_count if total_count > 0 else 0 for count in encoded_list]
 
-df['descendant_classes_encoded'] = df.apply(
-    lambda row: scale_encoded_classes(row['descendant_classes_encoded'], row['descendant_count']), axis=1
-)
-
-# 'classified_class'가 'Other'이고 'data_type'이 0인 행 제거
-df = df[~((df['classified_class'] == 'Other') & (df['dataset_type'] == 1))]
-
 # classified_class 원핫 인코딩 함수
 def encode_class(classified_class):
     # 기본적으로 모든 값을 0으로 설정하고, 해당 클래스에 1을 설정
@@ -70,48 +87,326 @@ def encode_class(classified_class):
     elif classified_class == 'Other':
         encoded[2] = 1
     return encoded
-    
-# df에 적용
-df['classified_class_encoded'] = df['classified_class'].apply(encode_class)
-df['classified_class_encoded'] = df['classified_class_encoded'].apply(lambda x: safe_literal_eval(x) if isinstance(x, str) else x)
 
-# 기존 데이터프레임(df)과 분리된 피처들을 결합
-df = pd.concat([df.reset_index(drop=True)], axis=1)
+# bounds 열 ("[left, top, right, bottom]" 문자열 또는 리스트)을 (N, 4) 배열로 변환
+# 행마다 ast.literal_eval 하지 않고 전체 문자열을 한 번에 숫자로 변환
+def parse_bounds(bounds):
+    if len(bounds) == 0:
+        return np.empty((0, 4), dtype=np.float64)
+    if not isinstance(bounds.iloc[0], str):
+        return np.asarray(bounds.tolist(), dtype=np.float64).reshape(-1, 4)
+    text = bounds.str.replace(r'[\[\]\s]', '', regex=True)
+    return np.array(','.join(text).split(','), dtype=np.float64).reshape(-1, 4)
+
+# bounds (N, 4)와 spacing (N, 4: top, bottom, left, right)으로 center_X, center_Y, Spacing, Size를 한 번에 계산
+# 중간 열을 만들지 않고 미리 할당한 float32 배열 out에 바로 기록
+def compute_geometry_features(bounds, spacing, out=None):
+    if out is None:
+        out = np.empty((len(bounds), len(GEOMETRY_FEATURES)), dtype=np.float32)
+    left, top, right, bottom = bounds[:, 0], bounds[:, 1], bounds[:, 2], bounds[:, 3]
+    top_spacing, bottom_spacing, left_spacing, right_spacing = spacing[:, 0], spacing[:, 1], spacing[:, 2], spacing[:, 3]
+    width = right - left  # Width : right - left
+    height = bottom - top  # Height : bottom - top
+
+    np.divide(width / 2 + left, SCREEN_WIDTH, out=out[:, 0])  # center_X
+    np.divide(height / 2 + top, SCREEN_HEIGHT, out=out[:, 1])  # center_Y
+    np.divide((bottom_spacing - top_spacing) * (right_spacing - left_spacing), SCREEN_WIDTH * SCREEN_HEIGHT, out=out[:, 2])  # Spacing
+
+    # Size: 화면 크기로 정규화한 넓이, 로그 변환 전에 값에 1을 더해 음수값 방지
+    size = (width / SCREEN_WIDTH) * (height / SCREEN_HEIGHT) / (SCREEN_WIDTH * SCREEN_HEIGHT)
+    np.log(size + 1, out=out[:, 3])
+    return out
+
+def parse_descendant_classes(descendant_classes):
+    return descendant_classes.apply(lambda x: safe_literal_eval(x) if isinstance(x, str) else x)
+
+# 데이터프레임의 모든 고유 클래스 유형 리스트를 생성 (실행마다 같은 순서가 되도록 정렬)
+def get_descendant_vocabulary(descendant_classes):
+    return sorted(set([cls for sublist in descendant_classes for cls in sublist]))
+
+# 'classified_class'가 'Other'이고 'data_type'이 1인 행 제거
+def drop_other_positive_rows(df):
+    return df[~((df['classified_class'] == 'Other') & (df['dataset_type'] == 1))]
+
+# --sparse 모드: descendant 빈도 벡터를 CSV 열 대신 별도 CSR 행렬 (.npz)로 저장, CSV의 i번째 행 = 행렬의 i번째 행
+def get_descendant_matrix_path(csv_path):
+    return f'{os.path.splitext(csv_path)[0]}_descendant_classes.npz'
+
+# encode_descendant_classes + scale_encoded_classes와 같은 값을 0이 아닌 항목만 CSR 행렬로 생성
+def encode_descendant_matrix(descendant_lists, descendant_counts, unique_descendant_classes):
+    class_index = {cls: index for index, cls in enumerate(unique_descendant_classes)}
+    indptr, indices, data = [0], [], []
+    for descendant_list, total_count in zip(descendant_lists, descendant_counts):
+        if total_count > 0 and descendant_list:
+            counts = Counter(class_index[cls] for cls in descendant_list if cls in class_index)
+            for index in sorted(counts):
+                indices.append(index)
+                data.append(counts[index] / total_count)
+        indptr.append(len(indices))
+    return sparse.csr_matrix((np.array(data, dtype=np.float64), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+                             shape=(len(indptr) - 1, len(unique_descendant_classes)))
+
+# 인코딩된 열과 bounds 배열을 데이터프레임에 붙이고 기하 피처 계산 (descendant_encoded가 None이면 열 생략)
+def assemble_features(df, descendant_encoded, class_encoded, bounds):
+    df = df.reset_index(drop=True)
+    if descendant_encoded is not None:
+        df['descendant_classes_encoded'] = descendant_encoded
+    df['classified_class_encoded'] = class_encoded
+
+    with profiler.stage('geometry_features'):
+        geometry = compute_geometry_features(bounds, df[SPACING_COLUMNS].to_numpy(dtype=np.float64))
+        df = df.drop(columns=['classified_class', 'descendant_classes', 'bounds', 'total_components'] + SPACING_COLUMNS)
+        df[GEOMETRY_FEATURES] = geometry
+
+    profiler.count('rows', len(df))
+    return df
+
+# 행 단위 인코딩 (MinMax 스케일링 제외): descendant_classes는 이미 리스트로 변환된 상태
+# sparse_output=True면 descendant 빈도는 CSV 열 대신 CSR 행렬로 반환
+def encode_features(df, unique_descendant_classes, sparse_output=False):
+    df = drop_other_positive_rows(df)
+
+    with profiler.stage('encode_descendant_classes'):
+        if sparse_output:
+            descendant_matrix = encode_descendant_matrix(df['descendant_classes'], df['descendant_count'], unique_descendant_classes)
+            descendant_encoded = None
+        else:
+            # 형제 요소의 빈도를 반영한 결과를 새로운 열에 추가
+            descendant_matrix = None
+            descendant_encoded = [scale_encoded_classes(encode_descendant_classes(descendant_list, unique_descendant_classes), total_count)
+                                  for descendant_list, total_count in zip(df['descendant_classes'], df['descendant_count'])]
+
+    with profiler.stage('encode_class'):
+        class_encoded = [encode_class(classified_class) for classified_class in df['classified_class']]
+
+    return assemble_features(df, descendant_encoded, class_encoded, parse_bounds(df['bounds'])), descendant_matrix
+
+# --jobs 모드: 행을 shard로 나누어 프로세스 풀에서 인코딩
+# 워커는 결과를 공유 메모리의 float64 배열 (descendant 빈도 | class 원핫 | bounds)로 돌려주고, 부모가 읽은 뒤 해제
+# 풀은 make_pool로 만들어 워커가 부모의 resource tracker를 공유하도록 함: 워커가 만든 블록은 부모의 unlink()로 등록 해제되고, 중단되면 tracker가 정리
+
+def make_pool(jobs):
+    # tracker가 아직 없으면 워커마다 자기 tracker를 띄워 부모가 unlink한 블록을 종료 시 누수로 보고하므로 풀보다 먼저 시작
+    resource_tracker.ensure_running()
+    return Pool(jobs)
+
+def split_shards(n_rows, jobs):
+    shard_size = max(1, -(-n_rows // (jobs * 4)))  # 워커 간 부하 균형을 위해 워커 수보다 잘게 분할
+    return [(start, min(start + shard_size, n_rows)) for start in range(0, n_rows, shard_size)]
+
+def shard_vocabulary(descendant_classes):
+    return get_descendant_vocabulary(parse_descendant_classes(pd.Series(descendant_classes, dtype=object)))
+
+def encode_shard(shard):
+    descendant_classes, descendant_counts, classified_classes, bounds, unique_descendant_classes = shard
+    n_classes = len(unique_descendant_classes)
+    n_rows = len(descendant_classes)
+    width = n_classes + 3 + 4
+
+    shm = shared_memory.SharedMemory(create=True, size=max(n_rows * width * 8, 1))
+    block = np.ndarray((n_rows, width), dtype=np.float64, buffer=shm.buf)
+
+    descendant_lists = parse_descendant_classes(pd.Series(descendant_classes, dtype=object))
+    for row, (descendant_list, total_count, classified_class) in enumerate(zip(descendant_lists, descendant_counts, classified_classes)):
+        block[row, :n_classes] = scale_encoded_classes(encode_descendant_classes(descendant_list, unique_descendant_classes), total_count)
+        block[row, n_classes:n_classes + 3] = encode_class(classified_class)
+    block[:, n_classes + 3:] = parse_bounds(pd.Series(bounds, dtype=object))
+
+    del block
+    shm.close()  # 해제 (unlink)는 read_shard에서 부모가 담당
+    return shm.name, n_rows
+
+def read_shard(name, n_rows, n_classes, descendant_counts):
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        block = np.ndarray((n_rows, n_classes + 3 + 4), dtype=np.float64, buffer=shm.buf)
+        descendant_encoded = block[:, :n_classes].tolist()
+        class_encoded = block[:, n_classes:n_classes + 3].astype(np.int64).tolist()
+        bounds = block[:, n_classes + 3:].copy()
+        del block
+    finally:
+        shm.close()
+        shm.unlink()
+
+    # 단일 프로세스 경로와 같은 출력을 위해 descendant_count가 0인 행은 정수 0 리스트로 기록
+    for row, total_count in enumerate(descendant_counts):
+        if not total_count > 0:
+            descendant_encoded[row] = [0] * n_classes
+    return descendant_encoded, class_encoded, bounds
+
+def parallel_vocabulary(descendant_classes, pool, jobs):
+    shards = [descendant_classes.iloc[start:end].tolist() for start, end in split_shards(len(descendant_classes), jobs)]
+    vocabulary = set()
+    for shard_classes in pool.map(shard_vocabulary, shards):
+        vocabulary.update(shard_classes)
+    return sorted(vocabulary)
+
+# encode_features와 같은 결과를 프로세스 풀로 계산 (descendant_classes는 문자열 상태)
+def encode_features_parallel(df, unique_descendant_classes, pool, jobs):
+    df = drop_other_positive_rows(df)
+    shard_ranges = split_shards(len(df), jobs)
+    columns = [df[column].tolist() for column in ['descendant_classes', 'descendant_count', 'classified_class', 'bounds']]
+    shards = [tuple(values[start:end] for values in columns) + (unique_descendant_classes,) for start, end in shard_ranges]
+
+    descendant_encoded, class_encoded, bounds = [], [], []
+    with profiler.stage('encode_shards'):
+        for (start, end), (name, n_rows) in zip(shard_ranges, pool.imap(encode_shard, shards)):
+            shard_descendant, shard_class, shard_bounds = read_shard(name, n_rows, len(unique_descendant_classes), columns[1][start:end])
+            descendant_encoded.extend(shard_descendant)
+            class_encoded.extend(shard_class)
+            bounds.append(shard_bounds)
+
+    bounds = np.concatenate(bounds) if bounds else np.empty((0, 4), dtype=np.float64)
+    return assemble_features(df, descendant_encoded, class_encoded, bounds), None
+
+def get_feature_artifacts(unique_descendant_classes, scaler):
+    return {
+        'descendant_classes': list(unique_descendant_classes),
+        'minmax_features': MINMAX_FEATURES,
+        'data_min': scaler.data_min_.tolist(),
+        'data_max': scaler.data_max_.tolist()
+    }
+
+def save_feature_artifacts(artifacts, file_path=ARTIFACTS_PATH):
+    with open(file_path, 'w', encoding='utf-8') as file:
+        json.dump(artifacts, file, indent=4, ensure_ascii=False)
+
+def load_feature_artifacts(file_path=ARTIFACTS_PATH):
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+# 저장된 min/max로 학습 때와 같은 MinMaxScaler 복원
+def scaler_from_artifacts(artifacts):
+    scaler = MinMaxScaler()
+    scaler.fit(pd.DataFrame([artifacts['data_min'], artifacts['data_max']], columns=artifacts['minmax_features']))
+    return scaler
+
+# 저장된 아티팩트로 새 데이터를 학습 때와 같은 열 구성/스케일로 인코딩 (warm start 재학습용)
+# 어휘에 없는 descendant 클래스는 무시하여 입력 차원을 유지
+# (데이터프레임, descendant CSR 행렬 또는 None) 반환
+def transform_features(df, artifacts, sparse_output=False):
+    with profiler.stage('literal_eval'):
+        df['descendant_classes'] = parse_descendant_classes(df['descendant_classes'])
+    df, descendant_matrix = encode_features(df, artifacts['descendant_classes'], sparse_output)
+
+    with profiler.stage('minmax_scale'):
+        df[MINMAX_FEATURES] = scaler_from_artifacts(artifacts).transform(df[MINMAX_FEATURES])
+    return df, descendant_matrix
+
+# 프로세스 풀 경로 (encode_features_parallel)는 descendant 빈도를 CSV 열로만 만듦
+def check_jobs_options(jobs, sparse_output):
+    if sparse_output and jobs > 1:
+        raise ValueError('sparse_output is only supported with jobs=1')
+
+# 전체 데이터를 메모리에 올려 인코딩하고 스케일링 (jobs > 1이면 프로세스 풀 사용)
+# (데이터프레임, 학습된 아티팩트, descendant CSR 행렬 또는 None) 반환
+def build_features(df, jobs=1, sparse_output=False):
+    check_jobs_options(jobs, sparse_output)
+    if jobs > 1:
+        with make_pool(jobs) as pool:
+            unique_descendant_classes = parallel_vocabulary(df['descendant_classes'], pool, jobs)
+            df, descendant_matrix = encode_features_parallel(df, unique_descendant_classes, pool, jobs)
+    else:
+        with profiler.stage('literal_eval'):
+            df['descendant_classes'] = parse_descendant_classes(df['descendant_classes'])
+        unique_descendant_classes = get_descendant_vocabulary(df['descendant_classes'])
+
+        df, descendant_matrix = encode_features(df, unique_descendant_classes, sparse_output)
+
+    with profiler.stage('minmax_scale'):
+        scaler = MinMaxScaler()
+        df[MINMAX_FEATURES] = scaler.fit_transform(df[MINMAX_FEATURES])
+
+    return df, get_feature_artifacts(unique_descendant_classes, scaler), descendant_matrix
+
+# 데이터를 chunksize 행씩 두 번 스트리밍하여 처리 (메모리 사용량은 chunk 크기에 비례)
+# 1단계: 클래스 어휘와 MinMax 범위를 학습, 2단계: chunk마다 인코딩/스케일링 후 출력 파일에 추가
+# (학습된 아티팩트, descendant CSR 행렬 또는 None) 반환
+def build_features_chunked(chunksize, output_path=OUTPUT_PATH, jobs=1, sparse_output=False):
+    check_jobs_options(jobs, sparse_output)
+    with make_pool(jobs) if jobs > 1 else nullcontext() as pool:
+        return stream_chunks(chunksize, output_path, pool, jobs, sparse_output)
+
+def stream_chunks(chunksize, output_path, pool, jobs, sparse_output):
+    vocabulary = set()
+    scaler = MinMaxScaler()
+    for chunk in iter_data_chunks(chunksize):
+        if pool:
+            vocabulary.update(parallel_vocabulary(chunk['descendant_classes'], pool, jobs))
+        else:
+            with profiler.stage('literal_eval'):
+                descendant_classes = parse_descendant_classes(chunk['descendant_classes'])
+            vocabulary.update(get_descendant_vocabulary(descendant_classes))
+
+        chunk = drop_other_positive_rows(chunk)
+        if len(chunk):
+            with profiler.stage('minmax_fit'):
+                scaler.partial_fit(chunk[MINMAX_FEATURES])
+    unique_descendant_classes = sorted(vocabulary)
+
+    first_chunk = True
+    descendant_matrices = []
+    for chunk in iter_data_chunks(chunksize):
+        if pool:
+            chunk, descendant_matrix = encode_features_parallel(chunk, unique_descendant_classes, pool, jobs)
+        else:
+            with profiler.stage('literal_eval'):
+                chunk['descendant_classes'] = parse_descendant_classes(chunk['descendant_classes'])
+            chunk, descendant_matrix = encode_features(chunk, unique_descendant_classes, sparse_output)
+        if not len(chunk):
+            continue
+        if descendant_matrix is not None:
+            descendant_matrices.append(descendant_matrix)
 
-# bounds가 문자열로 저장된 경우 리스트로 변환
-df['bounds'] = df['bounds'].apply(lambda x: ast.literal_eval(x) if isinstance(x, str) else x)
+        with profiler.stage('minmax_scale'):
+            chunk[MINMAX_FEATURES] = scaler.transform(chunk[MINMAX_FEATURES])
 
-# bounds 데이터를 'left', 'top', 'right', 'bottom'으로 분리
-df[['bounds_left', 'bounds_top', 'bounds_right', 'bounds_bottom']] = pd.DataFrame(df['bounds'].tolist(), index=df.index)
+        with profiler.stage('write_csv'):
+            chunk.to_csv(output_path, mode='w' if first_chunk else 'a', header=first_chunk, index=False)
+        first_chunk = False
 
-df['Width'] = (df['bounds_right'] - df['bounds_left'])  # Width : right - left
-df['Height'] = (df['bounds_bottom'] - df['bounds_top'])  # Height : bottom - top
+    descendant_matrix = sparse.vstack(descendant_matrices, format='csr') if sparse_output and descendant_matrices else None
+    return get_feature_artifacts(unique_descendant_classes, scaler), descendant_matrix
 
-df['center_X'] = ((df['Width'] / 2) + df['bounds_left']) / 1440
-df['center_Y'] = ((df['Height'] / 2) + df['bounds_top']) / 2560
+def parse_args():
+    parser = argparse.ArgumentParser(description='Build the processed feature dataset')
+    parser.add_argument('--chunksize', type=int, help='stream the input in chunks of this many rows instead of loading it at once')
+    parser.add_argument('--jobs', type=int, default=1, help='encode rows in this many worker processes')
+    parser.add_argument('--sparse', action='store_true', help='store descendant class frequencies as a CSR matrix next to the output CSV')
+    parser.add_argument('--output', default=OUTPUT_PATH)
+    parser.add_argument('--artifacts', default=ARTIFACTS_PATH, help='where to save the fitted class vocabulary and min/max ranges')
+    args = parser.parse_args()
+    if args.sparse and args.jobs > 1:
+        parser.error('--sparse is only supported with --jobs 1')
+    return args
 
-df['Width'] = df['Width'] / 1440
-df['Height'] = df['Height'] / 2560
+def main():
+    args = parse_args()
+    file_path = args.output
 
-df["Spacing"] = (df["bottom_spacing"] - df["top_spacing"]) * (df["right_spacing"] - df["left_spacing"]) / (1440 * 2560)
-df['Size'] = (df['Width'] * df['Height']) / (1440 * 2560)
+    if args.chunksize:
+        artifacts, descendant_matrix = build_features_chunked(args.chunksize, file_path, args.jobs, args.sparse)
+    else:
+        with profiler.stage('read_csv'):
+            df = load_data()
 
-df.drop(columns=['classified_class', 'descendant_classes'], inplace=True)
-df.drop(columns=['left_spacing', 'top_spacing', 'right_spacing', 'bottom_spacing'], inplace=True)
-df.drop(columns=['bounds', 'bounds_left', 'bounds_top', 'bounds_right', 'bounds_bottom'], inplace=True)
-df.drop(columns=['Width', 'Height'], inplace=True)
-df.drop(columns=['total_components'], inplace=True)
+        df, artifacts, descendant_matrix = build_features(df, args.jobs, args.sparse)
 
-# MinMaxScaler를 적용할 피처만 따로 선택
-minmax_feats = ['siblings_cnt', 'Hierarchy_Depth', 'Nesting_Level', 'descendant_count']
+        with profiler.stage('write_csv'):
+            df.to_csv(file_path, index=False)
 
-# MinMaxScaler 적용
-scaler = MinMaxScaler()
-df[minmax_feats] = scaler.fit_transform(df[minmax_feats])
+    matrix_path = get_descendant_matrix_path(file_path)
+    if args.sparse:
+        if descendant_matrix is None:
+            descendant_matrix = sparse.csr_matrix((0, len(artifacts['descendant_classes'])))
+        sparse.save_npz(matrix_path, descendant_matrix)
+        print("Descendant class matrix saved to:", matrix_path)
+    elif os.path.exists(matrix_path):
+        os.remove(matrix_path)  # 이전 --sparse 실행의 행렬이 새 CSV와 섞이지 않도록 제거
 
-# 로그 변환 전에 값에 1을 더해 음수값 방지
-df['Size'] = np.log(df['Size'] + 1)
+    save_feature_artifacts(artifacts, args.artifacts)
+    print("Dataset successfully saved to:", file_path)
 
-file_path = 'dataset/processed_dataset.csv'
-df.to_csv(file_path, index=False)
-print("Dataset successfully saved to:", file_path)
+if __name__ == "__main__":
+    with profiler.profile_run('feature'):
+        main()
@@ -0,0 +1,115 @@
+import numpy as np
+
+# 점수 계산용 추론 백엔드 전환: keras / numpy / onnxruntime / tflite
+# 각 백엔드의 라이브러리는 해당 백엔드를 선택했을 때만 불러옴
+# onnx / tflite 모델은 export_model.py로 만듦
+
+BACKENDS = ['keras', 'numpy', 'onnxruntime', 'tflite']
+DEFAULT_MODEL_PATHS = {
+    'keras': 'dataset/unsupervised_autoencoder.keras',
+    'numpy': 'dataset/unsupervised_autoencoder.npz',
+    'onnxruntime': 'dataset/unsupervised_autoencoder.onnx',
+    'tflite': 'dataset/unsupervised_autoencoder.tflite'
+}
+
+def load_keras_predictor(model_path, batch_size):
+    from tensorflow.keras.models import load_model
+    autoencoder = load_model(model_path)
+
+    def predict(inputs):
+        if not len(inputs):
+            return np.empty((0, autoencoder.output_shape[1]), dtype=np.float32)  # 빈 입력은 predict가 실패하므로 바로 반환
+        return autoencoder.predict(inputs, batch_size=batch_size, verbose=0)
+    return predict
+
+def load_numpy_predictor(model_path, batch_size):
+    import numpy_autoencoder
+    layers = numpy_autoencoder.load_weights(model_path)
+    return lambda inputs: numpy_autoencoder.predict(layers, inputs, batch_size)
+
+def load_onnxruntime_predictor(model_path, batch_size):
+    import onnxruntime
+    session = onnxruntime.InferenceSession(model_path, providers=['CPUExecutionProvider'])
+    input_name = session.get_inputs()[0].name
+
+    def predict(inputs):
+        inputs = np.asarray(inputs, dtype=np.float32)
+        if not len(inputs):
+            return np.empty((0, session.get_outputs()[0].shape[1]), dtype=np.float32)  # 실행할 배치가 없으면 concatenate가 실패하므로 바로 반환
+        return np.concatenate([session.run(None, {input_name: inputs[start:start + batch_size]})[0]
+                               for start in range(0, len(inputs), batch_size)])
+    return predict
+
+def load_tflite_interpreter(model_path):
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter(model_path=model_path)
+
+def load_tflite_predictor(model_path, batch_size):
+    interpreter = load_tflite_interpreter(model_path)
+    input_index = interpreter.get_input_details()[0]['index']
+    output_index = interpreter.get_output_details()[0]['index']
+    input_size = interpreter.get_input_details()[0]['shape'][1]
+    output_size = interpreter.get_output_details()[0]['shape'][1]
+    allocated = [None]
+
+    # 배치 크기가 바뀔 때만 텐서를 다시 할당 (보통 마지막 배치 한 번)
+    def run_batch(batch):
+        if allocated[0] != len(batch):
+            interpreter.resize_tensor_input(input_index, [len(batch), input_size])
+            interpreter.allocate_tensors()
+            allocated[0] = len(batch)
+        interpreter.set_tensor(input_index, batch)
+        interpreter.invoke()
+        return interpreter.get_tensor(output_index)
+
+    def predict(inputs):
+        inputs = np.asarray(inputs, dtype=np.float32)
+        if not len(inputs):
+            return np.empty((0, output_size), dtype=np.float32)
+        return np.concatenate([run_batch(inputs[start:start + batch_size]) for start in range(0, len(inputs), batch_size)])
+    return predict
+
+LOADERS = {
+    'keras': load_keras_predictor,
+    'numpy': load_numpy_predictor,
+    'onnxruntime': load_onnxruntime_predictor,
+    'tflite': load_tflite_predictor
+}
+
+# (입력 -> 재구성 결과) 함수 반환
+def load_predictor(backend, model_path=None, batch_size=8192):
+    if backend not in LOADERS:
+        raise ValueError(f"Unknown backend: {backend} (choose from {BACKENDS})")
+    return LOADERS[backend](model_path or DEFAULT_MODEL_PATHS[backend], batch_size)
+
+# 모델의 입력 차원
+def get_input_size(backend, model_path=None):
+    model_path = model_path or DEFAULT_MODEL_PATHS[backend]
+    if backend == 'keras':
+        from tensorflow.keras.models import load_model
+        return load_model(model_path).input_shape[1]
+    if backend == 'numpy':
+        import numpy_autoencoder
+        return numpy_autoencoder.load_weights(model_path)[0][0].shape[0]
+    if backend == 'onnxruntime':
+        import onnxruntime
+        return onnxruntime.InferenceSession(model_path, providers=['CPUExecutionProvider']).get_inputs()[0].shape[1]
+    return load_tflite_interpreter(model_path).get_input_details()[0]['shape'][1]
+
+# (입력 -> 재구성 MSE) 함수 반환 (numpy 백엔드는 재구성 결과를 만들지 않는 fused 경로 사용)
+def load_scorer(backend, model_path=None, batch_size=8192):
+    if backend == 'numpy':
+        import numpy_autoencoder
+        layers = numpy_autoencoder.load_weights(model_path or DEFAULT_MODEL_PATHS[backend])
+        return lambda inputs: numpy_autoencoder.reconstruction_errors(layers, inputs, batch_size)
+
+    predict = load_predictor(backend, model_path, batch_size)
+
+    def score(inputs):
+        inputs = np.asarray(inputs, dtype=np.float32)
+        return np.mean(np.square(inputs - predict(inputs)), axis=1)
+    return score
@@ -4,17 +4,36 @@ warnings.filterwarnings('ignore')
 # 기본 라이브러리 및 설정
 import pandas as pd
 import numpy as np
+import os
+import sys
 import ast
-from sklearn.decomposition import PCA
+import argparse
+import joblib
+from scipy import sparse
+from sklearn.decomposition import IncrementalPCA, TruncatedSVD
 from sklearn.model_selection import train_test_split
 from sklearn.utils import shuffle
-from tensorflow.keras import Model
-from tensorflow.keras.layers import Dense, Input, Dropout
-from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping
-from tensorflow.keras.optimizers import Adam
-from tensorflow.keras.regularizers import l2
 
-df = pd.read_csv('dataset/processed_dataset.csv')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common'))  # 공용 모듈 폴더 (profiler 등)
+import profiler
+from feature import get_descendant_matrix_path
+
+PROCESSED_DATA_PATH = 'dataset/processed_dataset.csv'
+MODEL_PATH = 'dataset/unsupervised_autoencoder.keras'
+REDUCER_PATH = 'dataset/descendant_reducer.joblib'  # 학습 데이터로 학습한 descendant 차원 축소기 (검증/테스트/추론에서 재사용)
+
+BASE_BATCH_SIZE = 64
+BASE_LEARNING_RATE = 0.0003
+# --cpu-perf 프리셋: 큰 배치 + 학습률 스케일링 + 여러 step을 한 번에 실행, 모든 코어 사용 (명시한 옵션이 우선)
+# 이 정도 크기의 모델에서는 CPU XLA가 oneDNN 커널보다 느려 jit_compile은 프리셋에서 제외 (--jit-compile로 선택)
+CPU_PERF_PRESET = {
+    'batch_size': 1024,
+    'lr_scaling': 'sqrt',
+    'jit_compile': False,
+    'steps_per_execution': 32,
+    'intra_op_threads': os.cpu_count() or 1,
+    'inter_op_threads': 2
+}
 
 # 텍스트 데이터를 리스트로 변환
 def safe_literal_eval(val):
@@ -25,103 +44,246 @@ def safe_literal_eval(val):
     except (ValueError, SyntaxError):
         return []
 
-df['classified_class_encoded'] = df['classified_class_encoded'].apply(lambda x: safe_literal_eval(x) if isinstance(x, str) else x)
-df['descendant_classes_encoded'] = df['descendant_classes_encoded'].apply(lambda x: safe_literal_eval(x) if isinstance(x, str) else x)
+# (데이터프레임, descendant CSR 행렬 또는 None) 반환
+# feature.py --sparse로 만든 데이터는 descendant_classes_encoded 열 대신 CSR 행렬 (.npz)을 사용
+def load_processed_data(file_path=PROCESSED_DATA_PATH):
+    with profiler.stage('read_csv'):
+        df = pd.read_csv(file_path)
+
+    descendant_matrix = None
+    with profiler.stage('literal_eval'):
+        df['classified_class_encoded'] = df['classified_class_encoded'].apply(lambda x: safe_literal_eval(x) if isinstance(x, str) else x)
+        if 'descendant_classes_encoded' in df.columns:
+            df['descendant_classes_encoded'] = df['descendant_classes_encoded'].apply(lambda x: safe_literal_eval(x) if isinstance(x, str) else x)
+        else:
+            descendant_matrix = sparse.load_npz(get_descendant_matrix_path(file_path)).tocsr()
+    return df, descendant_matrix
+
+# descendant 빈도 벡터 반환: CSR 행렬이 있으면 데이터프레임 인덱스 (= 파일의 행 번호)로 행을 선택
+def get_descendant_vectors(data, descendant_matrix=None):
+    if descendant_matrix is not None:
+        return descendant_matrix[data.index.to_numpy()]
+    return np.stack(data['descendant_classes_encoded'].values)
+
+# 미니배치 범위 목록 (IncrementalPCA는 배치 크기가 n_components 이상이어야 하므로 마지막 작은 배치는 앞 배치에 합침)
+def batch_ranges(n_rows, batch_size, min_size=1):
+    ranges = [(start, min(start + batch_size, n_rows)) for start in range(0, n_rows, batch_size)]
+    if len(ranges) > 1 and ranges[-1][1] - ranges[-1][0] < min_size:
+        ranges[-2:] = [(ranges[-2][0], n_rows)]
+    return ranges
+
+def iter_descendant_batches(data, batch_size, descendant_matrix=None, min_size=1):
+    for start, end in batch_ranges(len(data), batch_size, min_size):
+        yield get_descendant_vectors(data.iloc[start:end], descendant_matrix)
+
+# descendant_classes_encoded 차원 축소기를 학습 데이터로만 학습
+# 밀집 벡터는 IncrementalPCA를 미니배치로 학습 (메모리 사용량은 배치 크기에 비례), 희소 행렬은 중심화 없이 TruncatedSVD 사용
+@profiler.timed()
+def fit_descendant_reducer(train_data, n_components=4, batch_size=4096, descendant_matrix=None):
+    if descendant_matrix is not None:
+        reducer = TruncatedSVD(n_components=n_components, random_state=42)
+        reducer.fit(get_descendant_vectors(train_data, descendant_matrix))
+        return reducer
+
+    reducer = IncrementalPCA(n_components=n_components)
+    for vectors in iter_descendant_batches(train_data, batch_size, min_size=n_components):
+        reducer.partial_fit(vectors)
+    return reducer
+
+# 학습된 축소기로 배치 단위 변환 (검증/테스트/추론 데이터가 학습 데이터와 같은 기저를 사용)
+@profiler.timed()
+def transform_descendant_classes(reducer, data, batch_size=4096, descendant_matrix=None):
+    if len(data) == 0:
+        return np.empty((0, reducer.n_components))
+    return np.concatenate([reducer.transform(vectors) for vectors in iter_descendant_batches(data, batch_size, descendant_matrix)])
+
+def save_descendant_reducer(reducer, file_path=REDUCER_PATH):
+    joblib.dump(reducer, file_path)
 
-# PCA를 사용하여 descendant_classes_encoded의 차원 축소
-def pca(data, n_components=4):
-    vectors = np.stack(data['descendant_classes_encoded'].values)
-    pca = PCA(n_components=n_components)
-    reduced_vectors = pca.fit_transform(vectors)
-    return reduced_vectors
+def load_descendant_reducer(file_path=REDUCER_PATH):
+    return joblib.load(file_path)
 
 # descendant_classes_encoded 피처를 제거하고 차원 축소된 벡터를 결합
 def combined_data(data, reduced_vectors):
-    features = data.drop(columns=['descendant_classes_encoded', 'classified_class_encoded']).values
+    features = data.drop(columns=['descendant_classes_encoded', 'classified_class_encoded'], errors='ignore').values
     classified_vectors = np.stack(data['classified_class_encoded'].values)
     combined_data = np.concatenate([features, reduced_vectors, classified_vectors], axis=1)
     return combined_data
 
-# 긍정 데이터와 부정 데이터 분리
-positive_data = df[df['dataset_type'] == 1]
-negative_data = df[df['dataset_type'] == 0]
-
-# 긍정 데이터에서 8:1:1 비율로 나누기
-train_data, temp_data = train_test_split(positive_data, test_size=0.2, random_state=42)
-val_data, positive_test_data = train_test_split(temp_data, test_size=0.5, random_state=42)
-
-test_data = pd.concat([positive_test_data, negative_data])
-
-# 'dataset_type' 열 삭제
-train_data = train_data.drop(columns=['dataset_type'])
-val_data = val_data.drop(columns=['dataset_type'])
-test_data = test_data.drop(columns=['dataset_type'])
-
-# 데이터 섞기
-train_data = shuffle(train_data, random_state=42)
-val_data = shuffle(val_data, random_state=42)
-test_data = shuffle(test_data, random_state=42)
-
-# 차원 축소를 수행하여 임베딩된 벡터로 변환
-train_reduced = pca(train_data)
-val_reduced = pca(val_data)
-test_reduced = pca(test_data)
-
-# 데이터를 모델의 입력 형식으로 준비
-train_combined = combined_data(train_data, train_reduced)
-val_combined = combined_data(val_data, val_reduced)
-test_combined = combined_data(test_data, test_reduced)
-
-# 데이터 저장
-positive_test_data.to_csv('dataset/positive_test_data.csv', index=False)
-negative_data.to_csv('dataset/negative_test_data.csv', index=False)
-
-# 결과 출력
-print(f"학습 데이터 수: {len(train_combined)}")
-print(f"검증 데이터 수: {len(val_combined)}")
-print(f"테스트 데이터 수 (긍정): {len(positive_test_data)}")
-print(f"테스트 데이터 수 (부정): {len(negative_data)}")
-
-# Autoencoder 모델 정의
-CODE_DIM = 4
-INPUT_SHAPE = train_combined.shape[1]  
-
-input_layer = Input(shape=(INPUT_SHAPE,))
-x = Dense(32, activation='relu', kernel_regularizer=l2(0.001))(input_layer)
-x = Dropout(0.3)(x)
-x = Dense(16, activation='relu')(x)
-x = Dense(8, activation='relu')(x)
-code = Dense(CODE_DIM, activation='relu')(x)  
-x = Dense(8, activation='relu')(code)
-x = Dense(16, activation='relu')(x)
-x = Dense(32, activation='relu')(x)
-output_layer = Dense(INPUT_SHAPE, activation='relu')(x) 
-
-# 모델 정의 (Autoencoder)
-autoencoder = Model(input_layer, output_layer, name='autoencoder')
-
-# 콜백 정의 (체크포인트와 조기 종료)
-model_name = "dataset/unsupervised_autoencoder.keras"
-checkpoint = ModelCheckpoint(model_name,
-                             monitor="val_loss",
-                             mode="min",
-                             save_best_only=True,
-                             save_weights_only=False,
-                             verbose=1)
-earlystopping = EarlyStopping(monitor='val_loss',
-                              min_delta=0.001, 
-                              patience=5, 
-                              verbose=1,
-                              restore_best_weights=True)
-
-callbacks = [checkpoint, earlystopping]
-
-# 모델 컴파일
-autoencoder.compile(optimizer=Adam(learning_rate=0.0003), loss='mse')
-
-# 모델 학습
-history = autoencoder.fit(train_combined, train_combined,
-                          epochs=100, batch_size=64,
-                          validation_data=(val_combined, val_combined),
-                          callbacks=callbacks, shuffle=True)
+def split_data(df):
+    # 긍정 데이터와 부정 데이터 분리
+    positive_data = df[df['dataset_type'] == 1]
+    negative_data = df[df['dataset_type'] == 0]
+
+    # 긍정 데이터에서 8:1:1 비율로 나누기
+    train_data, temp_data = train_test_split(positive_data, test_size=0.2, random_state=42)
+    val_data, positive_test_data = train_test_split(temp_data, test_size=0.5, random_state=42)
+
+    test_data = pd.concat([positive_test_data, negative_data])
+
+    # 'dataset_type' 열 삭제
+    train_data = train_data.drop(columns=['dataset_type'])
+    val_data = val_data.drop(columns=['dataset_type'])
+    test_data = test_data.drop(columns=['dataset_type'])
+
+    # 데이터 섞기
+    train_data = shuffle(train_data, random_state=42)
+    val_data = shuffle(val_data, random_state=42)
+    test_data = shuffle(test_data, random_state=42)
+
+    return train_data, val_data, test_data, positive_test_data, negative_data
+
+# Autoencoder 모델 정의 (기본값은 Dense 32-16-8-4-8-16-32, 디코더는 인코더의 역순)
+# TensorFlow는 학습/모델 생성 시에만 불러옴 (evaluate_model.py 등에서 데이터 준비 함수만 사용할 때 import 비용 절약)
+def build_autoencoder(input_shape, code_dim=4, hidden_units=(32, 16, 8), dropout=0.3, l2_weight=0.001):
+    from tensorflow.keras import Model
+    from tensorflow.keras.layers import Dense, Input, Dropout
+    from tensorflow.keras.regularizers import l2
+
+    input_layer = Input(shape=(input_shape,))
+    x = Dense(hidden_units[0], activation='relu', kernel_regularizer=l2(l2_weight))(input_layer)
+    x = Dropout(dropout)(x)
+    for units in hidden_units[1:]:
+        x = Dense(units, activation='relu')(x)
+    code = Dense(code_dim, activation='relu')(x)
+    x = code
+    for units in reversed(hidden_units):
+        x = Dense(units, activation='relu')(x)
+    output_layer = Dense(input_shape, activation='relu', dtype='float32')(x)  # mixed precision에서도 출력/손실은 float32
+
+    # 모델 정의 (Autoencoder)
+    return Model(input_layer, output_layer, name='autoencoder')
+
+# 배치 크기에 맞춘 학습률 (기준: 배치 64에서 3e-4)
+def scaled_learning_rate(batch_size, base_lr=BASE_LEARNING_RATE, scaling='none', base_batch_size=BASE_BATCH_SIZE):
+    ratio = batch_size / base_batch_size
+    if scaling == 'linear':
+        return base_lr * ratio
+    if scaling == 'sqrt':
+        return base_lr * ratio ** 0.5
+    return base_lr
+
+# CPU가 bfloat16 연산을 지원하는지 (/proc/cpuinfo의 avx512_bf16 / amx_bf16 플래그)
+def bfloat16_supported():
+    try:
+        with open('/proc/cpuinfo', 'r', encoding='utf-8') as file:
+            flags = file.read()
+    except OSError:
+        return False
+    return 'avx512_bf16' in flags or 'amx_bf16' in flags
+
+# TensorFlow 런타임 설정 (모델을 만들기 전에 호출해야 함), 실제로 사용한 precision 반환
+def configure_runtime(intra_op_threads=0, inter_op_threads=0, mixed_precision=False):
+    import tensorflow as tf
+    from tensorflow.keras import mixed_precision as keras_mixed_precision
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)  # 0 = TensorFlow 기본값
+    tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+
+    if mixed_precision and not bfloat16_supported():
+        print("bfloat16 is not supported on this CPU, training in float32")
+        mixed_precision = False
+    keras_mixed_precision.set_global_policy('mixed_bfloat16' if mixed_precision else 'float32')
+    return 'mixed_bfloat16' if mixed_precision else 'float32'
+
+def compile_autoencoder(autoencoder, learning_rate=BASE_LEARNING_RATE, jit_compile=False, steps_per_execution=1):
+    from tensorflow.keras.optimizers import Adam
+    autoencoder.compile(optimizer=Adam(learning_rate=learning_rate), loss='mse',
+                        jit_compile=jit_compile, steps_per_execution=steps_per_execution)
+    return autoencoder
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Train the tappability autoencoder')
+    parser.add_argument('--epochs', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=BASE_BATCH_SIZE)
+    parser.add_argument('--lr', type=float, default=BASE_LEARNING_RATE, help=f'learning rate at batch size {BASE_BATCH_SIZE}')
+    parser.add_argument('--lr-scaling', choices=['none', 'linear', 'sqrt'], default='none', help='scale --lr with batch size')
+    parser.add_argument('--jit-compile', action='store_true', help='compile train steps with XLA')
+    parser.add_argument('--steps-per-execution', type=int, default=1, help='train steps per tf.function call')
+    parser.add_argument('--intra-op-threads', type=int, default=0, help='0 = TensorFlow default')
+    parser.add_argument('--inter-op-threads', type=int, default=0, help='0 = TensorFlow default')
+    parser.add_argument('--mixed-precision', action='store_true', help='bfloat16 mixed precision (falls back to float32 without CPU support; the saved model also predicts in bfloat16)')
+    parser.add_argument('--cpu-perf', action='store_true', help='CPU performance preset: ' + ', '.join(f'{key}={value}' for key, value in CPU_PERF_PRESET.items()))
+    args = parser.parse_args(argv)
+    if args.cpu_perf:
+        parser.set_defaults(**CPU_PERF_PRESET)
+        args = parser.parse_args(argv)
+    return args
+
+def main(args=None):
+    from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping
+
+    args = args or parse_args()
+    precision = configure_runtime(args.intra_op_threads, args.inter_op_threads, args.mixed_precision)
+    learning_rate = scaled_learning_rate(args.batch_size, args.lr, args.lr_scaling)
+
+    df, descendant_matrix = load_processed_data()
+    train_data, val_data, test_data, positive_test_data, negative_data = split_data(df)
+
+    # 학습 데이터로 차원 축소기를 학습하고 같은 기저로 임베딩된 벡터로 변환
+    reducer = fit_descendant_reducer(train_data, descendant_matrix=descendant_matrix)
+    save_descendant_reducer(reducer)
+    train_reduced = transform_descendant_classes(reducer, train_data, descendant_matrix=descendant_matrix)
+    val_reduced = transform_descendant_classes(reducer, val_data, descendant_matrix=descendant_matrix)
+    test_reduced = transform_descendant_classes(reducer, test_data, descendant_matrix=descendant_matrix)
+
+    # 데이터를 모델의 입력 형식으로 준비
+    train_combined = combined_data(train_data, train_reduced)
+    val_combined = combined_data(val_data, val_reduced)
+    test_combined = combined_data(test_data, test_reduced)
+
+    # 데이터 저장
+    with profiler.stage('write_csv'):
+        for test_path, data in [('dataset/positive_test_data.csv', positive_test_data), ('dataset/negative_test_data.csv', negative_data)]:
+            data.to_csv(test_path, index=False)
+            # 희소 모드에서는 테스트 데이터의 descendant 행렬도 같은 행 순서로 저장
+            matrix_path = get_descendant_matrix_path(test_path)
+            if descendant_matrix is not None:
+                sparse.save_npz(matrix_path, get_descendant_vectors(data, descendant_matrix))
+            elif os.path.exists(matrix_path):
+                os.remove(matrix_path)
+
+    # 결과 출력
+    print(f"학습 데이터 수: {len(train_combined)}")
+    print(f"검증 데이터 수: {len(val_combined)}")
+    print(f"테스트 데이터 수 (긍정): {len(positive_test_data)}")
+    print(f"테스트 데이터 수 (부정): {len(negative_data)}")
+
+    CODE_DIM = 4
+    INPUT_SHAPE = train_combined.shape[1]
+
+    autoencoder = build_autoencoder(INPUT_SHAPE, CODE_DIM)
+
+    # 콜백 정의 (체크포인트와 조기 종료)
+    model_name = MODEL_PATH
+    checkpoint = ModelCheckpoint(model_name,
+                                 monitor="val_loss",
+                                 mode="min",
+                                 save_best_only=True,
+                                 save_weights_only=False,
+                                 verbose=1)
+    earlystopping = EarlyStopping(monitor='val_loss',
+                                  min_delta=0.001,
+                                  patience=5,
+                                  verbose=1,
+                                  restore_best_weights=True)
+
+    callbacks = [checkpoint, earlystopping]
+
+    # 모델 컴파일
+    compile_autoencoder(autoencoder, learning_rate, args.jit_compile, args.steps_per_execution)
+    print(f"batch_size={args.batch_size}, lr={learning_rate:.6g}, jit_compile={args.jit_compile}, "
+          f"steps_per_execution={args.steps_per_execution}, precision={precision}")
+
+    # 모델 학습
+    with profiler.stage('train'):
+        history = autoencoder.fit(train_combined, train_combined,
+                                  epochs=args.epochs, batch_size=args.batch_size,
+                                  validation_data=(val_combined, val_combined),
+                                  callbacks=callbacks, shuffle=True)
+    profiler.count('epochs', len(history.history['loss']))
+    profiler.count('train_samples', len(train_combined))
+    return history
 
+if __name__ == "__main__":
+    with profiler.profile_run('model_train'):
+        main()
@@ -0,0 +1,109 @@
+import time
+import argparse
+import numpy as np
+
+# 학습된 Keras autoencoder의 가중치를 .npz로 내보내고 NumPy만으로 추론하는 엔진
+# 점수 계산 프로세스는 TensorFlow를 불러오지 않아도 되므로 수 ms 안에 시작
+# 사용 예: python model/numpy_autoencoder.py --check
+
+MODEL_PATH = 'dataset/unsupervised_autoencoder.keras'
+WEIGHTS_PATH = 'dataset/unsupervised_autoencoder.npz'
+
+ACTIVATIONS = {
+    'relu': lambda x: np.maximum(x, 0, out=x),
+    'linear': lambda x: x
+}
+
+# Dense 층의 kernel/bias/activation만 저장 (Dropout은 추론 시 항등이므로 생략)
+def export_weights(model_path=MODEL_PATH, output_path=WEIGHTS_PATH):
+    from tensorflow.keras.models import load_model
+    autoencoder = load_model(model_path)
+
+    arrays = {}
+    activations = []
+    for layer in autoencoder.layers:
+        if layer.__class__.__name__ == 'Dense':
+            kernel, bias = layer.get_weights()
+            arrays[f'kernel_{len(activations)}'] = kernel.astype(np.float32)
+            arrays[f'bias_{len(activations)}'] = bias.astype(np.float32)
+            activations.append(layer.get_config()['activation'])
+        elif layer.__class__.__name__ not in ['InputLayer', 'Dropout']:
+            raise ValueError(f"Unsupported layer for NumPy export: {layer.name} ({layer.__class__.__name__})")
+
+    unsupported = set(activations) - set(ACTIVATIONS)
+    if unsupported:
+        raise ValueError(f"Unsupported activations for NumPy export: {sorted(unsupported)}")
+
+    np.savez(output_path, activations=np.array(activations), **arrays)
+    return output_path
+
+# [(kernel, bias, activation)] 목록 반환
+def load_weights(weights_path=WEIGHTS_PATH):
+    with np.load(weights_path) as data:
+        activations = [str(activation) for activation in data['activations']]
+        return [(data[f'kernel_{index}'], data[f'bias_{index}'], activation) for index, activation in enumerate(activations)]
+
+def forward_batch(layers, inputs):
+    outputs = inputs
+    for kernel, bias, activation in layers:
+        outputs = outputs @ kernel
+        outputs += bias
+        outputs = ACTIVATIONS[activation](outputs)
+    return outputs
+
+# 배치 단위 float32 순전파 (autoencoder.predict와 같은 출력)
+def predict(layers, inputs, batch_size=65536):
+    inputs = np.asarray(inputs, dtype=np.float32)
+    outputs = np.empty((len(inputs), layers[-1][0].shape[1]), dtype=np.float32)
+    for start in range(0, len(inputs), batch_size):
+        outputs[start:start + batch_size] = forward_batch(layers, inputs[start:start + batch_size])
+    return outputs
+
+# 재구성 결과를 저장하지 않고 배치마다 바로 MSE를 계산 (fused)
+def reconstruction_errors(layers, inputs, batch_size=65536):
+    inputs = np.asarray(inputs, dtype=np.float32)
+    errors = np.empty(len(inputs), dtype=np.float32)
+    for start in range(0, len(inputs), batch_size):
+        batch = inputs[start:start + batch_size]
+        diff = forward_batch(layers, batch)
+        diff -= batch
+        errors[start:start + batch_size] = np.einsum('ij,ij->i', diff, diff) / batch.shape[1]
+    return errors
+
+# 임의 입력에 대해 autoencoder.predict와 NumPy 결과를 비교
+def check_against_keras(model_path=MODEL_PATH, weights_path=WEIGHTS_PATH, n_samples=10000, atol=1e-5, seed=0):
+    from tensorflow.keras.models import load_model
+    autoencoder = load_model(model_path)
+    layers = load_weights(weights_path)
+
+    inputs = np.random.default_rng(seed).random((n_samples, autoencoder.input_shape[1]), dtype=np.float32)
+    keras_outputs = autoencoder.predict(inputs, batch_size=4096, verbose=0)
+    numpy_outputs = predict(layers, inputs)
+    keras_errors = np.mean(np.square(inputs - keras_outputs), axis=1)
+    numpy_errors = reconstruction_errors(layers, inputs)
+
+    output_diff = float(np.max(np.abs(keras_outputs - numpy_outputs)))
+    error_diff = float(np.max(np.abs(keras_errors - numpy_errors)))
+    print(f"Max |predict - numpy| output: {output_diff:.3e}, MSE: {error_diff:.3e}")
+    return output_diff <= atol and error_diff <= atol
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the Keras autoencoder to .npz and run it with NumPy')
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--output', default=WEIGHTS_PATH)
+    parser.add_argument('--check', action='store_true', help='compare against autoencoder.predict after exporting')
+    parser.add_argument('--samples', type=int, default=10000, help='random inputs used by --check')
+    parser.add_argument('--atol', type=float, default=1e-5)
+    args = parser.parse_args()
+
+    export_weights(args.model, args.output)
+    print(f"Weights saved to: {args.output}")
+
+    if args.check:
+        start = time.perf_counter()
+        if not check_against_keras(args.model, args.output, args.samples, args.atol):
+            raise SystemExit(f"NumPy engine differs from autoencoder.predict by more than {args.atol}")
+        print(f"NumPy engine matches autoencoder.predict ({time.perf_counter() - start:.1f}s)")
+
+if __name__ == "__main__":
+    main()
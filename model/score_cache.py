@@ -0,0 +1,148 @@
+import os
+import sys
+import sqlite3
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common'))  # 공용 모듈 폴더 (profiler 등)
+import profiler
+
+# 재구성 오류 캐시: 화면/앱 사이에 반복되는 UI 요소 (툴바, 하단 내비게이션, 같은 목록 항목)는 전처리 후 같은 피처 벡터가 되므로
+# 양자화한 피처 벡터 + 모델 버전의 해시를 키로 점수를 저장하고, 배치에서 캐시에 없는 행만 모델로 보냄
+# 메모리는 LRU로 max_entries개까지 유지하고, db_path를 주면 sqlite 파일에도 저장하여 실행 간에 재사용
+# 사용 예:
+#   cache = ScoreCache(model_version('dataset/unsupervised_autoencoder.keras'), db_path='dataset/score_cache.sqlite')
+#   score = cached_scorer(inference_backends.load_scorer('keras'), cache)
+
+DEFAULT_MAX_ENTRIES = 1000000
+DEFAULT_DECIMALS = 5  # 피처 값을 소수점 아래 몇 자리로 양자화할지 (float32 연산 오차로 키가 갈라지지 않도록)
+SQLITE_BATCH = 900  # sqlite IN (...) 변수 개수 제한 이하로 나누어 조회
+
+# 모델 파일 내용의 해시 (재학습/내보내기로 모델이 바뀌면 이전 점수를 쓰지 않도록 키에 포함)
+def model_version(model_path):
+    digest = hashlib.sha256()
+    with open(model_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+# 피처 행렬을 정수로 양자화하고 배치 안의 중복 행을 합침
+# (고유 양자화 행, 각 고유 행의 첫 등장 위치, 원래 행 -> 고유 행 인덱스) 반환
+def quantize_rows(inputs, decimals=DEFAULT_DECIMALS):
+    quantized = np.rint(np.asarray(inputs, dtype=np.float64) * 10 ** decimals).astype(np.int64)
+    unique_rows, first_index, inverse = np.unique(quantized, axis=0, return_index=True, return_inverse=True)
+    return unique_rows, first_index, inverse.reshape(-1)
+
+def row_keys(quantized_rows, version):
+    prefix = version.encode()
+    return [hashlib.blake2b(prefix + row.tobytes(), digest_size=16).digest() for row in quantized_rows]
+
+class ScoreCache:
+    def __init__(self, version, max_entries=DEFAULT_MAX_ENTRIES, db_path=None, decimals=DEFAULT_DECIMALS):
+        self.version = version
+        self.max_entries = max_entries
+        self.decimals = decimals
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.conn = None
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+            self.conn = sqlite3.connect(db_path)
+            self.conn.execute("CREATE TABLE IF NOT EXISTS scores (key BLOB PRIMARY KEY, score REAL NOT NULL)")
+
+    def remember(self, key, score):
+        self.entries[key] = score
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def load_from_db(self, keys):
+        found = {}
+        for start in range(0, len(keys), SQLITE_BATCH):
+            batch = keys[start:start + SQLITE_BATCH]
+            query = f"SELECT key, score FROM scores WHERE key IN ({','.join('?' * len(batch))})"
+            found.update(self.conn.execute(query, batch).fetchall())
+        return found
+
+    # 키 목록의 점수 배열 반환 (캐시에 없는 항목은 NaN)
+    def lookup(self, keys):
+        scores = np.full(len(keys), np.nan)
+        missing = []
+        for index, key in enumerate(keys):
+            score = self.entries.get(key)
+            if score is None:
+                missing.append(index)
+            else:
+                self.entries.move_to_end(key)
+                scores[index] = score
+
+        if self.conn is not None and missing:
+            found = self.load_from_db([keys[index] for index in missing])
+            still_missing = []
+            for index in missing:
+                score = found.get(keys[index])
+                if score is None:
+                    still_missing.append(index)
+                else:
+                    self.remember(keys[index], score)
+                    scores[index] = score
+            self.disk_hits += len(missing) - len(still_missing)
+            missing = still_missing
+
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+        return scores
+
+    # 유한한 점수만 저장 (NaN은 lookup의 미스 표시이고 sqlite에는 NULL로 들어가므로 캐시하지 않고 매번 다시 계산)
+    def store(self, keys, scores):
+        entries = [(key, float(score)) for key, score in zip(keys, scores) if np.isfinite(score)]
+        for key, score in entries:
+            self.remember(key, score)
+        if self.conn is not None and entries:
+            with self.conn:
+                self.conn.executemany("INSERT OR REPLACE INTO scores (key, score) VALUES (?, ?)", entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'model_version': self.version,
+            'lookups': lookups,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'entries': len(self.entries)
+        }
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+# (입력 -> 재구성 MSE) 함수를 캐시로 감쌈: 배치 안의 중복 행은 한 번만 조회하고, 캐시에 없는 행만 scorer로 계산
+def cached_scorer(scorer, cache):
+    def score(inputs):
+        inputs = np.asarray(inputs, dtype=np.float32)
+        with profiler.stage('score_cache_lookup'):
+            unique_rows, first_index, inverse = quantize_rows(inputs, cache.decimals)
+            keys = row_keys(unique_rows, cache.version)
+            unique_scores = cache.lookup(keys)
+
+        missing = np.flatnonzero(np.isnan(unique_scores))
+        if len(missing):
+            unique_scores[missing] = scorer(inputs[first_index[missing]])
+            with profiler.stage('score_cache_store'):
+                cache.store([keys[index] for index in missing], unique_scores[missing])
+
+        profiler.count('score_cache_rows', len(inputs))
+        profiler.count('score_cache_model_rows', len(missing))
+        return unique_scores[inverse]
+    return score
+
+def print_stats(stats):
+    print(f"Score cache: {stats['hits']}/{stats['lookups']} unique vectors hit ({stats['hit_ratio']:.1%}, "
+          f"{stats['disk_hits']} from sqlite), {stats['misses']} scored by the model")
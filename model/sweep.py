@@ -0,0 +1,181 @@
+import os
+import sys
+import time
+import random
+import argparse
+import itertools
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common'))  # 공용 모듈 폴더 (profiler 등)
+import profiler
+from model_train import PROCESSED_DATA_PATH, load_processed_data, split_data, fit_descendant_reducer, transform_descendant_classes, combined_data
+
+# 하이퍼파라미터 탐색: 전처리된 피처를 한 번만 읽어 공유 메모리에 올리고, 여러 trial을 프로세스 풀에서 병렬 학습
+# trial마다 TensorFlow 스레드 수를 고정하여 코어 수만큼 처리량이 늘어나도록 함
+# 사용 예: python model/sweep.py --jobs 8 --code-dim 2 4 8 --lr 1e-3 3e-4 --output dataset/sweep_results.csv
+
+RESULTS_PATH = 'dataset/sweep_results.csv'
+SPLITS = ['train', 'val', 'test_positive', 'test_negative']
+
+# 학습/검증/테스트 입력 행렬 준비 (차원 축소기는 학습 데이터로만 학습, 저장된 축소기는 덮어쓰지 않음)
+@profiler.timed()
+def prepare_arrays(file_path):
+    df, descendant_matrix = load_processed_data(file_path)
+    train_data, val_data, _, positive_test_data, negative_data = split_data(df)
+    positive_test_data = positive_test_data.drop(columns=['dataset_type'])
+    negative_data = negative_data.drop(columns=['dataset_type'])
+
+    reducer = fit_descendant_reducer(train_data, descendant_matrix=descendant_matrix)
+    arrays = {}
+    for split, data in zip(SPLITS, [train_data, val_data, positive_test_data, negative_data]):
+        reduced = transform_descendant_classes(reducer, data, descendant_matrix=descendant_matrix)
+        arrays[split] = combined_data(data, reduced).astype(np.float32)
+    return arrays
+
+# 모든 분할을 하나의 float32 공유 메모리 블록에 연속으로 저장
+# (공유 메모리, {분할: (시작 행, 끝 행)}, 열 수) 반환
+def create_shared_arrays(arrays):
+    n_columns = arrays['train'].shape[1]
+    n_rows = sum(len(array) for array in arrays.values())
+    shm = shared_memory.SharedMemory(create=True, size=max(n_rows * n_columns * 4, 1))
+    block = np.ndarray((n_rows, n_columns), dtype=np.float32, buffer=shm.buf)
+
+    layout = {}
+    start = 0
+    for split, array in arrays.items():
+        block[start:start + len(array)] = array
+        layout[split] = (start, start + len(array))
+        start += len(array)
+    del block
+    return shm, layout, n_columns
+
+# 워커 프로세스 전역 상태 (풀 initializer에서 한 번만 설정)
+worker_state = {}
+
+def init_worker(shm_name, layout, n_columns, threads):
+    import tensorflow as tf
+    # trial 하나가 threads개 코어만 사용하도록 고정 (TensorFlow 런타임 초기화 전에 설정해야 함)
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    shm = shared_memory.SharedMemory(name=shm_name)  # spawn 워커는 부모의 resource tracker를 공유하므로 해제는 부모의 unlink로 한 번만 처리
+    n_rows = max(end for _, end in layout.values())
+    block = np.ndarray((n_rows, n_columns), dtype=np.float32, buffer=shm.buf)
+    worker_state['shm'] = shm
+    worker_state['arrays'] = {split: block[start:end] for split, (start, end) in layout.items()}
+
+def run_trial(trial):
+    import tensorflow as tf
+    from tensorflow.keras.callbacks import EarlyStopping
+    from tensorflow.keras.optimizers import Adam
+    from model_train import build_autoencoder
+    from evaluation import evaluate_errors
+
+    start = time.perf_counter()
+    arrays = worker_state['arrays']
+    tf.keras.utils.set_random_seed(trial['seed'])
+
+    autoencoder = build_autoencoder(arrays['train'].shape[1], trial['code_dim'], trial['hidden_units'], trial['dropout'], trial['l2'])
+    autoencoder.compile(optimizer=Adam(learning_rate=trial['lr']), loss='mse')
+    earlystopping = EarlyStopping(monitor='val_loss', min_delta=0.001, patience=trial['patience'], restore_best_weights=True)
+    history = autoencoder.fit(arrays['train'], arrays['train'],
+                              epochs=trial['epochs'], batch_size=trial['batch_size'],
+                              validation_data=(arrays['val'], arrays['val']),
+                              callbacks=[earlystopping], shuffle=True, verbose=0)
+
+    test_inputs = np.concatenate([arrays['test_positive'], arrays['test_negative']])
+    reconstructions = autoencoder.predict(test_inputs, batch_size=8192, verbose=0)
+    errors = np.mean(np.square(test_inputs - reconstructions), axis=1)
+    labels = np.r_[np.zeros(len(arrays['test_positive'])), np.ones(len(arrays['test_negative']))]
+    metrics = evaluate_errors(errors, labels, trial['criterion'])
+
+    return {
+        **{key: value for key, value in trial.items() if key not in ['criterion', 'patience', 'epochs']},
+        'hidden_units': '-'.join(map(str, trial['hidden_units'])),
+        'val_loss': float(min(history.history['val_loss'])),
+        'test_auc': metrics['auc'],
+        'test_recall': metrics['recall'],
+        'epochs_run': len(history.history['loss']),
+        'wall_time_s': time.perf_counter() - start
+    }
+
+# 격자 조합 생성 (max_trials가 주어지면 그중 임의로 선택)
+def make_trials(args):
+    grid = itertools.product(args.code_dim, args.hidden, args.dropout, args.l2, args.lr, args.batch_size)
+    trials = [{
+        'code_dim': code_dim,
+        'hidden_units': tuple(int(units) for units in hidden.split(',')),
+        'dropout': dropout,
+        'l2': l2_weight,
+        'lr': lr,
+        'batch_size': batch_size,
+        'seed': args.seed,
+        'epochs': args.epochs,
+        'patience': args.patience,
+        'criterion': args.criterion
+    } for code_dim, hidden, dropout, l2_weight, lr, batch_size in grid]
+
+    if args.max_trials and len(trials) > args.max_trials:
+        trials = random.Random(args.seed).sample(trials, args.max_trials)
+    return trials
+
+def parse_args():
+    from evaluation import CRITERIA
+    parser = argparse.ArgumentParser(description='Parallel hyperparameter sweep for the tappability autoencoder')
+    parser.add_argument('--input', default=PROCESSED_DATA_PATH)
+    parser.add_argument('--output', default=RESULTS_PATH, help='results table CSV')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='trials trained in parallel')
+    parser.add_argument('--threads-per-trial', type=int, help='TensorFlow intra-op threads per trial (default: cores / jobs)')
+    parser.add_argument('--code-dim', type=int, nargs='+', default=[4])
+    parser.add_argument('--hidden', nargs='+', default=['32,16,8'], help='encoder layer sizes, e.g. 64,32,16')
+    parser.add_argument('--dropout', type=float, nargs='+', default=[0.3])
+    parser.add_argument('--l2', type=float, nargs='+', default=[0.001])
+    parser.add_argument('--lr', type=float, nargs='+', default=[0.0003])
+    parser.add_argument('--batch-size', type=int, nargs='+', default=[64])
+    parser.add_argument('--epochs', type=int, default=100)
+    parser.add_argument('--patience', type=int, default=5, help='early stopping patience')
+    parser.add_argument('--max-trials', type=int, help='randomly sample this many trials from the grid')
+    parser.add_argument('--criterion', choices=CRITERIA, default='percentile', help='threshold criterion for test recall')
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    trials = make_trials(args)
+    jobs = max(1, min(args.jobs, len(trials)))
+    threads = args.threads_per_trial or max(1, (os.cpu_count() or 1) // jobs)
+
+    arrays = prepare_arrays(args.input)
+    shm, layout, n_columns = create_shared_arrays(arrays)
+    del arrays
+    print(f"Trials: {len(trials)}, parallel: {jobs}, threads per trial: {threads}")
+
+    results = []
+    try:
+        # TensorFlow 상태가 fork로 복제되지 않도록 spawn 사용
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(jobs, initializer=init_worker, initargs=(shm.name, layout, n_columns, threads)) as pool:
+            with profiler.stage('trials'):
+                for result in pool.imap_unordered(run_trial, trials):
+                    results.append(result)
+                    print(f"[{len(results)}/{len(trials)}] code_dim={result['code_dim']} hidden={result['hidden_units']} "
+                          f"dropout={result['dropout']} l2={result['l2']} lr={result['lr']} batch={result['batch_size']} "
+                          f"val_loss={result['val_loss']:.5f} auc={result['test_auc']:.3f} ({result['wall_time_s']:.1f}s)")
+    finally:
+        shm.close()
+        shm.unlink()
+    profiler.count('trials', len(results))
+
+    results_df = pd.DataFrame(results).sort_values('val_loss').reset_index(drop=True)
+    results_df.to_csv(args.output, index=False)
+    print(results_df[['code_dim', 'hidden_units', 'dropout', 'l2', 'lr', 'batch_size', 'val_loss', 'test_auc', 'wall_time_s']].head(10).to_string())
+    print(f"Sweep results saved to: {args.output}")
+    return results_df
+
+if __name__ == "__main__":
+    with profiler.profile_run('sweep'):
+        main()
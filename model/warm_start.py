@@ -0,0 +1,139 @@
+import os
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common'))  # 공용 모듈 폴더 (profiler 등)
+import feature
+import profiler
+from model_train import (PROCESSED_DATA_PATH, MODEL_PATH, REDUCER_PATH, load_processed_data, split_data,
+                         load_descendant_reducer, transform_descendant_classes, combined_data, compile_autoencoder)
+
+# warm start 재학습: 기존 autoencoder와 저장된 전처리 아티팩트 (클래스 어휘, MinMax 범위, descendant 축소기)를 그대로 사용하여
+# 새로 추가된 trace의 데이터만 피처로 변환하고, 새 데이터 + 기존 학습 데이터에서 뽑은 replay 샘플로 미세 조정
+# 어휘/스케일/축소기를 다시 학습하지 않으므로 모델 입력 차원과 기저가 유지됨
+# 사용 예:
+#   python positive_dataset_code/boundMatching_positive.py --since dataset/previous_manifest.sqlite --output dataset/new_matching_output.json
+#   python positive_dataset_code/convertDataset_positive.py --input dataset/new_matching_output.json --output dataset/new_positive_data.csv
+#   python model/warm_start.py --positive dataset/new_positive_data.csv --append
+
+NEW_VALIDATION_RATIO = 0.2
+
+# 새 원본 CSV를 feature.py와 같은 열 구성으로 불러오기 (긍정 = 1, 부정 = 0)
+def load_new_data(positive_path=None, negative_path=None):
+    frames = []
+    for file_path, dataset_type in [(positive_path, 1), (negative_path, 0)]:
+        if file_path:
+            df = pd.read_csv(file_path)
+            df['dataset_type'] = dataset_type
+            frames.append(df)
+    return pd.concat(frames, ignore_index=True)[feature.FEATURE_COLUMNS]
+
+# 기존 학습/검증 분할에서 replay 샘플 추출 (model_train.py와 같은 분할이므로 기존 테스트 데이터는 섞이지 않음)
+def sample_replay(data, n_rows, seed):
+    if n_rows >= len(data):
+        return data
+    return data.sample(n=n_rows, random_state=seed)
+
+# 분할별 (데이터, descendant 행렬) 목록을 모델 입력 행렬 하나로 결합
+def build_inputs(reducer, parts):
+    return np.concatenate([combined_data(data, transform_descendant_classes(reducer, data, descendant_matrix=matrix)).astype(np.float32)
+                           for data, matrix in parts if len(data)])
+
+# 인코딩된 새 행을 전처리 데이터셋 뒤에 추가 (희소 모드면 descendant 행렬도 같은 순서로 추가)
+@profiler.timed()
+def append_processed_data(new_df, new_matrix, processed_path):
+    columns = pd.read_csv(processed_path, nrows=0).columns
+    new_df[columns].to_csv(processed_path, mode='a', header=False, index=False)
+    if new_matrix is not None:
+        matrix_path = feature.get_descendant_matrix_path(processed_path)
+        sparse.save_npz(matrix_path, sparse.vstack([sparse.load_npz(matrix_path), new_matrix], format='csr'))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Fine-tune the existing autoencoder on newly added traces plus replayed old data')
+    parser.add_argument('--positive', required=True, help='positive original CSV built from the new traces only')
+    parser.add_argument('--negative', help='negative original CSV built from the new traces (only appended with --append)')
+    parser.add_argument('--processed', default=PROCESSED_DATA_PATH, help='existing processed dataset used for replay')
+    parser.add_argument('--artifacts', default=feature.ARTIFACTS_PATH)
+    parser.add_argument('--reducer', default=REDUCER_PATH)
+    parser.add_argument('--model', default=MODEL_PATH, help='model to start from')
+    parser.add_argument('--output', default=MODEL_PATH, help='where to save the fine-tuned model')
+    parser.add_argument('--replay-ratio', type=float, default=1.0, help='old training rows replayed per new training row')
+    parser.add_argument('--epochs', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--lr', type=float, default=0.0001, help='fine-tuning learning rate (lower than the full training rate)')
+    parser.add_argument('--patience', type=int, default=3, help='early stopping patience')
+    parser.add_argument('--append', action='store_true', help='append the encoded new rows to the processed dataset for the next full retrain')
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+def main():
+    import tensorflow as tf
+    from tensorflow.keras.models import load_model
+    from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping
+
+    args = parse_args()
+    tf.keras.utils.set_random_seed(args.seed)
+
+    # 기존 전처리 데이터와 같은 형식 (희소 / 밀집)으로 새 데이터 인코딩
+    old_df, old_matrix = load_processed_data(args.processed)
+    with profiler.stage('read_csv'):
+        new_df = load_new_data(args.positive, args.negative)
+    new_df, new_matrix = feature.transform_features(new_df, feature.load_feature_artifacts(args.artifacts), sparse_output=old_matrix is not None)
+
+    new_positive = new_df[new_df['dataset_type'] == 1].drop(columns=['dataset_type'])
+    if len(new_positive) < 2:
+        raise SystemExit(f"Not enough new positive rows to fine-tune: {len(new_positive)}")
+    new_train, new_val = train_test_split(new_positive, test_size=NEW_VALIDATION_RATIO, random_state=args.seed)
+
+    old_train, old_val = split_data(old_df)[:2]
+    replay_train = sample_replay(old_train, int(len(new_train) * args.replay_ratio), args.seed)
+    replay_val = sample_replay(old_val, int(len(new_val) * args.replay_ratio), args.seed)
+
+    reducer = load_descendant_reducer(args.reducer)
+    train_inputs = build_inputs(reducer, [(new_train, new_matrix), (replay_train, old_matrix)])
+    val_inputs = build_inputs(reducer, [(new_val, new_matrix), (replay_val, old_matrix)])
+    train_inputs = train_inputs[np.random.default_rng(args.seed).permutation(len(train_inputs))]
+
+    print(f"새 학습 데이터 수: {len(new_train)}, replay 데이터 수: {len(replay_train)}")
+    print(f"검증 데이터 수 (새 / replay): {len(new_val)} / {len(replay_val)}")
+
+    autoencoder = load_model(args.model)
+    if autoencoder.input_shape[1] != train_inputs.shape[1]:
+        raise SystemExit(f"Feature width {train_inputs.shape[1]} does not match the model input {autoencoder.input_shape[1]}; "
+                         f"the artifacts and reducer must be the ones the model was trained with")
+
+    # 새 학습률로 다시 컴파일 (가중치는 유지, 옵티마이저 상태는 초기화)
+    compile_autoencoder(autoencoder, args.lr)
+    initial_val_loss = autoencoder.evaluate(val_inputs, val_inputs, batch_size=8192, verbose=0)
+
+    checkpoint = ModelCheckpoint(args.output, monitor='val_loss', mode='min', save_best_only=True, verbose=1,
+                                 initial_value_threshold=initial_val_loss)
+    earlystopping = EarlyStopping(monitor='val_loss', min_delta=0.0001, patience=args.patience, verbose=1, restore_best_weights=True)
+
+    with profiler.stage('train'):
+        history = autoencoder.fit(train_inputs, train_inputs,
+                                  epochs=args.epochs, batch_size=args.batch_size,
+                                  validation_data=(val_inputs, val_inputs),
+                                  callbacks=[checkpoint, earlystopping], shuffle=True)
+    profiler.count('epochs', len(history.history['loss']))
+    profiler.count('train_samples', len(train_inputs))
+
+    best_val_loss = min(history.history['val_loss'])
+    print(f"val_loss: {initial_val_loss:.5f} -> {best_val_loss:.5f}")
+    if best_val_loss >= initial_val_loss:
+        print(f"Fine-tuning did not improve the validation loss; {args.output} was not updated")
+    else:
+        print(f"Fine-tuned model saved to: {args.output} (re-run numpy_autoencoder.py / export_model.py to refresh exported backends)")
+
+    if args.append:
+        append_processed_data(new_df, new_matrix, args.processed)
+        print(f"Appended {len(new_df)} rows to: {args.processed}")
+    return history
+
+if __name__ == "__main__":
+    with profiler.profile_run('warm_start'):
+        main()
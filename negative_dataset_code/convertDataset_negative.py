@@ -1,8 +1,14 @@
+import os
+import sys
 import json
+import argparse
 import pandas as pd
 import re
 import csv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common'))  # 공용 모듈 폴더 (profiler 등)
+import profiler
+
 # 화면 해상도 정보 
 screen_width = 1440
 screen_height = 2560
@@ -38,6 +44,7 @@ def extract_base_class(class_name):
     return parts[-2:] if len(parts) > 1 else parts
 
 # 클래스명을 기준으로 정확한 단어 매칭을 통해 다양한 UI 컴포넌트로 분류하고, Other로 분류된 경우 기록하는 함수
+@profiler.timed()
 def classify_component_class(app_name, ui_name, class_name, other_classes_writer):
     base_class_parts = extract_base_class(class_name)
     matched_type = 'Other'  # 기본 분류는 'Other'로 설정
@@ -74,7 +81,7 @@ def process_data_from_json(json_file, other_classes_filepath='other_classes.csv'
         other_classes_writer = csv.writer(file)
         other_classes_writer.writerow(['App', 'UI', 'Class'])  # CSV 헤더 추가
 
-        with open(json_file, 'r', encoding='utf-8') as file:
+        with open(json_file, 'r', encoding='utf-8') as file, profiler.stage('json_parse'):
             data = json.load(file)
 
         # 데이터 추출 및 정리
@@ -85,6 +92,7 @@ def process_data_from_json(json_file, other_classes_filepath='other_classes.csv'
             
             for trace_name, gestures in traces.items():
                 if isinstance(gestures, list):  
+                    profiler.count('gestures', len(gestures))
                     for gesture in gestures:
                         ui = gesture.get("UI")  # get() 메서드 사용으로 키가 없는 경우를 대비
                         gesture_x, gesture_y = gesture["gesture_converted"]
@@ -149,9 +157,18 @@ def process_data_from_json(json_file, other_classes_filepath='other_classes.csv'
 
 
         # DataFrame으로 변환 및 CSV 파일로 저장
-        df = pd.DataFrame(rows)
-        df.to_csv(classified_data_filepath, index=False, encoding='utf-8')
+        with profiler.stage('write_csv'):
+            df = pd.DataFrame(rows)
+            df.to_csv(classified_data_filepath, index=False, encoding='utf-8')
+        profiler.count('rows_written', len(rows))
         print(f"CSV 파일로 변환 완료: {classified_data_filepath}")
 
 # JSON 파일로부터 데이터 처리 호출 예제
-process_data_from_json(r'C:\Users\USER\Desktop\Code\sitlab\0731\negativefinaloutput100.json')
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Convert matched components to the classified CSV dataset')
+    parser.add_argument('--input', default=r'C:\Users\USER\Desktop\Code\sitlab\0731\negativefinaloutput100.json', help='boundMatching output JSON')
+    parser.add_argument('--output', default=r'C:\Users\USER\Desktop\Code\sitlab\0731\classified_data_100.csv', help='classified CSV (e.g. a separate file for --since traces)')
+    parser.add_argument('--other-classes', default='other_classes.csv')
+    args = parser.parse_args()
+    with profiler.profile_run('convertDataset_negative'):
+        process_data_from_json(args.input, args.other_classes, args.output)
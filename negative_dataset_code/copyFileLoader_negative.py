@@ -1,7 +1,12 @@
 import os
+import sys
 import random
 import shutil
 import csv
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common'))  # 공용 모듈 폴더 (corpusManifest 등)
+import corpusManifest
 
 # CSV 파일에서 에러난 앱 목록을 로드
 def load_error_apps(csv_file):
@@ -16,71 +21,116 @@ def load_error_apps(csv_file):
         print(f"Error reading CSV file: {e}")
     return error_apps
 
-# 유효한 앱을 필터링하여 리스트로 저장
-def filter_valid_apps(filtered_traces_dir, error_apps):
+# 유효한 앱을 필터링하여 리스트로 저장 (매니페스트가 있으면 폴더를 다시 스캔하지 않음)
+def filter_valid_apps(filtered_traces_dir, error_apps, manifest=None):
     valid_apps = []
-    for app_name in os.listdir(filtered_traces_dir):
+    app_names = corpusManifest.list_apps(manifest) if manifest else os.listdir(filtered_traces_dir)
+    for app_name in app_names:
         app_dir = os.path.join(filtered_traces_dir, app_name)
-        if os.path.isdir(app_dir) and app_name not in error_apps:
+        if (manifest or os.path.isdir(app_dir)) and app_name not in error_apps:
             valid_apps.append(app_dir)
     return valid_apps
 
-# 무작위로 100개의 UI 뷰 하이어라키와 스크린샷을 선택하여 복사
-def copy_random_ui_files(valid_apps, output_dir, num_samples=100):
-    os.makedirs(output_dir, exist_ok=True)
-    selected_ui_files = 0
-    selected_apps = set()
-
-    while selected_ui_files < num_samples and len(selected_apps) < len(valid_apps):
-        random_app_dir = random.choice(valid_apps)
-        app_name = os.path.basename(random_app_dir)
-
-        # 이미 선택한 앱은 다시 선택하지 않음
-        if app_name in selected_apps:
-            continue
-
-        trace_dirs = [d for d in os.listdir(random_app_dir) if os.path.isdir(os.path.join(random_app_dir, d))]
-        if not trace_dirs:
+# 앱 폴더를 os.scandir로 한 번만 훑어 trace별 (뷰 하이어라키, 스크린샷) 후보 목록 생성
+def scan_app_candidates(app_dir):
+    trace_candidates = []
+    try:
+        with os.scandir(app_dir) as entries:
+            trace_entries = [entry for entry in entries if entry.is_dir()]
+    except OSError:
+        return trace_candidates
+
+    for trace_entry in trace_entries:
+        view_hierarchies_path = os.path.join(trace_entry.path, 'view_hierarchies')
+        screenshots_path = os.path.join(trace_entry.path, 'screenshots')
+        try:
+            with os.scandir(view_hierarchies_path) as entries:
+                view_files = [entry.name for entry in entries if entry.name.endswith('.json')]
+            with os.scandir(screenshots_path) as entries:
+                screenshot_files = {entry.name for entry in entries}
+        except OSError:
+            continue  # view_hierarchies 또는 screenshots 폴더가 없는 trace
+
+        # 뷰 하이어라키와 동일한 이름의 스크린샷이 있는 경우만 후보로 사용
+        pairs = [(view_file, view_file.replace('.json', '.jpg')) for view_file in view_files]
+        pairs = [pair for pair in pairs if pair[1] in screenshot_files]
+        if pairs:
+            trace_candidates.append((trace_entry.path, pairs))
+    return trace_candidates
+
+# 모든 유효한 앱의 후보 목록을 스레드 풀로 병렬 수집 (네트워크 스토리지의 지연을 겹쳐서 처리)
+def build_candidate_index(valid_apps, max_workers=16):
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        app_candidates = executor.map(scan_app_candidates, valid_apps)
+        return {app_dir: candidates for app_dir, candidates in zip(valid_apps, app_candidates) if candidates}
+
+# 매니페스트에서 build_candidate_index와 같은 형태의 후보 목록 생성 (파일 시스템 접근 없음)
+def build_candidate_index_from_manifest(manifest, filtered_traces_dir, valid_apps):
+    valid_app_names = {os.path.basename(app_dir) for app_dir in valid_apps}
+    candidate_index = {}
+    for app_name, trace_name, view_file, screenshot_file in corpusManifest.list_view_screenshot_pairs(manifest):
+        if app_name not in valid_app_names:
             continue
+        app_dir = os.path.join(filtered_traces_dir, app_name)
+        trace_dir = os.path.join(app_dir, trace_name)
+        trace_candidates = candidate_index.setdefault(app_dir, [])
+        if not trace_candidates or trace_candidates[-1][0] != trace_dir:
+            trace_candidates.append((trace_dir, []))
+        trace_candidates[-1][1].append((view_file, screenshot_file))
+    return candidate_index
+
+# 하드링크가 가능하면 하드링크로, 아니면 (다른 디스크 등) 복사
+def copy_or_link(src_path, dest_path, use_hardlinks=False):
+    if use_hardlinks:
+        try:
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+            os.link(src_path, dest_path)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src_path, dest_path)
+
+def copy_ui_files(copy_job, use_hardlinks=False):
+    for src_path, dest_path in copy_job:
+        copy_or_link(src_path, dest_path, use_hardlinks)
+
+# 무작위로 100개의 UI 뷰 하이어라키와 스크린샷을 선택하여 복사 (앱당 하나씩, 중복 없이)
+def copy_random_ui_files(valid_apps, output_dir, num_samples=100, max_workers=16, use_hardlinks=False, candidate_index=None):
+    os.makedirs(output_dir, exist_ok=True)
 
-        random_trace_dir = os.path.join(random_app_dir, random.choice(trace_dirs))
-        view_hierarchies_path = os.path.join(random_trace_dir, 'view_hierarchies')
-        screenshots_path = os.path.join(random_trace_dir, 'screenshots')
-
-        if os.path.exists(view_hierarchies_path) and os.listdir(view_hierarchies_path) and os.path.exists(screenshots_path):
-            # 무작위로 하나의 뷰 하이어라키 파일과 그에 대응하는 스크린샷을 선택
-            view_files = [f for f in os.listdir(view_hierarchies_path) if f.endswith('.json')]
-            if not view_files:
-                continue
-
-            view_file = random.choice(view_files)
-            screenshot_file = view_file.replace('.json', '.jpg')  # 뷰 하이어라키와 동일한 이름의 스크린샷 파일 찾기
-            screenshot_src_path = os.path.join(screenshots_path, screenshot_file)
-            if os.path.exists(screenshot_src_path):
-                # 앱 이름의 폴더 생성
-                app_output_dir = os.path.join(output_dir, app_name)
-                trace_output_dir = os.path.join(app_output_dir, 'trace_0')  # trace_0 폴더 생성
-                view_output_dir = os.path.join(trace_output_dir, 'view_hierarchies')
-                screenshot_output_dir = os.path.join(trace_output_dir, 'screenshots')
-
-                # trace_0, view_hierarchies와 screenshots 폴더 생성
-                os.makedirs(view_output_dir, exist_ok=True)
-                os.makedirs(screenshot_output_dir, exist_ok=True)
-
-                # 뷰 하이어라키 파일 복사
-                src_view_hierarchy = os.path.join(view_hierarchies_path, view_file)
-                dest_view_hierarchy = os.path.join(view_output_dir, view_file)
-                shutil.copy2(src_view_hierarchy, dest_view_hierarchy)
-
-                # 스크린샷 파일 복사
-                dest_screenshot = os.path.join(screenshot_output_dir, screenshot_file)
-                shutil.copy2(screenshot_src_path, dest_screenshot)
-
-                selected_apps.add(app_name)  # 선택된 앱을 기록
-                selected_ui_files += 1
-
+    # 후보가 있는 앱만 인덱싱한 뒤, 앱을 비복원 추출하여 재시도 없이 O(k)로 선택
+    if candidate_index is None:
+        candidate_index = build_candidate_index(valid_apps, max_workers)
+    selected_apps = random.sample(list(candidate_index), min(num_samples, len(candidate_index)))
+
+    copy_jobs = []
+    for app_dir in selected_apps:
+        app_name = os.path.basename(app_dir)
+        # 무작위로 하나의 trace와 그 안의 뷰 하이어라키 파일 및 대응하는 스크린샷을 선택
+        trace_dir, pairs = random.choice(candidate_index[app_dir])
+        view_file, screenshot_file = random.choice(pairs)
+
+        # 앱 이름의 폴더 아래 trace_0, view_hierarchies와 screenshots 폴더 생성
+        trace_output_dir = os.path.join(output_dir, app_name, 'trace_0')
+        view_output_dir = os.path.join(trace_output_dir, 'view_hierarchies')
+        screenshot_output_dir = os.path.join(trace_output_dir, 'screenshots')
+        os.makedirs(view_output_dir, exist_ok=True)
+        os.makedirs(screenshot_output_dir, exist_ok=True)
+
+        copy_jobs.append([
+            (os.path.join(trace_dir, 'view_hierarchies', view_file), os.path.join(view_output_dir, view_file)),
+            (os.path.join(trace_dir, 'screenshots', screenshot_file), os.path.join(screenshot_output_dir, screenshot_file))
+        ])
+
+    # 뷰 하이어라키와 스크린샷 파일을 스레드 풀로 병렬 복사
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(lambda copy_job: copy_ui_files(copy_job, use_hardlinks), copy_jobs))
+
+    selected_ui_files = len(copy_jobs)
     if selected_ui_files < num_samples:
         print(f"Warning: Only {selected_ui_files} UI files were copied due to limited valid apps.")
+    return selected_ui_files
 
 # 메인 함수
 def main():
@@ -92,13 +142,17 @@ def main():
     error_apps = load_error_apps(error_apps_csv)
     print(f"Error apps loaded: {len(error_apps)}")
 
+    # 코퍼스 구조는 매니페스트에서 조회 (없으면 한 번 스캔하여 생성)
+    manifest = corpusManifest.load_manifest(dataset_root)
+
     # 유효한 앱 목록 필터링
-    valid_apps = filter_valid_apps(dataset_root, error_apps)
+    valid_apps = filter_valid_apps(dataset_root, error_apps, manifest)
     print(f"Valid apps available: {len(valid_apps)}")
 
     # 무작위로 50개의 UI 뷰 하이어라키와 스크린샷을 복사
-    copy_random_ui_files(valid_apps, output_dir, num_samples=100)
-    print(f"Successfully copied 100 random UI files to {output_dir}")
+    candidate_index = build_candidate_index_from_manifest(manifest, dataset_root, valid_apps)
+    copied_ui_files = copy_random_ui_files(valid_apps, output_dir, num_samples=100, candidate_index=candidate_index)
+    print(f"Successfully copied {copied_ui_files} random UI files to {output_dir}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,148 @@
+import os
+import json
+import argparse
+
+# trace 폴더별 append-only 제스처 로그 (gestures.ndjson)
+# 한 줄 = 예전 gestures_<index>.json 파일 하나: {"index": index, "gestures": {스크린샷 이름: [[x, y], ...]}}
+# gestures_N.json에서 옮긴 줄에는 "legacy_file": 원래 파일 이름을 함께 기록
+# 주석 도구는 클릭마다 로그 끝에 한 줄을 추가하고 (다음 index는 메모리에서 증가), boundMatching은 파일을 한 번 순서대로 읽음
+# 아직 옮기지 않은 gestures_N.json은 boundMatching이 로그와 합쳐 읽고, 주석 도구는 로그에 쓰기 전에 로그로 옮김
+# 기존 gestures_N.json 파일 변환: python gestureLog.py <filtered_traces 경로> [--remove]
+
+GESTURE_LOG_NAME = 'gestures.ndjson'
+LEGACY_FILE_KEY = 'legacy_file'
+LEGACY_PREFIX = 'gestures_'
+
+def get_gesture_log_path(trace_directory):
+    return os.path.join(trace_directory, GESTURE_LOG_NAME)
+
+# 로그를 한 번 순서대로 읽어 줄마다 {'index', 'gestures'[, 'legacy_file']} 목록 반환 (쓰는 도중 중단되어 잘린 마지막 줄 등 깨진 줄은 건너뜀)
+def read_gesture_log_entries(log_path):
+    entries = []
+    with open(log_path, 'r', encoding='utf-8') as file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+                entry['index'] = int(entry['index'])
+            except (ValueError, KeyError, TypeError):
+                continue
+            if 'gestures' in entry:
+                entries.append(entry)
+    return entries
+
+# {index: 제스처 데이터} 반환
+def read_gesture_log(log_path):
+    return {entry['index']: entry['gestures'] for entry in read_gesture_log_entries(log_path)}
+
+# gestures_N.json이면 N, 아니면 None
+def get_legacy_index(file_name):
+    name, extension = os.path.splitext(file_name)
+    if extension == '.json' and name.startswith(LEGACY_PREFIX) and name[len(LEGACY_PREFIX):].isdigit():
+        return int(name[len(LEGACY_PREFIX):])
+    return None
+
+# trace 폴더의 gestures_N.json 목록 [(N, 파일 이름)] (file_names: 매니페스트에 기록된 파일 이름, 있으면 폴더를 나열하지 않음)
+def list_legacy_gesture_files(trace_directory, file_names=None):
+    if file_names is None:
+        with os.scandir(trace_directory) as entries:
+            file_names = [entry.name for entry in entries if entry.is_file()]
+    legacy_files = []
+    for file_name in file_names:
+        index = get_legacy_index(file_name)
+        if index is not None:
+            legacy_files.append((index, file_name))
+    return sorted(legacy_files)
+
+# 로그에 아직 옮기지 않은 gestures_N.json을 찾아 ([(부여할 index, 파일 이름, 제스처 데이터)], 이미 옮긴 파일 이름 집합) 반환
+# 이미 옮긴 파일: 로그의 legacy_file이 그 파일이거나, 로그의 같은 index에 같은 내용이 있는 경우 (legacy_file을 기록하기 전에 옮긴 로그)
+# index는 N을 그대로 쓰되, 로그의 같은 index에 다른 제스처가 있으면 (예전 주석 도구는 로그만 보고 index를 정했음) 모든 index 뒤의 새 index를 부여
+# 읽을 수 없는 파일은 어느 쪽에도 넣지 않음
+def find_unconverted_legacy_gestures(trace_directory, entries, legacy_files):
+    logged = {entry['index']: entry['gestures'] for entry in entries}
+    converted_files = {entry[LEGACY_FILE_KEY] for entry in entries if LEGACY_FILE_KEY in entry}
+
+    pending = []
+    for index, file_name in legacy_files:
+        if file_name in converted_files:
+            continue
+        try:
+            with open(os.path.join(trace_directory, file_name), 'r', encoding='utf-8') as file:
+                gesture_data = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"\nError loading {os.path.join(trace_directory, file_name)}: {e}")
+            continue
+        if logged.get(index) == gesture_data:
+            converted_files.add(file_name)
+            continue
+        pending.append((index, file_name, gesture_data))
+
+    next_index = max([*logged, *(index for index, _, _ in pending)], default=0) + 1
+    unconverted = []
+    for index, file_name, gesture_data in pending:
+        if index in logged:
+            index, next_index = next_index, next_index + 1
+        unconverted.append((index, file_name, gesture_data))
+    return unconverted, converted_files
+
+class GestureLogWriter:
+    def __init__(self, log_path):
+        self.log_path = log_path
+        # 남은 gestures_N.json을 먼저 로그로 옮겨 새 index가 예전 파일의 index와 겹치지 않도록 함
+        convert_legacy_gesture_files(os.path.dirname(log_path) or '.')
+        # 시작할 때 한 번만 읽어 다음 index를 정함 (이후에는 파일을 다시 조회하지 않음)
+        existing = read_gesture_log(log_path) if os.path.exists(log_path) else {}
+        self.next_index = max(existing, default=0) + 1
+
+    # 제스처 데이터를 한 줄로 추가하고 부여한 index 반환
+    def append(self, gesture_data):
+        return self.append_many([gesture_data])[0]
+
+    # 여러 제스처 데이터를 파일을 한 번만 열어 추가하고 부여한 index 목록 반환 (배치 주석 모드)
+    def append_many(self, gesture_data_list):
+        indices = list(range(self.next_index, self.next_index + len(gesture_data_list)))
+        with open(self.log_path, 'a', encoding='utf-8') as file:
+            file.writelines(json.dumps({'index': index, 'gestures': gesture_data}, ensure_ascii=False) + '\n'
+                            for index, gesture_data in zip(indices, gesture_data_list))
+        self.next_index += len(gesture_data_list)
+        return indices
+
+# trace 폴더의 gestures_N.json 파일들 중 아직 옮기지 않은 파일을 로그로 옮기고, 옮긴 파일 수 반환
+# remove=True면 내용이 로그에 기록된 파일만 삭제 (읽을 수 없는 파일은 남김)
+def convert_legacy_gesture_files(trace_directory, remove=False):
+    legacy_files = list_legacy_gesture_files(trace_directory)
+    if not legacy_files:
+        return 0
+
+    log_path = get_gesture_log_path(trace_directory)
+    entries = read_gesture_log_entries(log_path) if os.path.exists(log_path) else []
+    unconverted, converted_files = find_unconverted_legacy_gestures(trace_directory, entries, legacy_files)
+    if unconverted:
+        with open(log_path, 'a', encoding='utf-8') as file:
+            file.writelines(json.dumps({'index': index, 'gestures': gesture_data, LEGACY_FILE_KEY: file_name}, ensure_ascii=False) + '\n'
+                            for index, file_name, gesture_data in unconverted)
+    if remove:
+        for file_name in converted_files | {file_name for _, file_name, _ in unconverted}:
+            os.remove(os.path.join(trace_directory, file_name))
+    return len(unconverted)
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert gestures_N.json files to per-trace gestures.ndjson logs')
+    parser.add_argument('traces_root', help='path to the filtered_traces folder')
+    parser.add_argument('--remove', action='store_true', help='delete the gestures_N.json files after converting')
+    args = parser.parse_args()
+
+    total_traces, total_files = 0, 0
+    for app_name in sorted(os.listdir(args.traces_root)):
+        app_directory = os.path.join(args.traces_root, app_name)
+        if not os.path.isdir(app_directory):
+            continue
+        for trace_name in sorted(os.listdir(app_directory)):
+            trace_directory = os.path.join(app_directory, trace_name)
+            if os.path.isdir(trace_directory):
+                converted = convert_legacy_gesture_files(trace_directory, args.remove)
+                total_traces += 1 if converted else 0
+                total_files += converted
+    print(f"Converted {total_files} gesture files in {total_traces} traces")
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,65 @@
 import sys
-import json
 import os
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5.QtWidgets import QApplication, QLabel, QMainWindow, QPushButton, QFileDialog, QVBoxLayout, QWidget
-from PyQt5.QtGui import QPixmap
+from PyQt5.QtGui import QPixmap, QImage, QPainter, QPen, QColor
 from PyQt5.QtCore import Qt
 
+import gestureLog
+import boundMatching_negative as bm
+
+
+# 스크린샷이 속한 앱 이름 (<앱>/<trace>/screenshots/<이름>): boundMatching_negative --device-screens의 키
+def get_app_name(image_path):
+    return os.path.basename(os.path.dirname(os.path.dirname(os.path.dirname(image_path))))
+
+
+# boundMatching_negative와 같은 화면 크기 설정 (--screen-size, --device-screens)으로 스크린샷의 화면 크기 (가로, 세로) 반환
+def get_screen_size(image_path, screen_size=bm.DEFAULT_SCREEN_SIZE, device_screens=None):
+    return (device_screens or {}).get(get_app_name(image_path), screen_size)
+
+
+# 스크린샷에 대응하는 view hierarchy (<trace>/view_hierarchies/<이름>.json)의 리프 색인, 파일이 없으면 None
+def load_leaf_index(image_path):
+    trace_directory = os.path.dirname(os.path.dirname(image_path))
+    view_path = os.path.join(trace_directory, 'view_hierarchies', os.path.splitext(os.path.basename(image_path))[0] + '.json')
+    if not os.path.exists(view_path):
+        return None
+    root_component = (bm.load_json(view_path) or {}).get('activity', {}).get('root', {})
+    return bm.build_leaf_index(root_component) if root_component else []
+
+
+# 정규화된 클릭 좌표에 boundMatching_negative가 매칭할 리프 (없으면 None, screen_size는 매칭 때와 같은 화면 크기)
+def hit_test_click(leaf_index, normalized_x, normalized_y, screen_size):
+    screen_width, screen_height = screen_size
+    return bm.hit_test_leaf_index(leaf_index, normalized_x * screen_width, normalized_y * screen_height)
+
+
+# 리프 bounds를 스크린샷 위에 그린 QPixmap 반환 (클릭으로 매칭된 리프는 굵은 초록색)
+def draw_leaf_overlay(pixmap, leaf_index, screen_size, hit_leaves=()):
+    overlay = QPixmap(pixmap)
+    painter = QPainter(overlay)
+    scale_x = overlay.width() / screen_size[0]
+    scale_y = overlay.height() / screen_size[1]
+
+    def draw_bounds(bounds):
+        if len(bounds) == 4:
+            left, top, right, bottom = bounds
+            painter.drawRect(int(left * scale_x), int(top * scale_y), int((right - left) * scale_x), int((bottom - top) * scale_y))
+
+    painter.setPen(QPen(QColor(0, 160, 255), 2))
+    for leaf in leaf_index:
+        draw_bounds(leaf['bounds'])
+    painter.setPen(QPen(QColor(0, 200, 0), 5))
+    for leaf in hit_leaves:
+        draw_bounds(leaf['bounds'])
+    painter.end()
+    return overlay
+
 
 class ImageWindow(QMainWindow):
-    def __init__(self, image_path, app_folder_path, parent=None):
+    def __init__(self, image_path, app_folder_path, parent=None, gesture_log=None, screen_size=bm.DEFAULT_SCREEN_SIZE):
         super().__init__(parent)
         self.setWindowTitle("Image Viewer")
         self.setGeometry(100, 100, 600, 400)
@@ -20,6 +72,13 @@ class ImageWindow(QMainWindow):
         self.image_path = image_path
         self.gesture_coords = []
         self.app_folder_path = app_folder_path
+        # 앱 폴더의 제스처 로그 (gestures.ndjson): 다음 인덱스는 메모리에서 관리하여 클릭마다 파일을 조회하지 않음
+        if gesture_log is None and app_folder_path:
+            gesture_log = gestureLog.GestureLogWriter(gestureLog.get_gesture_log_path(app_folder_path))
+        self.gesture_log = gesture_log
+        # 화면의 리프 사각형 색인 (view hierarchy가 없으면 None: 오버레이와 클릭 판정 없이 기록)
+        self.leaf_index = load_leaf_index(image_path)
+        self.screen_size = screen_size
 
         # 이미지 로드 및 표시
         self.load_image()
@@ -27,7 +86,7 @@ class ImageWindow(QMainWindow):
     def load_image(self):
         # 이미지를 Pixmap으로 로드하고 원본 크기를 저장
         self.pixmap = QPixmap(self.image_path)
-        self.image_label.setPixmap(self.pixmap)
+        self.image_label.setPixmap(draw_leaf_overlay(self.pixmap, self.leaf_index, self.screen_size) if self.leaf_index is not None else self.pixmap)
         self.image_label.setScaledContents(True)
 
     # 마우스 클릭 이벤트 처리
@@ -58,30 +117,27 @@ class ImageWindow(QMainWindow):
             final_normalized_x = actual_x / image_width
             final_normalized_y = actual_y / image_height
 
+            # 어떤 리프에도 매칭되지 않는 클릭은 boundMatching에서 버려지므로 기록하지 않고 다시 클릭하도록 함
+            if self.leaf_index is not None:
+                hit_leaf = hit_test_click(self.leaf_index, final_normalized_x, final_normalized_y, self.screen_size)
+                if hit_leaf is None:
+                    self.statusBar().showMessage("매칭되는 컴포넌트가 없습니다. 표시된 영역 안을 클릭하세요")
+                    return
+                print(f"매칭된 컴포넌트: {hit_leaf['component'].get('class', 'Unknown')} {hit_leaf['bounds']}")
+
             # 제스처 좌표 저장
             self.gesture_coords.append([final_normalized_x, final_normalized_y])
 
-            # 파일 이름(확장자 제외)을 gestures_인덱스.json 파일의 키로 사용
+            # 파일 이름(확장자 제외)을 제스처 데이터의 키로 사용
             file_name = os.path.splitext(os.path.basename(self.image_path))[0]
 
             # 원하는 형식으로 제스처 좌표 출력
             gesture_data = {file_name: self.gesture_coords}
 
-            # 앱 폴더에 제스처 데이터를 JSON 파일로 저장 (스크린샷 폴더가 아님)
-            if self.app_folder_path:
-                # 인덱스를 증가시키며 파일 이름 결정
-                index = 1
-                while True:
-                    gesture_file_path = os.path.join(self.app_folder_path, f'gestures_{index}.json')
-                    if not os.path.exists(gesture_file_path):  # 해당 파일이 존재하지 않으면 사용
-                        break
-                    index += 1
-
-                # 새로 생성된 파일에 제스처 데이터를 저장
-                with open(gesture_file_path, 'w') as file:
-                    json.dump(gesture_data, file, indent=4)
-
-                print(f"제스처 데이터가 저장되었습니다: {gesture_file_path}")
+            # 앱 폴더의 제스처 로그에 한 줄로 추가 (스크린샷 폴더가 아님, 예전 gestures_인덱스.json 파일 하나에 해당)
+            if self.gesture_log:
+                index = self.gesture_log.append(gesture_data)
+                print(f"제스처 데이터가 저장되었습니다: {self.gesture_log.log_path} (index {index})")
 
             else:
                 print("오류: 앱 폴더 경로를 찾을 수 없습니다")
@@ -90,8 +146,162 @@ class ImageWindow(QMainWindow):
             self.close()
 
 
+# 배치 모드에서 다룰 스크린샷 확장자 (단일 이미지 모드의 파일 대화 상자와 같음)
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.bmp')
+DEFAULT_PREFETCH = 4  # 미리 디코딩해 둘 다음 스크린샷 수
+DEFAULT_COMMIT_EVERY = 20  # 이 화면 수마다 제스처를 로그에 기록
+
+
+# 폴더 아래의 모든 screenshots/ 이미지를 경로 순서로 나열 (copyFileLoader_negative.py 출력: <앱>/trace_0/screenshots/*.jpg)
+def list_batch_images(root_dir):
+    image_paths = []
+    for directory, _, file_names in os.walk(root_dir):
+        if os.path.basename(directory) == 'screenshots':
+            image_paths.extend(os.path.join(directory, name) for name in file_names if name.lower().endswith(IMAGE_EXTENSIONS))
+    return sorted(image_paths)
+
+
+# 다음 스크린샷들을 백그라운드 스레드에서 QImage로 디코딩해 둠
+# QPixmap은 GUI 스레드에서만 만들 수 있으므로 디코딩은 QImage로 하고, 표시할 때 QPixmap.fromImage로 변환
+class ScreenshotPrefetcher:
+    def __init__(self, image_paths, depth=DEFAULT_PREFETCH):
+        self.image_paths = image_paths
+        self.depth = depth
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.futures = {}
+
+    # index 번째 이미지를 반환하고 다음 depth개 이미지의 디코딩을 요청 (범위를 벗어난 디코딩 결과는 버림)
+    def get(self, index):
+        for ahead in range(index, min(index + self.depth + 1, len(self.image_paths))):
+            if ahead not in self.futures:
+                self.futures[ahead] = self.executor.submit(QImage, self.image_paths[ahead])
+        for stale in [key for key in self.futures if key < index - 1 or key > index + self.depth]:
+            del self.futures[stale]
+        return QPixmap.fromImage(self.futures[index].result())
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# 폴더의 스크린샷을 순서대로 보여주며 화면마다 여러 번 클릭하여 주석
+# 키: Enter/Space/→ 다음 화면, ← 이전 화면, Backspace 마지막 클릭 취소, Esc 저장 후 종료
+# 제스처는 commit_every 화면마다 앱 폴더별 로그에 한 번에 기록 (창을 닫을 때 남은 화면도 기록)
+class BatchImageWindow(QMainWindow):
+    def __init__(self, image_paths, get_gesture_log, parent=None, prefetch=DEFAULT_PREFETCH, commit_every=DEFAULT_COMMIT_EVERY, get_screen_size=get_screen_size):
+        super().__init__(parent)
+        self.setWindowTitle("Batch Annotation")
+        self.setGeometry(100, 100, 600, 400)
+
+        self.image_label = QLabel(self)
+        self.image_label.setAlignment(Qt.AlignCenter)
+        self.image_label.setScaledContents(True)
+        self.setCentralWidget(self.image_label)
+
+        self.image_paths = image_paths
+        self.get_gesture_log = get_gesture_log
+        self.get_screen_size = get_screen_size  # 이미지 경로 -> 화면 크기 (가로, 세로)
+        self.commit_every = commit_every
+        self.prefetcher = ScreenshotPrefetcher(image_paths, prefetch)
+        self.gesture_coords = {}  # 이미지 경로 -> 클릭 좌표 목록 (아직 기록하지 않은 화면)
+        self.hit_leaves = {}  # 이미지 경로 -> 클릭으로 매칭된 리프 목록 (오버레이 표시용)
+        self.pending_screens = []  # 기록을 기다리는 이미지 경로 (화면을 넘긴 순서)
+        self.index = 0
+        self.show_image()
+
+    def show_image(self):
+        self.pixmap = self.prefetcher.get(self.index)
+        self.leaf_index = load_leaf_index(self.image_paths[self.index])
+        self.screen_size = self.get_screen_size(self.image_paths[self.index])
+        self.draw_image()
+
+    def draw_image(self):
+        if self.leaf_index is None:
+            self.image_label.setPixmap(self.pixmap)
+        else:
+            self.image_label.setPixmap(draw_leaf_overlay(self.pixmap, self.leaf_index, self.screen_size, self.hit_leaves.get(self.image_paths[self.index], [])))
+        self.update_status()
+
+    def update_status(self):
+        image_path = self.image_paths[self.index]
+        clicks = len(self.gesture_coords.get(image_path, []))
+        self.statusBar().showMessage(f"{self.index + 1}/{len(self.image_paths)}  {os.path.basename(image_path)}  클릭 {clicks}개")
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            # ImageWindow와 같은 정규화: 창 기준 클릭 위치 / 라벨 크기
+            normalized_x = event.pos().x() / self.image_label.width()
+            normalized_y = event.pos().y() / self.image_label.height()
+            image_path = self.image_paths[self.index]
+            # 어떤 리프에도 매칭되지 않는 클릭은 기록하지 않음 (ImageWindow와 같음)
+            if self.leaf_index is not None:
+                hit_leaf = hit_test_click(self.leaf_index, normalized_x, normalized_y, self.screen_size)
+                if hit_leaf is None:
+                    self.statusBar().showMessage("매칭되는 컴포넌트가 없습니다. 표시된 영역 안을 클릭하세요")
+                    return
+                self.hit_leaves.setdefault(image_path, []).append(hit_leaf)
+            self.gesture_coords.setdefault(image_path, []).append([normalized_x, normalized_y])
+            self.draw_image()
+
+    def keyPressEvent(self, event):
+        key = event.key()
+        if key in (Qt.Key_Return, Qt.Key_Enter, Qt.Key_Space, Qt.Key_Right):
+            self.next_image()
+        elif key == Qt.Key_Left and self.index > 0:
+            self.index -= 1
+            self.show_image()
+        elif key == Qt.Key_Backspace:
+            coords = self.gesture_coords.get(self.image_paths[self.index])
+            if coords:
+                coords.pop()
+                hit_leaves = self.hit_leaves.get(self.image_paths[self.index])
+                if hit_leaves:
+                    hit_leaves.pop()
+                self.draw_image()
+        elif key == Qt.Key_Escape:
+            self.close()
+
+    def next_image(self):
+        image_path = self.image_paths[self.index]
+        if self.gesture_coords.get(image_path) and image_path not in self.pending_screens:
+            self.pending_screens.append(image_path)
+        if len(self.pending_screens) >= self.commit_every:
+            self.commit_gestures()
+
+        if self.index + 1 >= len(self.image_paths):
+            print("마지막 스크린샷입니다")
+            self.close()
+            return
+        self.index += 1
+        self.show_image()
+
+    # 기록을 기다리는 화면의 제스처를 앱 폴더별로 모아 한 번에 추가
+    # boundMatching은 좌표가 둘 이상인 제스처를 스크롤로 보고 건너뛰므로 클릭마다 별도 항목으로 기록
+    def commit_gestures(self):
+        batches = {}
+        for image_path in self.pending_screens:
+            coords = self.gesture_coords.pop(image_path, None)
+            self.hit_leaves.pop(image_path, None)
+            if coords:
+                app_folder_path = os.path.dirname(os.path.dirname(image_path))
+                file_name = os.path.splitext(os.path.basename(image_path))[0]
+                batches.setdefault(app_folder_path, []).extend({file_name: [coord]} for coord in coords)
+        self.pending_screens = []
+
+        for app_folder_path, gesture_data_list in batches.items():
+            gesture_log = self.get_gesture_log(app_folder_path)
+            gesture_log.append_many(gesture_data_list)
+            print(f"제스처 데이터 {len(gesture_data_list)}개가 저장되었습니다: {gesture_log.log_path}")
+
+    def closeEvent(self, event):
+        # 현재 화면을 포함해 클릭이 남아 있는 화면을 모두 기록
+        self.pending_screens.extend(path for path in self.gesture_coords if path not in self.pending_screens)
+        self.commit_gestures()
+        self.prefetcher.close()
+        super().closeEvent(event)
+
+
 class GestureApp(QMainWindow):
-    def __init__(self):
+    def __init__(self, prefetch=DEFAULT_PREFETCH, commit_every=DEFAULT_COMMIT_EVERY, screen_size=bm.DEFAULT_SCREEN_SIZE, device_screens=None):
         super().__init__()
 
         self.setWindowTitle("제스처 주석 도구")
@@ -107,9 +317,27 @@ class GestureApp(QMainWindow):
         self.load_button.clicked.connect(self.load_image)
         self.layout.addWidget(self.load_button)
 
+        # 폴더 배치 주석 버튼
+        self.batch_button = QPushButton("폴더 배치 주석", self)
+        self.batch_button.clicked.connect(self.load_batch_folder)
+        self.layout.addWidget(self.batch_button)
+
         # 변수 초기화
         self.image_path = None
         self.app_folder_path = None  # 앱 폴더 경로를 저장할 변수
+        self.gesture_logs = {}  # 앱 폴더 경로 -> 제스처 로그 (세션 동안 재사용)
+        self.prefetch = prefetch
+        self.commit_every = commit_every
+        self.screen_size = screen_size
+        self.device_screens = device_screens or {}
+
+    def get_screen_size(self, image_path):
+        return get_screen_size(image_path, self.screen_size, self.device_screens)
+
+    def get_gesture_log(self, app_folder_path):
+        if app_folder_path not in self.gesture_logs:
+            self.gesture_logs[app_folder_path] = gestureLog.GestureLogWriter(gestureLog.get_gesture_log_path(app_folder_path))
+        return self.gesture_logs[app_folder_path]
 
     def load_image(self):
         # 파일 대화 상자를 열어 이미지를 선택
@@ -128,12 +356,38 @@ class GestureApp(QMainWindow):
     def open_image_window(self):
         if self.image_path and self.app_folder_path:
             # 새로운 이미지 창을 생성하고 이미지를 표시
-            self.image_window = ImageWindow(self.image_path, self.app_folder_path, self)
+            self.image_window = ImageWindow(self.image_path, self.app_folder_path, self, self.get_gesture_log(self.app_folder_path),
+                                            self.get_screen_size(self.image_path))
             self.image_window.show()
 
+    def load_batch_folder(self):
+        root_dir = QFileDialog.getExistingDirectory(self, "주석할 폴더 선택")
+        if root_dir:
+            self.open_batch_window(root_dir)
+
+    def open_batch_window(self, root_dir):
+        image_paths = list_batch_images(root_dir)
+        if not image_paths:
+            print(f"오류: {root_dir} 아래에 screenshots 이미지가 없습니다")
+            return
+        print(f"배치 주석: {len(image_paths)}개 스크린샷")
+        self.batch_window = BatchImageWindow(image_paths, self.get_gesture_log, self, self.prefetch, self.commit_every, self.get_screen_size)
+        self.batch_window.show()
+
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    window = GestureApp()
+    parser = argparse.ArgumentParser(description='Gesture annotation tool for negative samples')
+    parser.add_argument('--batch', metavar='DIR', help='annotate every screenshots/ image under DIR in order (e.g. the copyFileLoader_negative.py output)')
+    parser.add_argument('--prefetch', type=int, default=DEFAULT_PREFETCH, help='screenshots decoded ahead in the background in batch mode')
+    parser.add_argument('--commit-every', type=int, default=DEFAULT_COMMIT_EVERY, help='write gestures to the logs every N screens in batch mode')
+    # boundMatching_negative.py에 주는 값과 같게 지정해야 오버레이/클릭 판정이 매칭 결과와 일치함
+    parser.add_argument('--screen-size', type=bm.parse_screen_size, default=bm.DEFAULT_SCREEN_SIZE, metavar='WxH', help='same as boundMatching_negative.py --screen-size')
+    parser.add_argument('--device-screens', metavar='JSON', help='same as boundMatching_negative.py --device-screens')
+    args, qt_args = parser.parse_known_args()
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    window = GestureApp(args.prefetch, args.commit_every, args.screen_size, bm.load_device_screens(args.device_screens))
     window.show()
+    if args.batch:
+        window.open_batch_window(args.batch)
     sys.exit(app.exec_())
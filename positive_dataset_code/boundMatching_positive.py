@@ -1,8 +1,26 @@
 import os
-import csv
+import sys
+import argparse
 import json
+import pickle
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+import numpy as np
 from tqdm import tqdm
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common'))  # 공용 모듈 폴더 (profiler 등)
+import profiler
+import corpusManifest
+from skipLog import SkipLog, SkipReason, print_summary
+
+# 파싱된 view hierarchy를 trace 단위로 저장하는 캐시 폴더 (None이면 캐시 사용 안 함)
+VIEW_CACHE_DIR = os.path.join('dataset', 'view_cache')
+DEFAULT_PREFETCH_DEPTH = 4  # 매칭하는 동안 미리 읽어 둘 trace 수
+DEFAULT_SCREEN_SIZE = (1440, 2560)  # 제스처 좌표(0~1)를 픽셀로 바꿀 기본 화면 크기 (--screen-size, --device-screens로 변경)
+
+@profiler.timed('json_parse')
 def load_json(file_path):
     try:
         with open(file_path, 'r', encoding='utf-8') as file:
@@ -14,35 +32,105 @@ def load_json(file_path):
 def load_gestures(trace_directory):
     return load_json(os.path.join(trace_directory, 'gestures.json'))
 
-def load_view_hierarchies(view_hierarchies_path):
+# view_hierarchies 폴더 안 JSON 파일들의 (mtime, size) 서명 계산
+# file_names가 주어지면 (매니페스트의 파일 목록) 폴더를 나열하지 않고 그 파일들만 stat (편집된 파일도 반드시 감지되도록 매니페스트의 mtime은 쓰지 않음)
+def get_view_hierarchies_signature(view_hierarchies_path, file_names=None):
+    signature = {}
+    if file_names is not None:
+        for file_name in file_names:
+            try:
+                stat = os.stat(os.path.join(view_hierarchies_path, file_name))
+            except FileNotFoundError:
+                continue
+            signature[file_name] = (stat.st_mtime_ns, stat.st_size)
+        return signature
+    with os.scandir(view_hierarchies_path) as entries:
+        for entry in entries:
+            if entry.name.endswith('.json'):
+                stat = entry.stat()
+                signature[entry.name] = (stat.st_mtime_ns, stat.st_size)
+    return signature
+
+# view_hierarchies 경로를 해시하여 캐시 파일 경로 생성
+def get_view_cache_path(view_hierarchies_path, cache_dir):
+    key = hashlib.sha1(os.path.abspath(view_hierarchies_path).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, f'{key}.pkl')
+
+# 캐시 파일의 서명이 현재 폴더와 같을 때만 파싱된 view hierarchy 반환
+def load_view_cache(cache_path, signature):
+    try:
+        with open(cache_path, 'rb') as file:
+            cached = pickle.load(file)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"\nError loading cache {cache_path}: {e}")
+        return None
+
+    if cached.get('signature') != signature:
+        return None  # 파일이 추가/삭제/수정된 경우 다시 파싱
+    return cached['view_files']
+
+def save_view_cache(cache_path, view_hierarchies_path, signature, view_files):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    temp_path = f'{cache_path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as file:
+        pickle.dump({'path': os.path.abspath(view_hierarchies_path), 'signature': signature, 'view_files': view_files},
+                    file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, cache_path)  # 중간에 중단되어도 깨진 캐시가 남지 않도록 교체
+
+# manifest_files: 매니페스트에 기록된 (name, size, mtime_ns) 목록 (있으면 폴더를 다시 나열하지 않고 이 파일들만 stat)
+@profiler.timed()
+def load_view_hierarchies(view_hierarchies_path, cache_dir=VIEW_CACHE_DIR, manifest_files=None):
     view_files = {}
     total_UIs = 0  # 각 view_hierarchies 폴더 안의 UI 파일 갯수 (JSON 파일)
-    if os.path.exists(view_hierarchies_path):
-        for file_name in os.listdir(view_hierarchies_path):
-            if file_name.endswith('.json'):
-                file_path = os.path.join(view_hierarchies_path, file_name)
-                # Load each view hierarchy file
-                view_files[file_name] = load_json(file_path)
-                total_UIs += 1  # JSON 파일 하나당 UI로 간주
+    if manifest_files is not None or os.path.exists(view_hierarchies_path):
+        file_names = [name for name, _, _ in manifest_files] if manifest_files is not None else None
+        signature = get_view_hierarchies_signature(view_hierarchies_path, file_names)
+        total_UIs = len(signature)  # JSON 파일 하나당 UI로 간주
+
+        # 변경되지 않은 trace는 캐시에서 바로 불러와 JSON 파싱을 건너뜀
+        cache_path = get_view_cache_path(view_hierarchies_path, cache_dir) if cache_dir else None
+        if cache_path:
+            cached_view_files = load_view_cache(cache_path, signature)
+            if cached_view_files is not None:
+                profiler.count('view_cache_hits')
+                return cached_view_files, total_UIs
+            profiler.count('view_cache_misses')
+
+        for file_name in signature:
+            file_path = os.path.join(view_hierarchies_path, file_name)
+            # Load each view hierarchy file
+            view_files[file_name] = load_json(file_path)
+
+        if cache_path:
+            save_view_cache(cache_path, view_hierarchies_path, signature, view_files)
     return view_files, total_UIs
 
-def convert_coordinates(gesture_data, screen_width=1440, screen_height=2560, log_writer=None):
-    converted_data = {}
-    skipped_gestures = 0
-
-    for gesture_id, coordinates in gesture_data.items():
-        if not coordinates:
-            skipped_gestures += 1
-            log_writer.writerow([gesture_id, 'No coordinates found (possibly a scroll gesture)'])
-            continue
-        elif len(coordinates) > 1:
-            skipped_gestures += 1
-            log_writer.writerow([gesture_id, 'More than one coordinate found (possibly a scroll gesture)'])
-            continue
-        
-        converted_data[gesture_id] = [{'x': coord[0] * screen_width, 'y': coord[1] * screen_height} for coord in coordinates]
+# 한 trace의 제스처 dict를 배열로 변환: UI id, 좌표 개수, 첫 좌표의 정규화 x/y (좌표가 없으면 nan)
+def load_gesture_arrays(gesture_data):
+    ids = np.array(list(gesture_data), dtype=object)
+    counts = np.fromiter((len(coordinates) for coordinates in gesture_data.values()), dtype=np.int64, count=len(gesture_data))
+    points = np.array([coordinates[0][:2] if coordinates else (np.nan, np.nan) for coordinates in gesture_data.values()],
+                      dtype=np.float64).reshape(-1, 2)
+    return ids, counts, points[:, 0], points[:, 1]
+
+# 좌표가 하나인 제스처(탭)만 남기고 화면 크기로 스케일 (좌표가 없거나 둘 이상이면 스크롤로 보고 건너뜀)
+# 반환: ({'ids', 'x', 'y'} 배열, 건너뛴 제스처 수)
+@profiler.timed()
+def convert_coordinates(gesture_data, screen_size=DEFAULT_SCREEN_SIZE, skip_log=None):
+    ids, counts, xs, ys = load_gesture_arrays(gesture_data)
+    taps = counts == 1
+
+    for gesture_id, count in zip(ids[~taps].tolist(), counts[~taps].tolist()):
+        if count == 0:
+            skip_log.record(SkipReason.NO_COORDINATES, gesture_id)
+        else:
+            skip_log.record(SkipReason.MULTIPLE_COORDINATES, gesture_id, f'{count} coordinates')
 
-    return converted_data, skipped_gestures
+    screen_width, screen_height = screen_size
+    converted_data = {'ids': ids[taps], 'x': xs[taps] * screen_width, 'y': ys[taps] * screen_height}
+    return converted_data, int(np.count_nonzero(~taps))
 
 def is_within_bounds(x, y, bounds):
     left, top, right, bottom = map(int, bounds)
@@ -89,6 +177,7 @@ def count_components_in_ui(component):
     return 1 + child_count  # 현재 노드 + 자식 노드 수의 합
 
 
+@profiler.timed()
 def calculate_spacing(component_info, parent_info, siblings_info):
     current_bounds = component_info.get('bounds', [])
     parent_bounds = parent_info.get('bounds', []) if parent_info else []
@@ -135,10 +224,41 @@ def calculate_spacing(component_info, parent_info, siblings_info):
         'right_spacing': right_spacing
     }
 
-def recursive_search(parent, component, x, y, depth, ancestors):
+# UI 하나 안에서 부모 노드 단위 피처를 부모마다 한 번만 계산하는 메모 (find_matching_components가 view hierarchy마다 새로 만들고 버림)
+# 키는 id(부모 노드): 메모를 쓰는 동안 view hierarchy가 노드를 참조하고 있으므로 id가 다른 노드에 재사용되지 않음
+def get_parent_features(parent_memo, parent):
+    key = id(parent) if parent else None
+    features = parent_memo.get(key)
+    if features is None:
+        profiler.count('parent_memo_misses')
+        children = parent.get('children', []) if parent else []
+        with profiler.stage('calculate_hierarchy_depth'):
+            hierarchy_depth = calculate_hierarchy_depth(parent)
+        features = {
+            'children_count': len(children),
+            'children_classes': [child.get('class', 'Unknown') for child in children],
+            'hierarchy_depth': hierarchy_depth
+        }
+        parent_memo[key] = features
+    else:
+        profiler.count('parent_memo_hits')
+    return features
+
+# 매칭된 부모에서만 필요한 피처 (하위 노드 수/종류, 간격 계산용 형제 사각형)는 처음 요청될 때 계산하여 같은 메모에 추가
+def get_parent_match_features(parent_memo, parent):
+    features = get_parent_features(parent_memo, parent)
+    if 'descendant_count' not in features:
+        features['descendant_count'], features['descendant_classes'] = get_all_descendant_components_info(parent) if parent else (0, [])
+        # bounds가 없는 형제는 calculate_spacing에서 무시되므로 미리 제외
+        features['bounded_children'] = [child for child in (parent.get('children', []) if parent else []) if child.get('bounds', [])]
+    return features
+
+def recursive_search(parent, component, x, y, depth, ancestors, parent_memo=None):
     # component가 None일 경우 탐색을 중단
     if component is None:
         return []
+    if parent_memo is None:
+        parent_memo = {}
 
     matched_components = []
     bounds = component.get('bounds', [])
@@ -151,26 +271,19 @@ def recursive_search(parent, component, x, y, depth, ancestors):
 
         if children:
             for child in children:
-                matched_components.extend(recursive_search(component, child, x, y, depth + 1, current_ancestors))
+                matched_components.extend(recursive_search(component, child, x, y, depth + 1, current_ancestors, parent_memo))
         else:
-            # parent가 None일 경우 빈 리스트로 설정
-            sibling_count = len(parent.get('children', [])) if parent else 0
-            sibling_classes = [sib.get('class', 'Unknown') for sib in parent.get('children', [])] if parent else []
-
-            # 부모 아래에 있는 모든 컴포넌트들의 갯수와 종류 리스트 추가
-            parent_components_count = len(parent.get('children', [])) if parent else 0
-            parent_component_classes = [child.get('class', 'Unknown') for child in parent.get('children', [])] if parent else []
-
-            hierarchy_depth = calculate_hierarchy_depth(parent)
+            # 형제 수/종류와 부모 깊이는 같은 부모의 리프마다 같으므로 메모에서 가져옴 (parent가 None이면 0과 빈 리스트)
+            parent_features = get_parent_features(parent_memo, parent)
 
             component_info = {
                 'class': component.get('class', 'Unknown'),
                 'bounds': bounds,
-                'siblings': sibling_count,
-                'siblings_classes': sibling_classes,
-                'parent_components_count': parent_components_count,  # 부모 아래 컴포넌트 갯수
-                'parent_component_classes': parent_component_classes,  # 부모 아래 컴포넌트 종류 리스트
-                'Hierarchy_Depth': hierarchy_depth,  
+                'siblings': parent_features['children_count'],
+                'siblings_classes': parent_features['children_classes'],
+                'parent_components_count': parent_features['children_count'],  # 부모 아래 컴포넌트 갯수
+                'parent_component_classes': parent_features['children_classes'],  # 부모 아래 컴포넌트 종류 리스트
+                'Hierarchy_Depth': parent_features['hierarchy_depth'],  
                 'Nesting_Level': depth,  
                 'ancestors': current_ancestors,
                 'ancestors_cnt': len(current_ancestors),
@@ -190,6 +303,7 @@ def get_direct_child_components_info(parent_component):
 
     return direct_child_count, direct_child_classes
 
+@profiler.timed()
 def get_all_descendant_components_info(parent_component):
     # 부모 컴포넌트 아래에 있는 모든 자식 및 하위 자식 컴포넌트의 수와 종류를 계산하는 함수
     if parent_component is None or 'children' not in parent_component:
@@ -212,13 +326,14 @@ def get_all_descendant_components_info(parent_component):
 
 
 
-def find_matching_components(converted_gestures, view_hierarchies, log_writer):
+# skip_log: app/trace가 고정된 skipLog.TraceSkipLog
+def find_matching_components(converted_gestures, view_hierarchies, skip_log):
     matched_gestures = []
     recorded_gestures = set()
     matched_components_count = 0
     skipped_hierarchies_count = 0
 
-    for gesture_id, gestures in converted_gestures.items():
+    for gesture_id, x, y in zip(converted_gestures['ids'].tolist(), converted_gestures['x'].tolist(), converted_gestures['y'].tolist()):
         if gesture_id in recorded_gestures:
             continue
 
@@ -226,109 +341,176 @@ def find_matching_components(converted_gestures, view_hierarchies, log_writer):
         view_hierarchy = view_hierarchies.get(view_hierarchy_file)
 
         if view_hierarchy is None:
-            log_writer.writerow([gesture_id, f'No view hierarchy found or invalid JSON for {view_hierarchy_file}'])
+            skip_log.record(SkipReason.NO_VIEW_HIERARCHY, gesture_id, view_hierarchy_file)
             skipped_hierarchies_count += 1
             continue
 
         root_component = view_hierarchy.get('activity', {}).get('root', {})
         if not root_component:
-            log_writer.writerow([gesture_id, f'Empty or invalid view hierarchy for {view_hierarchy_file}'])
+            skip_log.record(SkipReason.EMPTY_VIEW_HIERARCHY, gesture_id, view_hierarchy_file)
             skipped_hierarchies_count += 1
             continue
 
         # 전체 트리의 깊이 계산
-        overall_hierarchy_depth = calculate_hierarchy_depth(root_component)
+        with profiler.stage('calculate_hierarchy_depth'):
+            overall_hierarchy_depth = calculate_hierarchy_depth(root_component)
 
         # UI당 컴포넌트 수 계산
-        total_components_in_ui = count_components_in_ui(root_component)
+        with profiler.stage('count_components_in_ui'):
+            total_components_in_ui = count_components_in_ui(root_component)
 
         matched = False  # 매칭 여부를 확인하기 위한 변수
-
-        for gesture in gestures:
-            x, y = gesture['x'], gesture['y']
-            try:
-                matching_components = recursive_search(None, root_component, x, y, 0, [])
-            except AttributeError as e:
-                log_writer.writerow([gesture_id, f'Error: {e} in {view_hierarchy_file}'])
-                continue
-
-            if matching_components:
-                component, component_info = sorted(matching_components, key=lambda x: (x[1]['Hierarchy_Depth'], x[1]['Nesting_Level']), reverse=True)[0]
-
-                parent_info = component_info.get('parent_node', None)  # 매칭된 노드의 부모 정보를 가져옵니다.
-
-                if parent_info:
-                    descendant_count, descendant_classes = get_all_descendant_components_info(parent_info)
-                else:
-                    descendant_count, descendant_classes = 0, []
-
-
-                siblings_info = [sibling for sibling in parent_info.get('children', []) if sibling != component] if parent_info else []
-
-                spacing_info = calculate_spacing(component_info, parent_info, siblings_info)
-
-                matched_gestures.append({
-                    'UI': gesture_id,
-                    'gesture_converted': [x, y],
-                    'component_info': {
-                        'bounds': component.get('bounds', []),
-                        'class': component.get('class', 'Unknown'),
-                        'ancestors': component_info['ancestors'],
-                        'ancestors_cnt': component_info['ancestors_cnt'],
-                        'siblings': component_info['siblings_classes'],
-                        'siblings_cnt': component_info['siblings'],
-                        'Hierarchy_Depth': overall_hierarchy_depth,
-                        'Nesting_Level': component_info['Nesting_Level'],
-                        'clickable': component.get('clickable', 'false'),
-                        'spacing': spacing_info,
-                        'total_components_in_ui': total_components_in_ui,  # UI당 컴포넌트 수 추가
-                        'descendant_count': descendant_count,  # 직계 부모 아래 하위 노드의 수
-                        'descendant_classes': descendant_classes  # 직계 부모 아래 하위 노드의 종류 리스트
-                    }
-                })
-
-
-                recorded_gestures.add(gesture_id)
-                matched_components_count += 1
-                matched = True  # 매칭된 경우
-                break
+        parent_memo = {}  # 이 UI 안에서만 쓰는 부모 노드 피처 메모
+
+        profiler.count('gestures_searched')
+        try:
+            with profiler.stage('recursive_search'):
+                matching_components = recursive_search(None, root_component, x, y, 0, [], parent_memo)
+        except AttributeError as e:
+            skip_log.record(SkipReason.SEARCH_ERROR, gesture_id, f'{e} in {view_hierarchy_file}')
+            matching_components = []
+
+        if matching_components:
+            component, component_info = sorted(matching_components, key=lambda x: (x[1]['Hierarchy_Depth'], x[1]['Nesting_Level']), reverse=True)[0]
+
+            parent_info = component_info.get('parent_node', None)  # 매칭된 노드의 부모 정보를 가져옵니다.
+
+            # 하위 노드 수/종류와 형제 사각형은 같은 UI의 같은 부모에 대해 한 번만 계산
+            parent_features = get_parent_match_features(parent_memo, parent_info)
+            descendant_count, descendant_classes = parent_features['descendant_count'], parent_features['descendant_classes']
+
+            # 자기 자신과 bounds가 같은 형제는 간격 계산에 영향을 주지 않으므로 값 비교 대신 객체 비교로 제외
+            siblings_info = [sibling for sibling in parent_features['bounded_children'] if sibling is not component]
+
+            spacing_info = calculate_spacing(component_info, parent_info, siblings_info)
+
+            matched_gestures.append({
+                'UI': gesture_id,
+                'gesture_converted': [x, y],
+                'component_info': {
+                    'bounds': component.get('bounds', []),
+                    'class': component.get('class', 'Unknown'),
+                    'ancestors': component_info['ancestors'],
+                    'ancestors_cnt': component_info['ancestors_cnt'],
+                    'siblings': component_info['siblings_classes'],
+                    'siblings_cnt': component_info['siblings'],
+                    'Hierarchy_Depth': overall_hierarchy_depth,
+                    'Nesting_Level': component_info['Nesting_Level'],
+                    'clickable': component.get('clickable', 'false'),
+                    'spacing': spacing_info,
+                    'total_components_in_ui': total_components_in_ui,  # UI당 컴포넌트 수 추가
+                    'descendant_count': descendant_count,  # 직계 부모 아래 하위 노드의 수
+                    'descendant_classes': descendant_classes  # 직계 부모 아래 하위 노드의 종류 리스트
+                }
+            })
+
+
+            recorded_gestures.add(gesture_id)
+            profiler.count('matched_components')
+            matched_components_count += 1
+            matched = True  # 매칭된 경우
 
         if not matched:
-            log_writer.writerow([gesture_id, f'Did not match any component in {view_hierarchy_file}'])
+            skip_log.record(SkipReason.NO_MATCHING_COMPONENT, gesture_id, view_hierarchy_file)
 
     return matched_gestures, matched_components_count, skipped_hierarchies_count
 
+@profiler.timed('write_json')
 def save_to_json(data, output_file):
     print(f"Saving {len(data)} entries to {output_file}")  # 데이터 갯수 확인
     with open(output_file, 'w', encoding='utf-8') as file:
         json.dump(data, file, indent=4, ensure_ascii=False)
 
-def process_trace_data(trace_directory, app_name, log_writer):
+# trace의 매니페스트 파일 목록 (매니페스트가 없으면 None: 폴더를 직접 조회)
+def get_trace_manifest_files(manifest, app_name, trace_directory):
+    if not manifest:
+        return None
+    return corpusManifest.list_files(manifest, app_name, os.path.basename(trace_directory), corpusManifest.VIEW_HIERARCHY)
+
+# trace 처리의 파일 읽기 단계 (I/O): 제스처와 view hierarchy를 읽어 반환
+def load_trace_files(trace_directory, view_manifest_files=None):
     gesture_data = load_gestures(trace_directory)
 
-    converted_gestures, skipped_gestures = convert_coordinates(gesture_data, log_writer=log_writer)
     view_hierarchies_path = os.path.join(trace_directory, 'view_hierarchies')
-    view_files, total_UIs = load_view_hierarchies(view_hierarchies_path)
+    view_files, total_UIs = load_view_hierarchies(view_hierarchies_path, manifest_files=view_manifest_files)
     
-    total_view_hierarchies = 1 if os.path.exists(view_hierarchies_path) else 0
-
-    matched_gestures, matched_components_count, skipped_hierarchies_count = find_matching_components(converted_gestures, view_files, log_writer)
+    if view_manifest_files is not None:
+        total_view_hierarchies = 1 if view_manifest_files else 0
+    else:
+        total_view_hierarchies = 1 if os.path.exists(view_hierarchies_path) else 0
+
+    return {'trace_directory': trace_directory, 'gesture_data': gesture_data, 'view_files': view_files, 'total_UIs': total_UIs, 'total_view_hierarchies': total_view_hierarchies}
+
+# trace 처리의 매칭 단계 (CPU): load_trace_files 결과로 좌표 변환과 컴포넌트 매칭
+def match_trace_data(trace_files, app_name, skip_log, screen_size=DEFAULT_SCREEN_SIZE):
+    trace_skip_log = skip_log.for_trace(app_name, os.path.basename(trace_files['trace_directory']))
+    converted_gestures, skipped_gestures = convert_coordinates(trace_files['gesture_data'], screen_size, trace_skip_log)
+    matched_gestures, matched_components_count, skipped_hierarchies_count = find_matching_components(converted_gestures, trace_files['view_files'], trace_skip_log)
     
-    return matched_gestures, matched_components_count, skipped_gestures, skipped_hierarchies_count, total_view_hierarchies, total_UIs, skipped_hierarchies_count
+    return matched_gestures, matched_components_count, skipped_gestures, skipped_hierarchies_count, trace_files['total_view_hierarchies'], trace_files['total_UIs'], skipped_hierarchies_count
+
+def process_trace_data(trace_directory, app_name, skip_log, manifest=None, screen_size=DEFAULT_SCREEN_SIZE):
+    return match_trace_data(load_trace_files(trace_directory, get_trace_manifest_files(manifest, app_name, trace_directory)), app_name, skip_log, screen_size)
+
+# 다음 depth개 trace의 파일을 스레드 풀에서 미리 읽고, 매칭은 호출한 스레드에서 순서대로 진행하여 I/O 대기를 매칭 계산 뒤로 숨김
+# 읽어 둔 trace는 최대 depth개까지만 유지 (하나를 꺼낼 때마다 다음 trace 하나를 요청하는 backpressure)
+# depth가 0이면 스레드 없이 순서대로 읽음
+def prefetch_trace_files(trace_jobs, manifest=None, depth=DEFAULT_PREFETCH_DEPTH):
+    if depth <= 0:
+        for app_name, trace_directory in trace_jobs:
+            yield load_trace_files(trace_directory, get_trace_manifest_files(manifest, app_name, trace_directory))
+        return
+
+    trace_jobs = iter(trace_jobs)
+    pending = deque()
+    executor = ThreadPoolExecutor(max_workers=depth, thread_name_prefix='trace-loader')
+
+    def submit_next():
+        job = next(trace_jobs, None)
+        if job is not None:
+            app_name, trace_directory = job
+            # 매니페스트 (sqlite 연결)는 만든 스레드에서만 조회할 수 있으므로 파일 목록은 여기서 조회하여 넘김
+            manifest_files = get_trace_manifest_files(manifest, app_name, trace_directory)
+            pending.append(executor.submit(load_trace_files, trace_directory, manifest_files))
 
-def process_single_app_traces(dataset_root, app_name, log_writer, max_traces=None):
+    try:
+        for _ in range(depth):
+            submit_next()
+        while pending:
+            future = pending.popleft()
+            submit_next()
+            with profiler.stage('prefetch_wait'):
+                trace_files = future.result()
+            yield trace_files
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+# 앱에서 처리할 trace 폴더 이름 목록 (trace_names가 주어지면 그 trace만: --since로 새로 추가된 trace)
+def list_trace_folders(dataset_root, app_name, manifest=None, trace_names=None, max_traces=None):
     app_directory = os.path.join(dataset_root, 'filtered_traces', app_name)
-    trace_folders = [d for d in os.listdir(app_directory) if os.path.isdir(os.path.join(app_directory, d))]
+    if trace_names is not None:
+        trace_folders = list(trace_names)
+    elif manifest:
+        trace_folders = corpusManifest.list_traces(manifest, app_name)
+    else:
+        trace_folders = [d for d in os.listdir(app_directory) if os.path.isdir(os.path.join(app_directory, d))]
 
     if max_traces:
         trace_folders = trace_folders[:max_traces]
+    return trace_folders
+
+# loaded_traces: prefetch_trace_files가 이 앱의 trace를 trace_folders 순서로 돌려주는 반복자 (없으면 이 앱의 trace만 미리 읽음)
+def process_single_app_traces(dataset_root, app_name, skip_log, max_traces=None, manifest=None, trace_names=None, loaded_traces=None, screen_size=DEFAULT_SCREEN_SIZE):
+    app_directory = os.path.join(dataset_root, 'filtered_traces', app_name)
+    trace_folders = list_trace_folders(dataset_root, app_name, manifest, trace_names, max_traces)
+    if loaded_traces is None:
+        loaded_traces = prefetch_trace_files([(app_name, os.path.join(app_directory, trace_name)) for trace_name in trace_folders], manifest)
 
     app_data = {"app_name": app_name, "traces": {}} 
     total_skipped_gestures, total_components, total_skip_hierarchies, total_view_hierarchies, total_UIs, total_skipped_UIs = 0, 0, 0, 0, 0, 0  
 
     for trace_name in tqdm(trace_folders, desc=f"Processing traces for {app_name}", leave=False):
-        trace_directory = os.path.join(app_directory, trace_name)
-        matched_gestures, matched_components_count, skipped_gestures, skipped_hierarchies_count, view_hierarchies_count, app_total_UIs, app_skipped_UIs = process_trace_data(trace_directory, app_name, log_writer)
+        matched_gestures, matched_components_count, skipped_gestures, skipped_hierarchies_count, view_hierarchies_count, app_total_UIs, app_skipped_UIs = match_trace_data(next(loaded_traces), app_name, skip_log, screen_size)
 
         # 앱의 제스처가 없거나 UI가 없으면 None file로 기록
         if matched_gestures:
@@ -345,23 +527,70 @@ def process_single_app_traces(dataset_root, app_name, log_writer, max_traces=Non
 
     return app_data, total_skipped_gestures, total_components, total_skip_hierarchies, total_view_hierarchies, total_UIs, total_skipped_UIs
 
+# --screen-size 값 'WxH'를 (가로, 세로) 픽셀로 변환
+def parse_screen_size(value):
+    try:
+        width, height = (int(size) for size in value.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got '{value}'")
+    return width, height
+
+# 기기별 화면 크기 파일 ({앱 이름: [가로, 세로]})을 읽어 {앱 이름: (가로, 세로)} 반환 (파일에 없는 앱은 --screen-size 사용)
+def load_device_screens(file_path):
+    if not file_path:
+        return {}
+    with open(file_path, 'r', encoding='utf-8') as file:
+        device_screens = json.load(file)
+    return {app_name: tuple(int(size) for size in screen_size) for app_name, screen_size in device_screens.items()}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Match gestures to view hierarchy components')
+    parser.add_argument('--output', default='dataset/matching_output.json')
+    parser.add_argument('--since', metavar='PREVIOUS_MANIFEST', help='process only traces that are not in this earlier manifest')
+    parser.add_argument('--rebuild-manifest', action='store_true', help='rescan filtered_traces even if no folder mtime changed since the manifest was built')
+    parser.add_argument('--workers', type=int, default=corpusManifest.DEFAULT_WORKERS, help='threads for the manifest folder mtime check and rebuild scan')
+    parser.add_argument('--skip-log', default='skipped_log.csv', help='skipped gestures/UIs with reason codes (app, trace, ui, reason, detail)')
+    parser.add_argument('--skip-summary', default='skipped_summary.json', help='skip counts per reason and per app')
+    parser.add_argument('--screen-size', type=parse_screen_size, default=DEFAULT_SCREEN_SIZE, metavar='WxH', help='screen size the normalized gesture coordinates are scaled to (default: 1440x2560)')
+    parser.add_argument('--device-screens', metavar='JSON', help='per-app screen sizes {"app name": [width, height]} for apps recorded on other devices')
+    parser.add_argument('--prefetch', type=int, default=DEFAULT_PREFETCH_DEPTH, help='traces read ahead in background threads while matching (0: read sequentially)')
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
     dataset_root = r''  # Set your root path
-    app_names = [d for d in os.listdir(os.path.join(dataset_root, 'filtered_traces')) if os.path.isdir(os.path.join(dataset_root, 'filtered_traces', d))]
+    # 코퍼스 구조는 매니페스트에서 조회 (없으면 한 번 스캔하여 생성)
+    manifest = corpusManifest.load_manifest(os.path.join(dataset_root, 'filtered_traces'), rebuild=args.rebuild_manifest, max_workers=args.workers)
+    app_names = corpusManifest.list_apps(manifest)
+
+    # --since: 이전 매니페스트 이후 추가된 trace만 앱별로 처리
+    new_traces = None
+    if args.since:
+        new_traces = {}
+        for app_name, trace_name in corpusManifest.list_new_traces(manifest, args.since):
+            new_traces.setdefault(app_name, []).append(trace_name)
+        app_names = [app_name for app_name in app_names if app_name in new_traces]
+        print(f"New traces since {args.since}: {sum(len(traces) for traces in new_traces.values())} in {len(app_names)} apps")
 
     total_apps = len(app_names)
+    device_screens = load_device_screens(args.device_screens)
 
     all_app_data = []
     total_skipped_gestures, total_components, total_skip_hierarchies, total_view_hierarchies, total_UIs, total_skipped_UIs = 0, 0, 0, 0, 0, 0  
 
-    # Open CSV file to log skipped gestures and hierarchies
-    with open('skipped_log.csv', 'w', newline='', encoding='utf-8') as log_file:
-        log_writer = csv.writer(log_file)
-        log_writer.writerow(['Gesture ID', 'Reason'])  # CSV 헤더 작성
+    # 건너뛴 제스처와 view hierarchy를 이유 코드와 함께 기록 (메모리에 모았다가 묶어서 씀)
+    with SkipLog(args.skip_log) as skip_log:
+
+        # 앱 경계를 넘어 다음 trace를 미리 읽도록 전체 trace 목록으로 하나의 prefetch 파이프라인을 만듦 (대부분의 앱은 trace가 한두 개)
+        trace_folders = {app_name: list_trace_folders(dataset_root, app_name, manifest, new_traces[app_name] if new_traces is not None else None)
+                         for app_name in app_names}
+        trace_jobs = [(app_name, os.path.join(dataset_root, 'filtered_traces', app_name, trace_name))
+                      for app_name in app_names for trace_name in trace_folders[app_name]]
 
-        with tqdm(total=total_apps, desc="Processing apps") as pbar:
+        with tqdm(total=total_apps, desc="Processing apps") as pbar, closing(prefetch_trace_files(trace_jobs, manifest, args.prefetch)) as loaded_traces:
             for app_name in app_names:
-                app_data, skipped_gestures, app_total_components, app_skip_hierarchies, app_view_hierarchies, app_total_UIs, app_skipped_UIs = process_single_app_traces(dataset_root, app_name, log_writer)
+                screen_size = device_screens.get(app_name, args.screen_size)
+                app_data, skipped_gestures, app_total_components, app_skip_hierarchies, app_view_hierarchies, app_total_UIs, app_skipped_UIs = process_single_app_traces(dataset_root, app_name, skip_log, manifest=manifest, trace_names=trace_folders[app_name], loaded_traces=loaded_traces, screen_size=screen_size)
                 all_app_data.append(app_data)
                 total_skipped_gestures += skipped_gestures
                 total_components += app_total_components
@@ -372,7 +601,9 @@ def main():
                 
                 pbar.update(1)
 
-    save_to_json(all_app_data, 'dataset/matching_output.json')
+    save_to_json(all_app_data, args.output)
+    skip_summary = skip_log.summary()
+    skip_log.write_summary(args.skip_summary)
 
     # Summary information
     print(f"Total apps: {total_apps}") # 총 앱의 갯수
@@ -380,6 +611,9 @@ def main():
     print("--------------------------------------------------------------------")    
     print(f"Total components processed: {total_components}")
     print(f"Matching Apps: {len([app for app in all_app_data if app['traces']])}")
+    print_summary(skip_summary)
+    print(f"Skip log saved to: {args.skip_log} (summary: {args.skip_summary})")
 
 if __name__ == "__main__":
-    main()
+    with profiler.profile_run('boundMatching_positive'):
+        main()